@@ -0,0 +1,167 @@
+import csv
+import os
+import random
+from typing import *
+from faker import Faker
+from pyDeid.phi_types.utils import DATA_PATH
+
+MONTHS = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
+# sentences holding PHI, in the style of `tests/test.csv`
+PHI_TEMPLATES = [
+    "{first} {last} was seen in clinic on {long_date}.",
+    "Dr. {doctor} reviewed the chart on {numeric_date} and agrees with the plan.",
+    "{hospital} is located at {street}, {place}, ON, {postal_code}.",
+    "Test mrn: {mrn}",
+    "SIN {sin}, OHIP {ohip}.",
+    "Daughter {first} can be reached at {phone} or {email}.",
+    "The patient had a sodium level of {number}, {day} {month} {year}.",
+    "Transferred from {hospital} on {iso_date}, lives in {place}.",
+]
+
+# clinical boilerplate between the PHI, as found at the start of note sections
+SECTION_HEADERS = [
+    "HISTORY OF PRESENT ILLNESS:",
+    "PAST MEDICAL HISTORY:",
+    "MEDICATIONS:",
+    "PHYSICAL EXAM:",
+    "ASSESSMENT AND PLAN:",
+]
+
+
+class SyntheticNoteGenerator:
+    """
+    Generates reproducible clinical notes of any length, with a configurable density of PHI, for benchmarking.
+
+    Notes are split into sections and lines of sentences. Each sentence holds PHI with probability `phi_density`,
+    drawn from the bundled name, place and hospital wordlists and from Faker; the other sentences are made of common
+    words and medical terms from the bundled wordlists. The same seed always generates the same notes.
+    """
+
+    def __init__(self, seed: int = 0, phi_density: float = 0.2):
+        """
+        Args:
+            seed: Seed of the generator's random number generator, and of Faker.
+            phi_density: Probability of each sentence holding PHI, between 0 and 1.
+        """
+        if not 0 <= phi_density <= 1:
+            raise ValueError("phi_density must be between 0 and 1")
+
+        self.seed = seed
+        self.phi_density = phi_density
+        self.random = random.Random(seed)
+        self.fake = Faker("en_CA")
+        self.fake.seed_instance(seed)
+
+        self.first_names = _wordlist(
+            "female_names_unambig_v2.txt", "male_names_unambig_v2.txt"
+        )
+        self.last_names = _wordlist("last_names_unambig_v2.txt")
+        self.places = _wordlist("local_places_unambig_v2.txt")
+        self.hospitals = _wordlist("ontario_hospitals.txt")
+        self.area_codes = _wordlist("canadian_area_code.txt")
+        self.common_words = _wordlist("commonest_words.txt", "notes_common.txt")
+        self.medical_words = _wordlist("sno_edited.txt")
+
+    def note(self, length: int) -> str:
+        """Returns a note of at least `length` characters, ending at the end of a sentence."""
+        lines = [self.random.choice(SECTION_HEADERS)]
+        size = len(lines[0])
+
+        while size < length:
+            if self.random.random() < 0.1:
+                line = "\n" + self.random.choice(SECTION_HEADERS)
+            else:
+                line = " ".join(
+                    self._sentence() for _ in range(self.random.randint(1, 3))
+                )
+
+            lines.append(line)
+            size += len(line) + 1
+
+        return "\n".join(lines)
+
+    def notes(self, count: int, length: int) -> List[str]:
+        return [self.note(length) for _ in range(count)]
+
+    def write_csv(self, path: str, count: int, length: int) -> str:
+        """Writes `count` notes of at least `length` characters as a CSV with the columns of `tests/test.csv`.
+
+        Returns:
+            The path of the CSV.
+        """
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["genc_id", "note_id", "note_text"])
+
+            for i in range(count):
+                writer.writerow([i // 2 + 1, i + 1, self.note(length)])
+
+        return path
+
+    def _sentence(self) -> str:
+        if self.random.random() < self.phi_density:
+            return self.random.choice(PHI_TEMPLATES).format(**self._phi())
+
+        words = [
+            self.random.choice(
+                self.medical_words if self.random.random() < 0.2 else self.common_words
+            ).lower()
+            for _ in range(self.random.randint(5, 14))
+        ]
+
+        return " ".join(words).capitalize() + "."
+
+    def _phi(self) -> Dict[str, str]:
+        rand = self.random
+        year = rand.randint(1950, 2024)
+        month = rand.randint(1, 12)
+        day = rand.randint(1, 28)
+
+        return {
+            "first": rand.choice(self.first_names).title(),
+            "last": rand.choice(self.last_names).title(),
+            "doctor": rand.choice(self.last_names).title(),
+            "hospital": rand.choice(self.hospitals),
+            "place": rand.choice(self.places),
+            "street": self.fake.street_address(),
+            "email": self.fake.email(),
+            "postal_code": f"{rand.choice('ABCEGHJKLMNPRSTVXY')}{rand.randint(0, 9)}"
+            f"{rand.choice('ABCEGHJKLMNPRSTVWXYZ')} {rand.randint(0, 9)}"
+            f"{rand.choice('ABCEGHJKLMNPRSTVWXYZ')}{rand.randint(0, 9)}",
+            "mrn": f"{rand.randint(0, 999):03d}-{rand.randint(0, 9999):04d}",
+            "sin": f"{rand.randint(100, 999)} {rand.randint(0, 999):03d} {rand.randint(0, 999):03d}",
+            "ohip": f"{rand.randint(1000, 9999)}-{rand.randint(0, 999):03d}-{rand.randint(0, 999):03d}",
+            "phone": f"({rand.choice(self.area_codes)}) {rand.randint(200, 999)}-{rand.randint(0, 9999):04d}",
+            "number": str(rand.randint(1, 200)),
+            "long_date": f"{MONTHS[month - 1]} {day}, {year}",
+            "numeric_date": f"{month:02d}/{day:02d}/{year}",
+            "iso_date": f"{year}-{month:02d}-{day:02d}",
+            "day": str(day),
+            "month": MONTHS[month - 1],
+            "year": str(year),
+        }
+
+
+def _wordlist(*filenames) -> List[str]:
+    # sorted, so that the same seed draws the same words
+    words = set()
+
+    for filename in filenames:
+        with open(os.path.join(DATA_PATH, filename), encoding="utf-8-sig") as f:
+            words.update(line.strip() for line in f if line.strip())
+
+    return sorted(words)
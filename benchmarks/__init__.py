@@ -0,0 +1,14 @@
+"""
+Benchmarks of pyDeid on reproducible synthetic notes, compared against a committed baseline, e.g.
+
+    python -m benchmarks
+    python -m benchmarks --update_baseline
+
+See `benchmarks/__main__.py` for the options.
+"""
+
+import os
+import sys
+
+# run against the source tree, as the tests do
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
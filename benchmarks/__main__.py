@@ -0,0 +1,286 @@
+"""
+Times each stage of de-identification and `Deidentifier.run()` on synthetic notes, and compares the timings with a
+baseline, e.g.
+
+    python -m benchmarks --lengths 500 2000 --workers 1 2
+    python -m benchmarks --update_baseline
+
+Stage timings are the milliseconds per note spent in each finder, the pruner and the replacer, recorded by
+`Instrumentation` while a built handler de-identifies the notes in this process. Run timings are the milliseconds per
+note of a whole `run()` on a CSV of the notes, excluding the build. Worker counts above the number of CPUs are skipped.
+
+A timing regresses when it is slower than its baseline by more than the tolerance and by more than `--min_ms`, which
+keeps the fastest stages from failing on noise. The command exits with 1 if any timing regresses, or if any timing has
+no baseline, e.g. the runs on more workers than the machine that recorded the baseline had CPUs, unless
+`--allow_missing` is passed. For the same reason, `--update_baseline` refuses to write a baseline without some of the
+requested worker counts unless `--allow_missing` is passed; record it on a machine with at least `max(--workers)` CPUs.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import *
+from pyDeid.DeidEngine import DEFAULT_PHI_TYPES
+from pyDeid.pyDeidBuilder import pyDeidBuilder
+from .SyntheticNoteGenerator import SyntheticNoteGenerator
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def time_stages(
+    generator: SyntheticNoteGenerator, lengths: List[int], notes: int
+) -> Dict[str, float]:
+    """Returns the milliseconds per note of each stage, keyed by `stages/<length>/<stage>`."""
+    handler = (
+        pyDeidBuilder()
+        .replace_phi()
+        .set_phi_types(DEFAULT_PHI_TYPES)
+        .set_instrumentation()
+        .build()
+        .handler
+    )
+    instrumentation = handler.instrumentation
+
+    # fills the surrogate pools and other lazily built state outside of the timings
+    for note in generator.notes(5, max(lengths)):
+        handler.handle_string(note)
+
+    metrics = {}
+
+    for length in lengths:
+        batch = generator.notes(notes, length)
+        instrumentation.drain()
+
+        start_time = time.perf_counter()
+
+        for note in batch:
+            handler.handle_string(note)
+
+        metrics[f"stages/{length}/total"] = (
+            1000 * (time.perf_counter() - start_time) / notes
+        )
+
+        for stage, (_, seconds, _) in instrumentation.drain().items():
+            metrics[f"stages/{length}/{stage}"] = 1000 * seconds / notes
+
+    return metrics
+
+
+def time_runs(
+    generator: SyntheticNoteGenerator,
+    lengths: List[int],
+    notes: int,
+    workers: List[int],
+    directory: str,
+) -> Dict[str, float]:
+    """Returns the milliseconds per note of `Deidentifier.run()`, keyed by `run/<length>/workers=<workers>`."""
+    metrics = {}
+
+    for length in lengths:
+        input_file = generator.write_csv(
+            os.path.join(directory, f"notes_{length}.csv"), notes, length
+        )
+
+        for threads in workers:
+            if threads > (os.cpu_count() or 1):
+                print(f"Skipping {threads} workers, which is more than the CPUs")
+                continue
+
+            deid = (
+                pyDeidBuilder()
+                .set_input_file(input_file, note_id_varname="note_id")
+                .replace_phi()
+                .set_phi_types(DEFAULT_PHI_TYPES)
+                .set_multithreading(threads)
+                .build()
+            )
+
+            start_time = time.perf_counter()
+            deid.run(verbose=False)
+            metrics[f"run/{length}/workers={threads}"] = (
+                1000 * (time.perf_counter() - start_time) / notes
+            )
+
+    return metrics
+
+
+def compare(
+    metrics: Dict[str, float],
+    baseline: Dict[str, float],
+    tolerance: float,
+    min_ms: float,
+) -> Tuple[List[str], List[str]]:
+    """Prints each timing against its baseline, and returns the names of the timings that regressed and of those that
+    have no baseline."""
+    regressions = []
+    missing = []
+
+    for name, ms in metrics.items():
+        if name not in baseline:
+            missing.append(name)
+            print(f"{name:<45} {'':>10} {ms:10.3f} ms  NO BASELINE")
+            continue
+
+        change = ms / baseline[name] - 1 if baseline[name] else 0.0
+        regressed = change > tolerance and ms - baseline[name] > min_ms
+
+        if regressed:
+            regressions.append(name)
+
+        print(
+            f"{name:<45} {baseline[name]:10.3f} {ms:10.3f} ms  {change:+7.1%}"
+            + ("  REGRESSED" if regressed else "")
+        )
+
+    return regressions, missing
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark pyDeid on synthetic notes against a baseline"
+    )
+    parser.add_argument(
+        "--lengths",
+        type=int,
+        nargs="+",
+        default=[500, 2000, 8000],
+        help="The note lengths in characters.",
+    )
+    parser.add_argument(
+        "--notes", type=int, default=20, help="The number of notes of each length."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="The worker counts of the runs.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--phi_density",
+        type=float,
+        default=0.2,
+        help="The probability of each sentence holding PHI.",
+    )
+    parser.add_argument("--baseline", type=str, default=BASELINE_FILE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="The fraction by which a timing may exceed its baseline.",
+    )
+    parser.add_argument(
+        "--min_ms",
+        type=float,
+        default=0.5,
+        help="The milliseconds per note by which a timing may exceed its baseline regardless of the tolerance.",
+    )
+    parser.add_argument(
+        "--output", type=str, default=None, help="A JSON file to write the timings to."
+    )
+    parser.add_argument(
+        "--update_baseline",
+        action="store_true",
+        help="Write the timings to the baseline instead of comparing with it.",
+    )
+    parser.add_argument(
+        "--allow_missing",
+        action="store_true",
+        help="Only warn about timings without a baseline, and let --update_baseline write a baseline without the "
+        "worker counts above the number of CPUs.",
+    )
+    args = parser.parse_args()
+
+    if args.notes < 1 or not args.lengths or min(args.lengths) < 1:
+        raise ValueError("notes and lengths must be positive")
+
+    metrics = time_stages(
+        SyntheticNoteGenerator(args.seed, args.phi_density), args.lengths, args.notes
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        metrics.update(
+            time_runs(
+                SyntheticNoteGenerator(args.seed, args.phi_density),
+                args.lengths,
+                args.notes,
+                args.workers,
+                directory,
+            )
+        )
+
+    # worker counts `time_runs` skipped, whose timings are neither recorded nor compared
+    skipped = sorted(
+        {threads for threads in args.workers if threads > (os.cpu_count() or 1)}
+    )
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "notes": args.notes,
+        "seed": args.seed,
+        "phi_density": args.phi_density,
+        "workers": sorted(set(args.workers) - set(skipped)),
+        "metrics": metrics,
+    }
+
+    if skipped:
+        print(
+            f"""WARNING:
+    {os.cpu_count()} CPUs: the runs on {", ".join(map(str, skipped))} workers were not timed"""
+        )
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        if skipped and not args.allow_missing:
+            print(
+                f"Not writing a baseline without the runs on {', '.join(map(str, skipped))} workers. Record it on a "
+                f"machine with at least {max(skipped)} CPUs, or pass --allow_missing."
+            )
+            sys.exit(1)
+
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+
+        print(f"Wrote {len(metrics)} timings to {args.baseline}")
+        sys.exit(0)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    print(f"{'timing (ms per note)':<45} {'baseline':>10} {'current':>10}")
+    regressions, missing = compare(
+        metrics, baseline["metrics"], args.tolerance, args.min_ms
+    )
+
+    if missing:
+        print(
+            f"""WARNING:
+    {len(missing)} timings have no baseline and were not checked: {", ".join(missing)}
+    The baseline was recorded with {baseline.get("cpu_count")} CPUs on workers {baseline.get("workers", "?")}; record it
+    again with `--update_baseline` on a machine with enough CPUs for every worker count."""
+        )
+
+    if regressions:
+        print(
+            f"{len(regressions)} timings regressed by more than {args.tolerance:.0%}: "
+            + ", ".join(regressions)
+        )
+        sys.exit(1)
+
+    if missing and not args.allow_missing:
+        print(
+            "Failing, as some timings have no baseline; pass --allow_missing to only warn"
+        )
+        sys.exit(1)
+
+    print(f"No timing regressed by more than {args.tolerance:.0%}")
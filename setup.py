@@ -14,9 +14,9 @@ else:
 
 setup(
     name='pyDeid',
-    packages=['pyDeid', 'pyDeid.phi_types', 'pyDeid.process_note'],
+    packages=['pyDeid', 'pyDeid.phi_types', 'pyDeid.process_note', 'pyDeid.wordlists'],
     package_dir={'pyDeid': 'src/pyDeid'},
-    package_data={'pyDeid': ['wordlists/*.txt']},
+    package_data={'pyDeid': ['wordlists/*.txt', 'wordlists/*.idx']},
     version='1.0.1',
     license='MIT',
     description='Replaces personal health information in free text.',
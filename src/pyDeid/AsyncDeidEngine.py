@@ -0,0 +1,271 @@
+import asyncio
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from typing import *
+from .DeidEngine import DeidEngine, NoteError, _deid_chunk
+from .pyDeidBuilder import pyDeidBuilder
+
+
+class AsyncDeidEngine:
+    """
+    De-identifies notes from asyncio code, in a pool of worker processes holding a `DeidEngine`'s PHI handler.
+
+    Concurrent `adeid` calls are queued and sent to the workers in micro-batches: a batch is dispatched when
+    `batch_size` notes are waiting, or `max_batch_delay` seconds after its first note arrived, so a busy service pays
+    the IPC cost once per batch while a lone note only waits for the delay. At most `max_concurrency` notes are queued
+    or being de-identified at once, and further calls wait for a slot.
+
+    A call that is cancelled or times out before its batch is dispatched is dropped from the batch. Once dispatched, its
+    note is still de-identified by the worker, and the result is discarded, but the note keeps its slot until the
+    worker is done with it. Workers keep no state between notes beyond their handler, so an abandoned note leaves
+    nothing behind for the notes that follow.
+
+    A note that fails raises a `NoteError` in its own call only. If the worker processes die, the calls of that batch
+    fail and the pool is started again for the next one.
+    """
+
+    def __init__(
+        self,
+        builder: pyDeidBuilder = None,
+        workers: int = 1,
+        batch_size: int = 16,
+        max_batch_delay: float = 0.005,
+        max_concurrency: int = 256,
+        timeout: float = None,
+    ):
+        """
+        Args:
+            builder: A configured builder, see `DeidEngine`. Defaults to the configuration of `deid_string`.
+            workers: Number of worker processes.
+            batch_size: Largest number of notes sent to a worker at once.
+            max_batch_delay: Longest time in seconds a note waits for others to be batched with.
+            max_concurrency: Largest number of notes queued or being de-identified at once.
+            timeout: Default timeout in seconds of `adeid`, or None to wait indefinitely.
+        """
+        if workers < 1 or batch_size < 1 or max_concurrency < 1:
+            raise ValueError("workers, batch_size and max_concurrency must be positive")
+
+        if max_batch_delay < 0:
+            raise ValueError("max_batch_delay must not be negative")
+
+        self.engine = DeidEngine(builder)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_batch_delay = max_batch_delay
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        self.batches = 0
+        self.cancelled = 0
+
+        # created in the running event loop by `_start`
+        self.queue = None
+        self.slots = None
+        self.batcher = None
+        self.running_batches = set()
+
+        # why the batcher stopped, raised by every later call
+        self.error = None
+
+    async def adeid(
+        self, note: str, timeout: float = None
+    ) -> Tuple[List[Dict[str, Union[int, str]]], str]:
+        """De-identifies one note.
+
+        Args:
+            note: The note.
+            timeout: Timeout in seconds, including the time spent waiting for a slot. Defaults to the engine's.
+
+        Returns:
+            The surrogates and the de-identified note, as returned by `deid_string`.
+
+        Raises:
+            asyncio.TimeoutError: If the note was not de-identified in time.
+            NoteError: If de-identifying the note failed.
+            RuntimeError: If the batcher stopped, with the error that stopped it as its cause.
+        """
+        self._start()
+
+        if timeout is None:
+            timeout = self.timeout
+
+        return await asyncio.wait_for(self._deid(note), timeout)
+
+    async def adeid_stream(
+        self,
+        source: Union[Iterable[str], AsyncIterable[str]],
+        max_in_flight: int = None,
+    ) -> AsyncIterator[Tuple[List[Dict[str, Union[int, str]]], str]]:
+        """De-identifies a stream of notes, yielding the results in the order of `source`.
+
+        Args:
+            source: An iterable or async iterable of notes, only read as results are consumed.
+            max_in_flight: Largest number of notes read ahead of the results consumed. Defaults to `max_concurrency`.
+
+        Yields:
+            The surrogates and the de-identified note of each note.
+        """
+        if max_in_flight is None:
+            max_in_flight = self.max_concurrency
+
+        pending = deque()
+
+        try:
+            async for note in _iterate(source):
+                pending.append(asyncio.ensure_future(self.adeid(note)))
+
+                if len(pending) >= max_in_flight:
+                    yield await pending.popleft()
+
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # the consumer stopped early or was cancelled
+            for task in pending:
+                task.cancel()
+
+    def report(self) -> str:
+        return f"{self.engine.report()}, in {self.batches} batches, {self.cancelled} notes cancelled before dispatch"
+
+    async def aclose(self) -> None:
+        """Stops batching, waits for the dispatched batches and shuts down the worker processes."""
+        if self.batcher is not None:
+            self.batcher.cancel()
+
+            try:
+                await self.batcher
+            except asyncio.CancelledError:
+                pass
+            except Exception:
+                # already raised by the calls, as the cause of their errors
+                pass
+
+            self.batcher = None
+
+        if self.running_batches:
+            await asyncio.gather(*self.running_batches, return_exceptions=True)
+
+        self.engine.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def _start(self) -> None:
+        if self.batcher is None:
+            self.queue = asyncio.Queue()
+            self.slots = asyncio.Semaphore(self.max_concurrency)
+            self.batcher = asyncio.ensure_future(self._batch())
+
+    async def _deid(self, note: str):
+        # the slot is released by the batcher, once the note is dropped or its batch is done
+        await self.slots.acquire()
+
+        if self.error is not None:
+            self.slots.release()
+            raise _batcher_stopped(self.error)
+
+        result = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((note, result))
+
+        try:
+            return await result
+        finally:
+            result.cancel()
+
+    async def _batch(self) -> None:
+        loop = asyncio.get_running_loop()
+        batch = []
+
+        try:
+            while True:
+                batch = [await self.queue.get()]
+
+                if self.queue.qsize() < self.batch_size - 1:
+                    await asyncio.sleep(self.max_batch_delay)
+
+                while len(batch) < self.batch_size and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+
+                live = [(note, result) for note, result in batch if not result.done()]
+                self.cancelled += len(batch) - len(live)
+
+                for _ in range(len(batch) - len(live)):
+                    self.slots.release()
+
+                batch = []
+
+                if live:
+                    task = asyncio.ensure_future(self._dispatch(loop, live))
+                    self.running_batches.add(task)
+                    task.add_done_callback(self.running_batches.discard)
+        except asyncio.CancelledError:
+            self._fail_waiting(batch, RuntimeError("The engine was closed"))
+            raise
+        except Exception as e:
+            # fail the waiting calls rather than leave them waiting on a batcher that is gone
+            self.error = e
+            self._fail_waiting(batch, _batcher_stopped(e))
+            raise
+
+    def _fail_waiting(self, batch, error: Exception) -> None:
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+
+        for _, result in batch:
+            if not result.done():
+                result.set_exception(error)
+
+            self.slots.release()
+
+    async def _dispatch(self, loop, batch) -> None:
+        self.batches += 1
+        pool = None
+
+        try:
+            pool = self.engine._get_pool(self.workers)
+            results, latencies = await loop.run_in_executor(
+                pool, _deid_chunk, [note for note, _ in batch]
+            )
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool) and self.engine.pool is pool:
+                # started again by the next batch
+                self.engine.close()
+
+            for _, result in batch:
+                if not result.done():
+                    result.set_exception(e)
+
+            return
+        finally:
+            for _ in batch:
+                self.slots.release()
+
+        self.engine._record(latencies, results)
+
+        for (_, result), deidentified in zip(batch, results):
+            if result.done():
+                continue
+
+            if isinstance(deidentified, NoteError):
+                result.set_exception(deidentified)
+            else:
+                result.set_result(deidentified)
+
+
+def _batcher_stopped(cause: Exception) -> RuntimeError:
+    error = RuntimeError("The batcher stopped")
+    error.__cause__ = cause
+
+    return error
+
+
+async def _iterate(source):
+    if hasattr(source, "__aiter__"):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import pickle
+import stat
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from .phi_types.utils import DATA_PATH, user_cache_dir, wordlist_index
+from .process_note.PHIFinder import PHIFinder
+
+# bump to invalidate every cached finder, e.g. when the pickled state changes without a change to pyDeid's sources
+CACHE_VERSION = 1
+
+PACKAGE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# finders loaded by any `BuildCache` in this process, by cache directory and key, least recently used first
+LOADED_FINDERS = OrderedDict()
+
+# finders kept in `LOADED_FINDERS`, each holding its wordlists and compiled patterns
+MAX_LOADED_FINDERS = 4
+
+# (size, modification time, SHA-256) of every file hashed into a key in this process, by path
+FILE_DIGESTS = {}
+
+
+class BuildCache:
+    """
+    Keeps the `PHIFinder` built by `pyDeidBuilder.build()` on disk, so that later builds load it instead of
+    constructing it again.
+
+    Constructing a finder reads every wordlist, compiles several hundred regular expressions and builds the gazetteer
+    automaton. The finder is pickled under a key hashing the content of the wordlist files and of pyDeid's modules
+    along with the finder configuration, so that a changed wordlist, custom namelist, setting or pyDeid version
+    builds and stores a new finder.
+
+    The last `MAX_LOADED_FINDERS` finders loaded in a process are also kept in memory, so that later builds with the
+    same configuration, as in repeated calls to `deid_string`, skip loading them. Every build gets its own copy of the
+    finder, sharing only the wordlists, compiled patterns and gazetteer automaton, so setting instrumentation or custom
+    regexes on one build does not change the others.
+
+    Compiled regular expressions are pickled as their pattern, so a finder loaded from disk recompiles them. Custom
+    regexes are set on the finder after it is loaded, as their surrogate builders may not be picklable, and finders
+    with an NER pipeline are never cached.
+
+    Unpickling an entry runs whatever code its writer chose, so the cache must only be writable by the current user:
+    the directory is created with mode 0700 and entries with mode 0600, and a directory or entry owned by another user
+    or writable by its group or others is refused rather than loaded. Do not share a cache directory between users.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        """
+        Args:
+            cache_dir: Directory of the cache, created if needed. Defaults to `pyDeid` in `$XDG_CACHE_HOME`, or in
+                `~/.cache`.
+
+        Raises:
+            ValueError: If the directory is owned by another user, or is writable by its group or others.
+        """
+        if cache_dir is None:
+            cache_dir = user_cache_dir()
+
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+
+        if os.path.exists(self.cache_dir):
+            _check_private(os.stat(self.cache_dir), self.cache_dir)
+
+        self.hits = 0
+        self.misses = 0
+        self.load_time = 0.0
+
+    def get_finder(self, config: PHIFinder.Config) -> PHIFinder:
+        """Returns a finder for `config`, from memory or from the cache if it was built before, otherwise built and
+        stored in the cache.
+
+        Args:
+            config: The finder configuration.
+
+        Returns:
+            The finder.
+        """
+        if config.ner_model is not None:
+            return PHIFinder(config)
+
+        start_time = time.perf_counter()
+
+        key = self.key(config)
+        loaded_key = (self.cache_dir, key)
+        finder = LOADED_FINDERS.get(loaded_key)
+
+        if finder is None:
+            path = os.path.join(self.cache_dir, f"finder-{key}.pickle")
+            finder = self._load(path)
+
+            if finder is None:
+                finder = PHIFinder(replace(config, custom_regexes=[]))
+                self._store(path, finder)
+                self.misses += 1
+            else:
+                self.hits += 1
+
+            LOADED_FINDERS[loaded_key] = finder
+
+            while len(LOADED_FINDERS) > MAX_LOADED_FINDERS:
+                LOADED_FINDERS.popitem(last=False)
+        else:
+            LOADED_FINDERS.move_to_end(loaded_key)
+            self.hits += 1
+
+        finder = finder.copy()
+        finder.set_custom_regexes(config.custom_regexes)
+
+        self.load_time += time.perf_counter() - start_time
+
+        return finder
+
+    def key(self, config: PHIFinder.Config) -> str:
+        """Returns the hash of everything a finder built for `config` depends on, except its custom regexes."""
+        return finder_key(config)
+
+    def report(self) -> str:
+        return (
+            f"Build cache {self.cache_dir}: {self.hits} hits, {self.misses} misses, {self.load_time:.3f} s spent "
+            f"getting finders"
+        )
+
+    def _load(self, path: str):
+        try:
+            f = open(path, "rb")
+        except OSError:
+            # not built yet
+            return None
+
+        with f:
+            # checked on the open file, so the entry cannot be swapped between the check and the load
+            _check_private(os.stat(self.cache_dir), self.cache_dir)
+            _check_private(os.fstat(f.fileno()), path)
+
+            try:
+                return pickle.load(f)
+            except Exception:
+                # written by an incompatible version of a dependency; it is built and overwritten
+                return None
+
+    def _store(self, path: str, finder: PHIFinder) -> None:
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+
+        # write next to the entry and move it into place, so concurrent builds never load a partly written entry
+        partial_path = f"{path}.{os.getpid()}.tmp"
+
+        with os.fdopen(
+            os.open(partial_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb"
+        ) as f:
+            pickle.dump(finder, f, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(partial_path, path)
+
+
+def finder_key(config: PHIFinder.Config) -> str:
+    """Returns the hash of everything a finder built for `config` depends on, except its custom regexes."""
+
+    def names(namelist):
+        return None if namelist is None else sorted(map(str, namelist))
+
+    sources = [
+        os.path.join(directory, filename)
+        for directory, _, filenames in os.walk(PACKAGE_PATH)
+        for filename in filenames
+        if filename.endswith(".py")
+    ] + [
+        os.path.join(DATA_PATH, filename)
+        for filename in os.listdir(DATA_PATH)
+        if filename.endswith(".txt")
+    ]
+
+    inputs = {
+        "version": CACHE_VERSION,
+        # finders keep the paths of their wordlists
+        "package_path": PACKAGE_PATH,
+        "sources": {
+            os.path.relpath(source, PACKAGE_PATH): _file_digest(source)
+            for source in sorted(sources)
+        },
+        "wordlist_index": wordlist_index() is not None,
+        "phi_types": list(config.phi_types),
+        "two_digit_threshold": config.two_digit_threshold,
+        "valid_year_low": config.valid_year_low,
+        "valid_year_high": config.valid_year_high,
+        "custom_dr_first_names": names(config.custom_dr_first_names),
+        "custom_dr_last_names": names(config.custom_dr_last_names),
+        "custom_patient_first_names": names(config.custom_patient_first_names),
+        "custom_patient_last_names": names(config.custom_patient_last_names),
+        "segment_cache_bytes": config.segment_cache_bytes,
+    }
+
+    return hashlib.sha256(
+        json.dumps(inputs, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def _check_private(st: os.stat_result, path: str) -> None:
+    """Raises a ValueError unless `st`, the status of `path`, is owned by the current user and not writable by its
+    group or others. Ownership is not checked where there are no user ids, as on Windows.
+    """
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        raise ValueError(
+            f"{path} is owned by another user; refusing to load cached finders from it"
+        )
+
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise ValueError(
+            f"{path} is writable by other users; refusing to load cached finders from it"
+        )
+
+
+def _file_digest(path: str) -> str:
+    stat = os.stat(path)
+    cached = FILE_DIGESTS.get(path)
+
+    if cached is None or cached[:2] != (stat.st_size, stat.st_mtime_ns):
+        with open(path, "rb") as f:
+            cached = (
+                stat.st_size,
+                stat.st_mtime_ns,
+                hashlib.sha256(f.read()).hexdigest(),
+            )
+
+        FILE_DIGESTS[path] = cached
+
+    return cached[2]
@@ -0,0 +1,233 @@
+import math
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import *
+from .pyDeidBuilder import pyDeidBuilder
+
+# the PHI types `deid_string` finds by default
+DEFAULT_PHI_TYPES = [
+    "names",
+    "dates",
+    "sin",
+    "ohip",
+    "mrn",
+    "locations",
+    "hospitals",
+    "contact",
+]
+
+
+class NoteError(Exception):
+    """Stands in for the result of a note that failed to be de-identified.
+
+    Only the type of the original error is kept, since its message may quote the note.
+    """
+
+    def __init__(self, error_type: str):
+        # the only argument, so that the error pickles back from worker processes
+        super().__init__(error_type)
+        self.error_type = error_type
+
+    def __str__(self):
+        return f"{self.error_type} while de-identifying the note"
+
+
+# handler installed in each pool process by `_init_worker`, so tasks only need to carry the notes
+_worker_handler = None
+
+
+class DeidEngine:
+    """
+    De-identifies single strings with detection state built once, for interactive and service workloads.
+
+    `deid_string` configures a new `pyDeidBuilder` and builds every finder, wordlist and NER pipeline again for each
+    note. An engine builds them once from a builder's configuration and keeps them, so each call only finds, prunes and
+    replaces the PHI in the note. Notes can also be streamed through a pool of worker processes, each holding its own
+    copy of the engine's PHI handler.
+
+    The time spent on each note is kept for the most recent notes, for `latency_percentiles` and `report`. A note that
+    fails in `deid_many` yields a `NoteError` in place of its result, like a failed row of `Deidentifier.run()` is
+    recorded and skipped, so one bad note does not end the stream.
+    """
+
+    def __init__(self, builder: pyDeidBuilder = None, max_latencies: int = 10000):
+        """
+        Args:
+            builder: A configured builder, e.g. `pyDeidBuilder().replace_phi().set_phi_types(["names", "dates"])`.
+                Input and output files are ignored. Defaults to the configuration of `deid_string`.
+            max_latencies: Number of the most recent per-note latencies kept.
+        """
+        if builder is None:
+            builder = pyDeidBuilder().replace_phi().set_phi_types(DEFAULT_PHI_TYPES)
+
+        self.handler = builder.build().handler
+
+        self.latencies = deque(maxlen=max_latencies)
+        self.notes = 0
+        self.failed = 0
+
+        self.pool = None
+        self.pool_workers = 0
+
+        # multiprocessing context of the pool, or None for the default
+        self.mp_context = None
+
+    def deid(self, note: str) -> Tuple[List[Dict[str, Union[int, str]]], str]:
+        """De-identifies one note.
+
+        Args:
+            note: The note.
+
+        Returns:
+            The surrogates and the de-identified note, as returned by `deid_string`.
+        """
+        start_time = time.perf_counter()
+        result = self.handler.handle_string(note)
+        self._record([time.perf_counter() - start_time])
+
+        return result
+
+    def deid_many(
+        self,
+        notes: Iterable[str],
+        workers: int = 1,
+        chunk_size: int = 16,
+        max_in_flight: int = None,
+    ) -> Iterator[Union[Tuple[List[Dict[str, Union[int, str]]], str], NoteError]]:
+        """De-identifies notes lazily, in order.
+
+        Args:
+            notes: The notes, which are only read as results are consumed.
+            workers: Number of worker processes. With 1, notes are de-identified in this process.
+            chunk_size: Number of notes sent to a worker at once.
+            max_in_flight: Maximum number of chunks submitted to the workers but not yet consumed. Defaults to 4 per
+                worker.
+
+        Yields:
+            The surrogates and the de-identified note of each note, in the order of `notes`, or a `NoteError` for a
+            note that failed.
+        """
+        if workers < 1 or chunk_size < 1:
+            raise ValueError("workers and chunk_size must be positive")
+
+        if workers == 1:
+            for note in notes:
+                results, latencies = _deid_chunk([note], self.handler)
+                self._record(latencies, results)
+
+                yield results[0]
+
+            return
+
+        if max_in_flight is None:
+            max_in_flight = 4 * workers
+
+        pool = self._get_pool(workers)
+        in_flight = deque()
+        notes = iter(notes)
+        exhausted = False
+
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                chunk = [note for _, note in zip(range(chunk_size), notes)]
+
+                if chunk:
+                    in_flight.append(pool.submit(_deid_chunk, chunk))
+
+                exhausted = len(chunk) < chunk_size
+
+            if in_flight:
+                results, latencies = in_flight.popleft().result()
+                self._record(latencies, results)
+
+                yield from results
+
+    def latency_percentiles(
+        self, percentiles: Iterable[float] = (50, 90, 99)
+    ) -> Dict[float, float]:
+        """Returns percentiles of the time spent on each of the most recent notes, in seconds.
+
+        With worker processes, a note's latency is the time the worker spent on it, without queueing.
+        """
+        latencies = sorted(self.latencies)
+
+        if not latencies:
+            return {percentile: 0.0 for percentile in percentiles}
+
+        # nearest rank
+        return {
+            percentile: latencies[
+                max(math.ceil(percentile / 100 * len(latencies)) - 1, 0)
+            ]
+            for percentile in percentiles
+        }
+
+    def report(self) -> str:
+        percentiles = ", ".join(
+            f"p{percentile:g} {latency * 1000:.1f} ms"
+            for percentile, latency in self.latency_percentiles().items()
+        )
+
+        return f"De-identified {self.notes} notes ({self.failed} failed), latency {percentiles}"
+
+    def close(self, wait: bool = True) -> None:
+        """Shuts down the worker processes, if any, waiting for them to finish their tasks if `wait`."""
+        if self.pool is not None:
+            self.pool.shutdown(wait=wait)
+            self.pool = None
+            self.pool_workers = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get_pool(self, workers: int) -> ProcessPoolExecutor:
+        # the pool is kept between calls, so workers only receive the handler when they start
+        if self.pool_workers != workers:
+            self.close()
+            self.pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=self.mp_context,
+                initializer=_init_worker,
+                initargs=(self.handler,),
+            )
+            self.pool_workers = workers
+
+        return self.pool
+
+    def _record(self, latencies: List[float], results: List = ()) -> None:
+        self.latencies.extend(latencies)
+        self.notes += len(latencies)
+        self.failed += sum(isinstance(result, NoteError) for result in results)
+
+
+def _init_worker(handler):
+    global _worker_handler
+    _worker_handler = handler
+
+
+def _deid_chunk(notes, handler=None):
+    """De-identifies a list of notes, returning their results in order and the time spent on each.
+
+    The result of a note that raised is a `NoteError`, and the other notes are still de-identified.
+    """
+    if handler is None:
+        handler = _worker_handler
+
+    results = []
+    latencies = []
+
+    for note in notes:
+        start_time = time.perf_counter()
+
+        try:
+            results.append(handler.handle_string(note))
+        except Exception as e:
+            results.append(NoteError(type(e).__name__))
+
+        latencies.append(time.perf_counter() - start_time)
+
+    return results, latencies
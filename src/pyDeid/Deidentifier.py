@@ -1,8 +1,15 @@
 import csv
+import heapq
+import os
+import pickle
+import sys
 import time
 from typing import *
 from tqdm import tqdm
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from .phi_types.utils import merge_phi_dicts
+from .process_note.PHIHandler import split_note
 
 
 class Deidentifier:
@@ -18,12 +25,26 @@ class Deidentifier:
         self.handler = None
         self.phi_output_file_type = "csv"
         self.phi_output_file = None
+        self.phi_fieldnames = None
+        self.phi_flush_interval = 1000
         self.deidentified_file = None
         self.encoding = "utf-8"
         self.input_file_type = "csv"
         self.return_surrogates = True
         self.proc_bar = None
+        self._phi_writer = None
+        self._phi_buffer = []
         self.max_workers = 1
+        self.resident_handler = True
+        self.max_in_flight = None
+        self.preserve_order = False
+        self.chunk_size = None
+        self.chunk_chars = None
+        self.lookahead = None
+        self.window_chars = None
+        self.window_overlap = 1000
+        self.measure_ipc = False
+        self.instrumentation_file = None
 
     def run(self, verbose=True):
         """
@@ -36,6 +57,8 @@ class Deidentifier:
             verbose (logical): Whether or not to print a progress bar with de-identification progress updates.
         """
 
+        self.verbose = verbose
+
         if self.input_file_type == "csv":
             self._run_on_csv(verbose)
 
@@ -53,73 +76,578 @@ class Deidentifier:
             )
             writer_deid.writeheader()
 
-            if self.verbose:
-                chars = 0
-                notes = 0
-                start_time = time.time()
+            if self.phi_output_file_type == "csv":
+                self._open_phi_writer(f_phi)
 
-            errors = []
-            futures = {}
-
-            # submit each row’s deid work to the thread pool
-            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
-                for row in self.reader_dict:
-                    original_note = row[self.note_varname]
-                    fut = pool.submit(
-                        _worker,
-                        self.handler,
-                        row,
-                        [],
-                        self.encounter_id_varname,
-                        self.note_id_varname,
-                        self.note_varname,
+            run = _CsvRun(
+                writer_deid,
+                self.max_in_flight or 4 * self.max_workers * self._chunk_capacity(),
+            )
+
+            if verbose:
+                print(self.handler.finder.report())
+                print(self.handler.finder.registry.report())
+                self.proc_bar = tqdm()
+
+            rows = iter(self.reader_dict)
+
+            if self.handler.instrumentation is not None:
+                rows = _timed_rows(rows, self.handler.instrumentation)
+
+            run.pool, run.handler_bytes = self._start_pool()
+
+            try:
+                self._dispatch(run, rows)
+            finally:
+                run.pool.shutdown()
+
+            if verbose:
+                self.proc_bar.close()
+
+            if self.phi_output_file_type == "csv":
+                flush_start_time = time.perf_counter()
+                self._flush_phi_buffer()
+
+                if self.handler.instrumentation is not None:
+                    self.handler.instrumentation.record(
+                        "write", time.perf_counter() - flush_start_time
                     )
-                    futures[fut] = (row, original_note)
 
-                if verbose:
-                    self.proc_bar = tqdm(total=len(futures))
+            if (
+                self.handler.instrumentation is not None
+                and self.instrumentation_file is not None
+            ):
+                self.handler.instrumentation.dump(
+                    self.instrumentation_file,
+                    wall_seconds=time.time() - run.start_time,
+                    workers=self.max_workers,
+                )
+
+            if self.verbose:
+                self._print_diagnostics(run)
+
+            if len(run.errors) != 0:
+                self._print_errors(run.errors)
+
+    def _start_pool(self):
+        """Starts the worker pool, returning it and the size of the pickled handler sent with every task, or 0 if it is not
+        measured or not sent."""
+        # with a resident handler, each worker receives the handler once through the pool
+        # initializer and tasks only carry the rows; otherwise the handler travels with every task
+        if self.resident_handler:
+            pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.handler,),
+            )
+            handler_bytes = 0
+        else:
+            pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            handler_bytes = (
+                len(pickle.dumps(self.handler, pickle.HIGHEST_PROTOCOL))
+                if self.measure_ipc
+                else 0
+            )
+
+        return pool, handler_bytes
 
-                # as each worker finishes, write its output on the main thread
-                for fut in as_completed(futures):
-                    row, original_note = futures[fut]
-                    row_errors, surrogates, new_note, found_phis = fut.result()
+    def _dispatch(self, run, rows):
+        """Keeps the pool busy with the rows of the reader, and writes the results as they come back."""
+        while True:
+            self._fill(run, rows)
+            run.peak_in_flight = max(run.peak_in_flight, run.notes_in_flight)
+
+            if not run.in_flight and not run.window_futures:
+                break
+
+            # as each worker finishes, write its output on the main thread
+            for fut in self._wait(run):
+                if fut in run.window_futures:
+                    self._collect_window(run, fut)
+                else:
+                    self._collect_chunk(run, fut)
+
+            self._write_ready(run)
+
+        # the tail is the time spent finishing the last tasks once there is nothing left to dispatch
+        run.tail_time = (
+            time.perf_counter() - run.drained_time if run.drained_time else 0
+        )
+
+    def _fill(self, run, rows):
+        """Submits chunks of rows until the window of `max_in_flight` notes is full or the reader is exhausted.
+
+        Only pulling more rows from the reader while the window has room keeps memory bounded by `max_in_flight` notes
+        no matter how large the input file is.
+        """
+        while not run.exhausted:
+            chunk = self._next_rows(run, rows)
+
+            if chunk is None:
+                break
+
+            if not chunk:
+                run.exhausted = True
+                run.drained_time = time.perf_counter()
+                break
+
+            if self.window_chars is not None:
+                chunk = self._split_long_notes(run, chunk)
+
+                if not chunk:
+                    continue
+
+            self._submit(run, chunk)
+            run.notes_in_flight += len(chunk)
+
+    def _next_rows(self, run, rows):
+        """The next chunk of rows to dispatch, paired with their input row indices: the next rows of the reader, or the
+        longest staged ones with a lookahead. An empty chunk means that every row was dispatched, and None that the
+        window is full."""
+        room = run.max_in_flight - run.notes_in_flight - len(run.reorder_buffer)
+        limit = min(self._chunk_capacity(), room)
+
+        if room < 1:
+            # in ordered mode the window can fill up with results waiting on a row that
+            # is still staged; dispatch the earliest staged row so the buffer can drain
+            if run.in_flight or not run.staged:
+                return None
+
+            return [self._pop_earliest(run.staged)]
+
+        if self.lookahead:
+            if not run.reader_exhausted:
+                run.next_index, run.reader_exhausted = self._fill_lookahead(
+                    rows, run.staged, run.next_index
+                )
 
-                    errors.extend(row_errors)
+            return self._next_longest_chunk(run.staged, limit)
 
-                    self._write_new_note_to_file(
-                        found_phis, surrogates, row, writer_deid, new_note
+        chunk = self._next_chunk(rows, limit, run.next_index)
+        run.next_index += len(chunk)
+
+        return chunk
+
+    def _split_long_notes(self, run, chunk):
+        """Submits the windows of each note of the chunk longer than `window_chars`, returning the other rows."""
+        for row_index, row in chunk:
+            if len(row[self.note_varname]) > self.window_chars:
+                windows = split_note(
+                    row[self.note_varname], self.window_chars, self.window_overlap
+                )
+                note_facts = self.handler.finder.note_facts(row[self.note_varname])
+
+                for window in windows:
+                    fut, task_bytes = self._submit_window(
+                        run.pool, row, window, note_facts
                     )
+                    run.ipc_bytes += run.handler_bytes + task_bytes
+                    run.tasks += 1
+                    run.window_futures[fut] = (row_index, window)
+                    run.dispatch_order[fut] = run.tasks
+
+                run.split_notes[row_index] = {
+                    "row": row,
+                    "phis": {},
+                    "pending": len(windows),
+                    "failed": False,
+                }
+                run.notes_in_flight += 1
+                run.windowed_notes += 1
+
+        return [
+            (row_index, row)
+            for row_index, row in chunk
+            if row_index not in run.split_notes
+        ]
+
+    def _submit(self, run, chunk, found_phi=None):
+        """Submits a chunk of rows paired with their input row indices, and tracks its future."""
+        fut, task_bytes = self._submit_chunk(
+            run.pool, [row for _, row in chunk], found_phi=found_phi
+        )
+        run.ipc_bytes += run.handler_bytes + task_bytes
+        run.tasks += 1
+        run.in_flight[fut] = chunk
+        run.dispatch_order[fut] = run.tasks
+
+    def _wait(self, run):
+        """Waits for at least one task to complete, and returns the completed tasks.
+
+        A worker that dies breaks the pool, which fails every task still on it with `BrokenProcessPool`. All of them are
+        then returned, and the run continues on a new pool.
+        """
+        wait_start_time = time.perf_counter()
+        pending = [*run.in_flight, *run.window_futures]
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+        if any(isinstance(fut.exception(), BrokenProcessPool) for fut in done):
+            done, _ = wait(pending)
+            run.pool.shutdown()
+            run.pool, _ = self._start_pool()
+            run.broken_pools += 1
+
+        if self.handler.instrumentation is not None:
+            self.handler.instrumentation.record(
+                "wait", time.perf_counter() - wait_start_time
+            )
+
+        return done
+
+    def _collect_window(self, run, fut):
+        """Merges the PHI found in a window into its note's, and submits the note once all of its windows are back."""
+        row_index, (start, end, _, _) = run.window_futures.pop(fut)
+        split = run.split_notes[row_index]
+        dispatched = run.dispatch_order.pop(fut)
+
+        # a window that raised, or whose PHI depends on text outside of it, sends the note back
+        # through the whole-note find, which records it in `errors` if it fails again
+        if fut.exception() is not None:
+            split["failed"] = True
+        else:
+            found_phi, elapsed, pid, worker_stats = fut.result()
+            self._merge_worker_stats(worker_stats, run.cache_stats)
+            run.task_log.append((dispatched, row_index, elapsed))
+            run.worker_chars[pid] = run.worker_chars.get(pid, 0) + end - start
+
+            if found_phi is None:
+                split["failed"] = True
+            else:
+                merge_phi_dicts(split["phis"], found_phi)
+
+        split["pending"] -= 1
+
+        if split["pending"]:
+            return
+
+        # every window is back: prune and replace the merged PHI over the whole note
+        del run.split_notes[row_index]
+        self._submit(
+            run,
+            [(row_index, split["row"])],
+            found_phi=None if split["failed"] else split["phis"],
+        )
+
+    def _collect_chunk(self, run, fut):
+        """Writes the results of a chunk, or buffers them until the rows before them are written in ordered mode."""
+        indexed_rows = run.in_flight.pop(fut)
+        dispatched = run.dispatch_order.pop(fut)
+        run.notes_in_flight -= len(indexed_rows)
+
+        # the task itself failed, e.g. with `BrokenProcessPool` when a worker died: its rows are written as the notes
+        # `handle_csv_row` could not de-identify, and recorded in `errors`
+        if fut.exception() is not None:
+            results = [self._failed_result(row) for _, row in indexed_rows]
+        else:
+            results, elapsed, pid, worker_stats = fut.result()
+            self._merge_worker_stats(worker_stats, run.cache_stats)
+
+            self._record_chunk(run.chunk_stats, indexed_rows, elapsed)
+            run.task_log.append((dispatched, indexed_rows[0][0], elapsed))
+            run.worker_chars[pid] = run.worker_chars.get(pid, 0) + sum(
+                len(row[self.note_varname]) for _, row in indexed_rows
+            )
 
-                    if verbose:
-                        chars, notes = self._display_processing_encounter(
-                            chars, notes, row, original_note
-                        )
-                        self.proc_bar.update(1)
+        for (row_index, row), result in zip(indexed_rows, results):
+            if self.preserve_order:
+                run.reorder_buffer[row_index] = (row, result)
+                run.buffer_bytes += _result_size(row, result)
+            else:
+                run.chars, run.notes = self._write_result(
+                    row, result, run.writer_deid, run.errors, run.chars, run.notes
+                )
 
-                if verbose:
-                    self.proc_bar.close()
+    def _write_ready(self, run):
+        """In ordered mode, writes out the contiguous prefix of rows that is now complete."""
+        run.peak_buffered = max(run.peak_buffered, len(run.reorder_buffer))
+        run.peak_buffer_bytes = max(run.peak_buffer_bytes, run.buffer_bytes)
 
-            if self.verbose:
-                total_time = time.time() - start_time
+        while run.next_to_write in run.reorder_buffer:
+            row, result = run.reorder_buffer.pop(run.next_to_write)
+            run.buffer_bytes -= _result_size(row, result)
+            run.chars, run.notes = self._write_result(
+                row, result, run.writer_deid, run.errors, run.chars, run.notes
+            )
+            run.next_to_write += 1
+
+    def _failed_result(self, row):
+        """The result `PHIHandler.handle_csv_row` returns for a note it could not de-identify."""
+        surrogates = [
+            {
+                "phi_start": "",
+                "phi_end": "",
+                "phi": "",
+                "surrogate_start": "",
+                "surrogate_end": "",
+                "surrogate": "",
+                "types": "",
+            }
+        ]
+
+        if self.note_id_varname is not None:
+            errors = [(row[self.encounter_id_varname], row[self.note_id_varname])]
+        elif self.encounter_id_varname is not None:
+            errors = [row[self.encounter_id_varname]]
+        else:
+            errors = []
+
+        return errors, surrogates, row[self.note_varname], {}
+
+    def _print_diagnostics(self, run):
+        total_time = time.time() - run.start_time
+        print(
+            f"""Diagnostics:
+                        - chars/s = {run.chars/total_time if total_time else 0}
+                        - s/note = {total_time/run.notes if run.notes else 0}
+                        - peak notes in flight = {run.peak_in_flight} (window of {run.max_in_flight})"""
+        )
+
+        if self.measure_ipc:
+            print(
+                f"""                        - IPC bytes/task = {run.ipc_bytes/run.tasks if run.tasks else 0}"""
+            )
+
+        if self.window_chars is not None:
+            print(
+                f"""                        - notes split into windows = {run.windowed_notes}"""
+            )
+
+        if run.broken_pools:
+            print(
+                f"""                        - worker pools restarted after a worker died = {run.broken_pools}"""
+            )
+
+        if self.handler.detection_cache is not None:
+            hits, misses, saved_time = run.cache_stats
+            print(
+                f"""                        - detection cache = {hits} hits of {hits + misses} notes ({hits / (hits + misses) if hits + misses else 0:.1%}), {saved_time} s saved"""
+            )
+
+        if self.handler.instrumentation is not None:
+            print(
+                f"""                        - {self.handler.instrumentation.report()}"""
+            )
+
+            if self.instrumentation_file is not None:
                 print(
-                    f"""Diagnostics:
-                        - chars/s = {chars/total_time}
-                        - s/note = {total_time/notes}"""
+                    f"""                        - instrumentation report = {self.instrumentation_file}"""
                 )
 
-            if len(errors) != 0:
-                print(
-                    """WARNING:
+        if self.preserve_order:
+            print(
+                f"""                        - peak reorder buffer = {run.peak_buffered} notes, {run.peak_buffer_bytes} bytes"""
+            )
+
+        print(
+            """                        - worker throughput by chunk size (notes/chunk: chunks, notes/s, chars/s):"""
+        )
+        for size in sorted(run.chunk_stats):
+            n_chunks, n_notes, n_chars, seconds = run.chunk_stats[size]
+            print(
+                f"""                            {size}: {n_chunks}, {n_notes/seconds if seconds else 0}, {n_chars/seconds if seconds else 0}"""
+            )
+
+        # replay the measured task durations on `max_workers` workers, once in the order the tasks were
+        # dispatched and once in input order, to estimate what the lookahead saved at the end of the run
+        task_log = sorted(run.task_log)
+        dispatched = _simulate_makespan(
+            [elapsed for _, _, elapsed in task_log], self.max_workers
+        )
+        task_log.sort(key=lambda task: task[1])
+        input_order = _simulate_makespan(
+            [elapsed for _, _, elapsed in task_log], self.max_workers
+        )
+        loads = run.worker_chars.values()
+        print(
+            f"""                        - tail after last dispatch = {run.tail_time} s
+                        - simulated makespan = {dispatched} s as dispatched, {input_order} s in input order
+                        - worker char load (min/max) = {min(loads, default=0)}/{max(loads, default=0)} across {len(run.worker_chars)} workers"""
+        )
+
+    def _print_errors(self, errors):
+        print(
+            """WARNING:
                         The following encounters could not be de-identified:"""
-                )
+        )
+
+        for encounter in errors:
+            if type(encounter) is tuple:
+                print(f"Encounter ID: {encounter[0]}, Note ID: {encounter[1]}")
+            else:
+                print(f"Encounter ID: {encounter}")
 
-                for encounter in errors:
-                    if type(encounter) is tuple:
-                        print(f"Encounter ID: {encounter[0]}, Note ID: {encounter[1]}")
-                    else:
-                        print(f"Encounter ID: {encounter}")
+        print("Please diagnose these encounters using `deid_string`")
 
-                print("Please diagnose these encounters using `deid_string`")
+    def _write_result(self, row, result, writer_deid, errors, chars, notes):
+        """Writes a worker's result for `row` to the output files and updates the progress bar."""
+        original_note = row[self.note_varname]
+        row_errors, surrogates, new_note, found_phis = result
+
+        errors.extend(row_errors)
+
+        start_time = time.perf_counter()
+        self._write_new_note_to_file(found_phis, surrogates, row, writer_deid, new_note)
+
+        if self.handler.instrumentation is not None:
+            self.handler.instrumentation.record(
+                "write",
+                time.perf_counter() - start_time,
+                len(surrogates) if self.return_surrogates else len(found_phis),
+            )
+
+        if self.verbose:
+            chars, notes = self._display_processing_encounter(
+                chars, notes, row, original_note
+            )
+            self.proc_bar.update(1)
+
+        return chars, notes
+
+    def _merge_worker_stats(self, worker_stats, cache_stats):
+        """Adds a task's detection cache counts to `cache_stats`, and its recorded stages to the handler's instrumentation."""
+        for i, delta in enumerate(worker_stats.get("detection_cache", ())):
+            cache_stats[i] += delta
+
+        if "stages" in worker_stats:
+            self.handler.instrumentation.merge(worker_stats["stages"])
+
+    def _chunk_capacity(self):
+        """Maximum number of notes sent to a worker in a single task."""
+        if self.chunk_size is not None:
+            return self.chunk_size
+        elif self.chunk_chars is not None:
+            return 64
+        else:
+            return 1
+
+    def _next_chunk(self, rows, limit, first_index):
+        """Pulls the next chunk of rows from the reader, paired with their input row indices.
+
+        A chunk closes once it holds `limit` notes or, when a character budget is set, once its notes reach
+        `chunk_chars` characters.
+        """
+        chunk = []
+        chunk_chars = 0
+
+        while len(chunk) < limit:
+            row = next(rows, None)
+
+            if row is None:
+                break
+
+            chunk.append((first_index + len(chunk), row))
+            chunk_chars += len(row[self.note_varname])
+
+            if self.chunk_chars is not None and chunk_chars >= self.chunk_chars:
+                break
+
+        return chunk
+
+    def _fill_lookahead(self, rows, staged, next_index):
+        """Reads rows into the lookahead heap until it holds `lookahead` notes.
+
+        Returns the index of the next row to be read and whether the reader is exhausted.
+        """
+        while len(staged) < self.lookahead:
+            row = next(rows, None)
+
+            if row is None:
+                return next_index, True
+
+            heapq.heappush(staged, (-len(row[self.note_varname]), next_index, row))
+            next_index += 1
+
+        return next_index, False
+
+    def _next_longest_chunk(self, staged, limit):
+        """Pops the longest staged notes into a chunk, closing it the same way as `_next_chunk`."""
+        chunk = []
+        chunk_chars = 0
+
+        while staged and len(chunk) < limit:
+            neg_length, index, row = heapq.heappop(staged)
+            chunk.append((index, row))
+            chunk_chars -= neg_length
+
+            if self.chunk_chars is not None and chunk_chars >= self.chunk_chars:
+                break
+
+        return chunk
+
+    def _pop_earliest(self, staged):
+        """Removes the staged row with the lowest input index from the lookahead heap."""
+        earliest = min(range(len(staged)), key=lambda i: staged[i][1])
+        _, index, row = staged[earliest]
+        staged[earliest] = staged[-1]
+        staged.pop()
+        heapq.heapify(staged)
+
+        return index, row
+
+    def _submit_chunk(self, pool, chunk, found_phi=None):
+        """Submits a chunk of rows to the pool, returning its future and the size of the pickled task payload, or 0 if
+        it is not measured.
+
+        `found_phi` is the PHI merged from the windows of a long note, for a chunk holding only that note.
+        """
+        task_args = (
+            chunk,
+            self.encounter_id_varname,
+            self.note_id_varname,
+            self.note_varname,
+            found_phi,
+        )
+
+        if self.resident_handler:
+            fut = pool.submit(_resident_chunk_worker, *task_args)
+        else:
+            fut = pool.submit(_chunk_worker, self.handler, *task_args)
+
+        # pickling the payload a second time only to measure it is opt-in, see `set_multithreading(measure_ipc=...)`
+        task_bytes = (
+            len(pickle.dumps(task_args, pickle.HIGHEST_PROTOCOL))
+            if self.measure_ipc
+            else 0
+        )
+
+        return fut, task_bytes
+
+    def _submit_window(self, pool, row, window, note_facts):
+        """Submits the search for PHI in one window of a long note, returning its future and the size of the task payload,
+        or 0 if it is not measured.
+
+        Only the window's slice of the note, the facts about the whole note it depends on (see `PHIFinder.note_facts`) and
+        the encounter id are sent, rather than the whole row.
+        """
+        start, end, _, _ = window
+        task_args = (
+            row[self.note_varname][start:end],
+            window,
+            note_facts,
+            row[self.encounter_id_varname],
+        )
+
+        if self.resident_handler:
+            fut = pool.submit(_resident_window_worker, *task_args)
+        else:
+            fut = pool.submit(_window_worker, self.handler, *task_args)
+
+        # pickling the payload a second time only to measure it is opt-in, see `set_multithreading(measure_ipc=...)`
+        task_bytes = (
+            len(pickle.dumps(task_args, pickle.HIGHEST_PROTOCOL))
+            if self.measure_ipc
+            else 0
+        )
+
+        return fut, task_bytes
+
+    def _record_chunk(self, chunk_stats, indexed_rows, elapsed):
+        """Accumulates chunk count, notes, characters and worker seconds for the chunk's size."""
+        stats = chunk_stats.setdefault(len(indexed_rows), [0, 0, 0, 0.0])
+        stats[0] += 1
+        stats[1] += len(indexed_rows)
+        stats[2] += sum(len(row[self.note_varname]) for _, row in indexed_rows)
+        stats[3] += elapsed
 
     def _display_processing_encounter(self, chars, notes, row, original_note):
         if self.verbose:
@@ -155,10 +683,6 @@ class Deidentifier:
     def _write_to_file(self, items, row):
 
         if self.phi_output_file_type == "csv":
-            with open(self.phi_output_file, "r", newline="") as out:
-                reader = csv.DictReader(out)
-                fields = reader.fieldnames
-
             for d in items:
                 if self.note_id_varname is not None:
                     if d.get("note_id") is None:
@@ -170,13 +694,218 @@ class Deidentifier:
                     if d.get("encounter_id") is None:
                         d.setdefault("encounter_id", row[self.encounter_id_varname])
 
-            with open(self.phi_output_file, "a", newline="") as write_file:
-                writer = csv.DictWriter(write_file, fieldnames=fields)
-                for d in items:
-                    writer.writerow(d)
+            self._phi_buffer.extend(items)
 
+            if len(self._phi_buffer) >= self.phi_flush_interval:
+                self._flush_phi_buffer()
 
-def _worker(handler, row, errors, encounter_id_varname, note_id_varname, note_varname):
+    def _open_phi_writer(self, f_phi):
+        """Creates the PHI writer that is kept open for the whole run.
+
+        The fieldnames come from the header written by the builder, and are only read back from the PHI output file
+        if the builder did not record them.
+        """
+        fields = self.phi_fieldnames
+
+        if fields is None:
+            with open(self.phi_output_file, "r", newline="") as out:
+                fields = csv.DictReader(out).fieldnames
+
+        self._phi_writer = csv.DictWriter(f_phi, fieldnames=fields)
+        self._phi_buffer = []
+
+    def _flush_phi_buffer(self):
+        self._phi_writer.writerows(self._phi_buffer)
+        self._phi_buffer = []
+
+
+class _CsvRun:
+    """The state of one `Deidentifier._run_on_csv`: the tasks in flight, the rows waiting to be dispatched or written,
+    and the counts reported in the diagnostics."""
+
+    def __init__(self, writer_deid, max_in_flight):
+        self.writer_deid = writer_deid
+        self.max_in_flight = max_in_flight
+        self.pool = None
+        self.handler_bytes = 0
+        self.broken_pools = 0
+
+        self.chars = 0
+        self.notes = 0
+        self.start_time = time.time()
+        self.errors = []
+
+        # chunk futures with the rows they hold, paired with their input row indices
+        self.in_flight = {}
+        self.notes_in_flight = 0
+        self.peak_in_flight = 0
+        self.ipc_bytes = 0
+        self.tasks = 0
+        self.chunk_stats = {}
+        self.task_log = []
+        self.dispatch_order = {}
+        self.worker_chars = {}
+
+        # long notes are split into windows that are searched for PHI in parallel; `split_notes` collects the
+        # PHI found in each window until all of them are back, and the note is then pruned and replaced whole
+        self.window_futures = {}
+        self.split_notes = {}
+        self.windowed_notes = 0
+
+        # hits, misses and seconds saved by the detection cache, summed over the chunks of every worker
+        self.cache_stats = [0, 0, 0.0]
+
+        self.next_index = 0
+        self.exhausted = False
+        self.reader_exhausted = False
+        self.drained_time = None
+        self.tail_time = 0
+
+        # with a lookahead, rows are staged in a max-heap on note length and dispatched longest first
+        self.staged = []
+
+        # in ordered mode, results that complete ahead of an earlier row wait here, keyed by their
+        # input row index, until every row before them has been written
+        self.reorder_buffer = {}
+        self.buffer_bytes = 0
+        self.peak_buffered = 0
+        self.peak_buffer_bytes = 0
+        self.next_to_write = 0
+
+
+# handler installed in each pool process by `_init_worker`, so tasks only need to carry the row
+_worker_handler = None
+
+
+def _init_worker(handler):
+    global _worker_handler
+    _worker_handler = handler
+
+    # a forked worker inherits the records the main process made before the pool started
+    if handler.instrumentation is not None:
+        handler.instrumentation.drain()
+
+
+def _worker(
+    handler,
+    row,
+    errors,
+    encounter_id_varname,
+    note_id_varname,
+    note_varname,
+    found_phi=None,
+):
     return handler.handle_csv_row(
-        row, errors, encounter_id_varname, note_id_varname, note_varname
+        row, errors, encounter_id_varname, note_id_varname, note_varname, found_phi
+    )
+
+
+def _chunk_worker(
+    handler, rows, encounter_id_varname, note_id_varname, note_varname, found_phi=None
+):
+    """De-identifies a list of rows, returning their results in order, the time spent on them, the worker's pid and its
+    statistics on these rows (see `_worker_stats`)."""
+    start_time = time.perf_counter()
+    cache = handler.detection_cache
+    cache_before = cache.stats() if cache is not None else None
+
+    results = [
+        _worker(
+            handler,
+            row,
+            [],
+            encounter_id_varname,
+            note_id_varname,
+            note_varname,
+            found_phi,
+        )
+        for row in rows
+    ]
+
+    elapsed = time.perf_counter() - start_time
+
+    return results, elapsed, os.getpid(), _worker_stats(handler, cache_before)
+
+
+def _resident_chunk_worker(
+    rows, encounter_id_varname, note_id_varname, note_varname, found_phi=None
+):
+    return _chunk_worker(
+        _worker_handler,
+        rows,
+        encounter_id_varname,
+        note_id_varname,
+        note_varname,
+        found_phi,
     )
+
+
+def _window_worker(handler, text, window, note_facts, encounter_id):
+    """Finds the PHI in one window of a long note, returning it with the time spent, the worker's pid and its statistics."""
+    start_time = time.perf_counter()
+
+    found_phi = handler.find_in_window(text, window, note_facts, encounter_id)
+
+    return (
+        found_phi,
+        time.perf_counter() - start_time,
+        os.getpid(),
+        _worker_stats(handler),
+    )
+
+
+def _resident_window_worker(text, window, note_facts, encounter_id):
+    return _window_worker(_worker_handler, text, window, note_facts, encounter_id)
+
+
+def _worker_stats(handler, cache_before=None):
+    """The hits, misses and seconds saved by the detection cache since `cache_before`, and the stages the instrumentation
+    recorded since the worker's last task, for those the handler has."""
+    stats = {}
+
+    if handler.detection_cache is not None and cache_before is not None:
+        stats["detection_cache"] = tuple(
+            after - before
+            for after, before in zip(handler.detection_cache.stats(), cache_before)
+        )
+
+    if handler.instrumentation is not None:
+        stats["stages"] = handler.instrumentation.drain()
+
+    return stats
+
+
+def _timed_rows(rows, instrumentation):
+    """Yields the rows of the reader, recording the time spent reading each one as the "read" stage."""
+    while True:
+        start_time = time.perf_counter()
+        row = next(rows, None)
+
+        if row is None:
+            return
+
+        instrumentation.record("read", time.perf_counter() - start_time)
+
+        yield row
+
+
+def _result_size(row, result):
+    """Approximate memory held by a buffered result: the row's fields plus the de-identified note and PHI."""
+    _, surrogates, new_note, found_phis = result
+
+    return (
+        sum(sys.getsizeof(value) for value in row.values())
+        + sys.getsizeof(new_note)
+        + sys.getsizeof(surrogates)
+        + sys.getsizeof(found_phis)
+    )
+
+
+def _simulate_makespan(durations, workers):
+    """Time to run tasks of the given durations, in order, on `workers` workers that each take the next task when free."""
+    finish_times = [0.0] * workers
+
+    for duration in durations:
+        heapq.heapreplace(finish_times, finish_times[0] + duration)
+
+    return max(finish_times)
@@ -1,2 +1,5 @@
 from .pyDeid import pyDeid
-from .pyDeid import deid_string
\ No newline at end of file
+from .pyDeid import deid_string
+from .DeidEngine import DeidEngine
+from .DeidEngine import NoteError
+from .AsyncDeidEngine import AsyncDeidEngine
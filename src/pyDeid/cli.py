@@ -1,5 +1,6 @@
 from .pyDeidBuilder import pyDeidBuilder
 import os
+import sys
 import argparse
 from .phi_types.utils import CustomRegex
 from typing import *
@@ -8,6 +9,12 @@ import importlib.util
 
 if __name__ == "__main__":
 
+    if sys.argv[1:2] == ["serve"]:
+        from .serve import main
+
+        main(sys.argv[2:])
+        sys.exit()
+
     def str_to_bool(value):
         if value.lower() == "true":
             return True
@@ -15,7 +22,8 @@ if __name__ == "__main__":
             return False
 
     parser = argparse.ArgumentParser(
-        description="PyDeid tool to sensitize Personal Health Information"
+        description="PyDeid tool to sensitize Personal Health Information",
+        epilog="To serve de-identification over HTTP instead, run `python -m pyDeid.cli serve --help`.",
     )
 
     parser.add_argument(
@@ -1,5 +1,7 @@
 from .PHITypeFinder import PHI, PHITypeFinder
 from .utils import is_unambig_common
+from .Gazetteer import Gazetteer
+from .PatternRegistry import PatternRegistry
 import re
 
 
@@ -37,30 +39,46 @@ class AddressPHIFinder(PHITypeFinder):
         "RD",
     ]
 
-    def __init__(self, local_places_unambig: list[str] = None):
-        super().__init__()
+    def __init__(self, local_places_unambig: list[str] = None, gazetteer: Gazetteer = None, registry: PatternRegistry = None):
+        super().__init__(registry)
         if local_places_unambig is None:
             self.local_places_unambig = []
         else:
             self.local_places_unambig = local_places_unambig
 
+        self.gazetteer = gazetteer if gazetteer is not None else Gazetteer()
+
+        for place in self.local_places_unambig:
+            self.gazetteer.add(place, "Location (un)")
+
+        compile = self.registry.compile
+
+        self.strict_street_patterns = [
+            compile(r"\b(([0-9]+ +)?(([A-Za-z\.\']+) +)?([A-Za-z\.\']+) +\b" + suff + r"\.?\b)\b")
+            for suff in self.strict_street_add_suff
+        ]
+        self.apt_indicator_patterns = [compile(r"^\b(" + ind + r"\.?\#? +[\w]+)\b") for ind in self.apt_indicators]
+        self.street_patterns = [
+            compile(r"\b(([0-9]+) +(([A-Za-z]+) +)?([A-Za-z]+) +" + suff + r")\b", re.IGNORECASE)
+            for suff in self.street_add_suff
+        ]
+
     def find(self):
         phi = {}
 
-        for place in self.local_places_unambig:
-            for m in re.finditer(place, self.note, re.IGNORECASE):
-                phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append("Location (un)")
+        for key in self.gazetteer.find(self.note, "Location (un)"):
+            phi.setdefault(key, []).append("Location (un)")
 
-        for suff in self.strict_street_add_suff:
-            for m in re.finditer(r"\b(([0-9]+ +)?(([A-Za-z\.\']+) +)?([A-Za-z\.\']+) +\b" + suff + r"\.?\b)\b", self.note):
+        for strict_street_pattern in self.strict_street_patterns:
+            for m in strict_street_pattern.finditer(self.note):
                 start = m.start()
                 end = m.end()
 
                 next_seg = self.note[end:]
 
-                for ind in self.apt_indicators:
+                for apt_indicator_pattern in self.apt_indicator_patterns:
 
-                    apt = re.search(r"^\b(" + ind + r"\.?\#? +[\w]+)\b", next_seg)
+                    apt = apt_indicator_pattern.search(next_seg)
 
                     if apt:
                         end = end + apt.end()
@@ -72,8 +90,8 @@ class AddressPHIFinder(PHITypeFinder):
                 elif not (is_unambig_common(m.group(4)) or is_unambig_common(m.group(5))):
                     phi.setdefault(PHI(start, end, self.note[start:end]), []).append("Street Address")
 
-        for suff in self.street_add_suff:
-            for m in re.finditer(r"\b(([0-9]+) +(([A-Za-z]+) +)?([A-Za-z]+) +" + suff + r")\b", self.note, re.IGNORECASE):
+        for street_pattern in self.street_patterns:
+            for m in street_pattern.finditer(self.note):
 
                 if m.group(3) is not None and len(m.group(3)) == 0:
                     if is_unambig_common(m.group(5)):
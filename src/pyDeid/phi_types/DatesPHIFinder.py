@@ -3,6 +3,7 @@ import re
 from typing import List
 from .PHITypeFinder import PHI, PHITypeFinder, PHIDict
 from .utils import is_probably_measurement, merge_phi_dicts
+from .PatternRegistry import PatternRegistry
 
 Date = namedtuple("Date", ["date_string", "day", "month", "year"])
 Time = namedtuple("Time", ["time_string", "hours", "minutes", "seconds", "meridiem"])
@@ -62,8 +63,9 @@ class DatesPHIFinder(PHITypeFinder):
         valid_year_high=2999,
         invalid_time_pre_words: List[str] = None,
         invalid_time_post_words: List[str] = None,
+        registry: PatternRegistry = None,
     ):
-        super().__init__()
+        super().__init__(registry)
         self.two_digit_threshold = two_digit_threshold
         self.valid_year_low = valid_year_low
         self.valid_year_high = valid_year_high
@@ -74,6 +76,159 @@ class DatesPHIFinder(PHITypeFinder):
             invalid_time_post_words if invalid_time_post_words is not None else []
         )
 
+        compile = self.registry.compile
+
+        self.not_date_pre_words = compile(
+            r"\b(drop|up|cc|dose|doses|range|ranged|pad|rate|bipap|pap|unload|ventilation|scale|cultures|blood|at|up|with|in|of|RR|ICP|CVP|strength|PSV|SVP|PCWP|PCW|BILAT|SRR|VENT|PEEP\/PS|flowby|drinks|stage) ?",
+            re.IGNORECASE,
+        )
+        self.not_date_post_words = compile(
+            r" ?(packs|litres|puffs|mls|liters|L|pts|patients|range|psv|scale|beers|per|esophagus|tabs|tablets|systolic|sem|strength|hours|pts|times|drop|up|cc|mg|\/hr|\/hour|mcg|ug|mm|PEEP|hr|hrs|hour|hours|bottles|bpm|ICP|CPAP|years|days|weeks|min|mins|minutes|seconds|months|mons|cm|mm|m|sessions|visits|episodes|drops|breaths|wbcs|beat|beats|ns|units|amp|qd|chest pain|intensity)\b",
+            re.IGNORECASE,
+        )
+        self.holiday_pattern = compile(
+            r"\bchristmas|thanksgiving|easter|hanukkah|rosh hashanah|ramadan|victoria day|canada day|labour day\b"
+        )
+        self.month_day_year_pattern = compile(
+            r"\b(\d\d?)[\-\/\.](\d\d?)[\-\/\.](\d\d|\d{4})\b"
+        )
+        self.double_bar = compile(r"(\|\|)")
+        self.digit_separator_pattern = compile(r"\d[\/\.\-]")
+        self.percent_or_slash = compile(r"[\%\/]")
+        self.nonspace_digit = compile(r"\S\d")
+        self.day_month_year_pattern = compile(
+            r"\b(\d\d?)[\-\/](\d\d?)[\-\/](\d\d|\d{4})\b"
+        )
+        self.year_month_day_pattern = compile(
+            r"\b(\d\d|\d{4})[\-\/\.](\d\d?)[\-\/\.](\d\d?)\b"
+        )
+        self.header_prefix = compile(r"(\d)(\s)?(\|)(\s)?")
+        self.header_suffix = compile(r"\s\d{2}\:\d{2}\:\d{2}(\s)?(\|)")
+        self.year_day_month_pattern = compile(
+            r"\b(\d\d|\d{4})[\-\/](\d\d?)[\-\/](\d\d?)\b"
+        )
+        self.month_year_pattern = compile(r"\b((\d\d?)[\-\/](\d{4}))")
+        self.slash_dot_or_percent = compile(r"[\/\.\%]")
+        self.year_month_pattern = compile(r"\b((\d{4})[\-\/](\d\d?))\b")
+        self.date_range_1_pattern = compile(r"\b((\d\d?)\/(\d\d?)\-(\d\d?)\/(\d\d?))\b")
+        self.date_range_2_pattern = compile(
+            r"\b((\d\d?)\/(\d\d?)\/(\d\d|\d\d\d\d)\-(\d\d?)\/(\d\d?)\/(\d\d|\d\d\d\d))\b"
+        )
+        self.date_range_3_pattern = compile(
+            r"\b((\d\d?)\/(\d\d?)\-(\d\d?)\/(\d\d?)\/(\d\d|\d\d\d\d))\b"
+        )
+        self.month_day_with_context_pattern = compile(
+            r"\b([A-Za-z0-9%\/]+ +)?((\d\d?)([\/\-])(\d\d?))\/?\/?( +[A-Za-z]+)?\b"
+        )
+        self.month_day_pre_words = compile(r"\b(cvp|noc|\%|RR|PCW)", re.IGNORECASE)
+        self.persantine = compile(r"\bpersantine\b", re.IGNORECASE)
+        self.percent = compile(r"[\%]")
+        self.psv = compile(r"\bPSV? ", re.IGNORECASE)
+        self.day_5_pre_words = compile(
+            r"\b(CPAP|PS|range|bipap|pap|pad|rate|unload|ventilation|scale|strength|drop|up|cc|rr|cvp|at|up|in|with|ICP|PSV|of) ",
+            re.IGNORECASE,
+        )
+        self.hour = compile(r" ?hour\b", re.IGNORECASE)
+        self.day_2_pre_words = compile(
+            r"\b(with|drop|bipap|pap|range|pad|rate|unload|ventilation|scale|strength|up|cc|rr|cvp|at|up|with|in|ICP|PSV|of) ",
+            re.IGNORECASE,
+        )
+        self.hr = compile(r" ?hr\b", re.IGNORECASE)
+        self.two_digit_year_pattern = compile(
+            r"\b((embolus|mi|mvr|REDO|pacer|ablation|cabg|avr|x2|x3|CHOLECYSTECTOMY|cva|ca|PTC|PTCA|stent|since|surgery|year) + *(\')?)(\d\d)(\.\d)?((\.|\:)\d{1,2})?\b",
+            re.IGNORECASE,
+        )
+        self.four_digit_year_pattern = compile(
+            r"\b((embolus|mi|mvr|REDO|pacer|ablation|cabg|x2|x3|CHOLECYSTECTOMY|cva|ca|in|PTCA|since|from|year) + *)(\d{4})((\,? )(\d{4}))?\b",
+            re.IGNORECASE,
+        )
+        self.military_time_pattern = compile(
+            r"\b( *)((\d{4}) *)(hours|hr|hrs|h)\b", re.IGNORECASE
+        )
+        self.time_pattern = compile(
+            r"(([A-Za-z0-9%\/]+)\s[A-Za-z0-9%\/]+\s+)?(((\d\d?)\:(\d{2})(\:(\d\d))?)(\s)?(am|pm|p.m.|a.m.)?)( *([A-Za-z]+)\s+)?",
+            re.IGNORECASE,
+        )
+        self.monthly_pattern = compile(
+            r"\b(every )((\d|\d{2})(nd|st|th|rd)?(( month)?( +)of( +))? ?\,?( ?)\'?(\d{2}|\d{4}))\b",
+            re.IGNORECASE,
+        )
+
+        # patterns built from each month and season name
+        self.month_patterns = {
+            month: {
+                "day_month_year": compile(
+                    r"\b((\d{1,2})[ \-]?" + month + r"[ \-\,]? ?\'?(\d{2,4}))\b",
+                    re.IGNORECASE,
+                ),
+                "month_day_year": compile(
+                    r"\b("
+                    + month
+                    + r"[ \-]? ?((\d{1,2})[ \-]?[ \-\,]? ?\'?(\d{4})))\b",
+                    re.IGNORECASE,
+                ),
+                "month_day_short_year": compile(
+                    r"\b(" + month + r"\b\.? (\d{1,2})[\,\s]+ *\'?(\d{2,4}))\b",
+                    re.IGNORECASE,
+                ),
+                "month_day_ordinal_year": compile(
+                    r"\b("
+                    + month
+                    + r"\b\.?,?\s*?(\d{1,2})(|st|nd|rd|th|) ?[\,\s]+ *\'?(\d{2,4}))\b",
+                    re.IGNORECASE,
+                ),
+                "month_day": compile(
+                    r"\b(" + month + r"\b\.?,?\s*(\d{1,2})(|st|nd|rd|th|)?)\b",
+                    re.IGNORECASE,
+                ),
+                "day_of_month": compile(
+                    r"\b((\d{1,2})(|st|nd|rd|th|)?( of)?[ \-]\b" + month + r")\b",
+                    re.IGNORECASE,
+                ),
+                "day_of_month_year": compile(
+                    r"\b(((\d{1,2})(|st|nd|rd|th|)?\s+(of\s)?[\-]?\b("
+                    + month
+                    + r")\.?,?)\s+(\d{2,4}))\b",
+                    re.IGNORECASE,
+                ),
+                "month_of_year": compile(
+                    r"\b(" + month + r"\.?,? ?(of )?(\d{2}\d{2}?))\b", re.IGNORECASE
+                ),
+                "date_range_4": compile(
+                    r"\b((\d{1,2}) ?(\-|to|through|\-\>)+ ?(\d{1,2})[ \-]?"
+                    + month
+                    + r"[ \-\,]? ?\'?\d{2,4})\b",
+                    re.IGNORECASE,
+                ),
+                "date_range_5": compile(
+                    r"\b("
+                    + month
+                    + r"\b\.? (\d{1,2}) ?(\-|to|through|\-\>)+ ?(\d{1,2})[\,\s]+ *\'?\d{2,4})\b",
+                    re.IGNORECASE,
+                ),
+                "date_range_6": compile(
+                    r"\b("
+                    + month
+                    + r"\b\.?,? ?(\d{1,2})(|st|nd|rd|th|)? ?(\-|to|through|\-\>)+ ?(\d{1,2})(|st|nd|rd|th|)?)\b",
+                    re.IGNORECASE,
+                ),
+                "date_range_7": compile(
+                    r"\b((\d{1,2})(|st|nd|rd|th|)? ?(\-|to|through|\-\>)+ ?(\d{1,2})(|st|nd|rd|th|)?( of)?[ \-]\b"
+                    + month
+                    + r")\b",
+                    re.IGNORECASE,
+                ),
+            }
+            for month in self.months
+        }
+        self.season_year_patterns = [
+            compile(
+                r"\b((" + season + r")(( +)of( +))? ?\,?( ?)\'?(\d{2}|\d{4}))\b",
+                re.IGNORECASE,
+            )
+            for season in self.seasons
+        ]
+
     def find(self, text: str) -> PHIDict:
         phi = {}
         merge_phi_dicts(phi, self.date(text))
@@ -204,26 +359,15 @@ class DatesPHIFinder(PHITypeFinder):
     def __is_probably_date(self, string_before: str, string_after: str):
         if (
             not is_probably_measurement(string_before)
-            and not re.search(
-                r"\b(drop|up|cc|dose|doses|range|ranged|pad|rate|bipap|pap|unload|ventilation|scale|cultures|blood|at|up|with|in|of|RR|ICP|CVP|strength|PSV|SVP|PCWP|PCW|BILAT|SRR|VENT|PEEP\/PS|flowby|drinks|stage) ?",
-                string_before,
-                re.IGNORECASE,
-            )
-            and not re.search(
-                r" ?(packs|litres|puffs|mls|liters|L|pts|patients|range|psv|scale|beers|per|esophagus|tabs|tablets|systolic|sem|strength|hours|pts|times|drop|up|cc|mg|\/hr|\/hour|mcg|ug|mm|PEEP|hr|hrs|hour|hours|bottles|bpm|ICP|CPAP|years|days|weeks|min|mins|minutes|seconds|months|mons|cm|mm|m|sessions|visits|episodes|drops|breaths|wbcs|beat|beats|ns|units|amp|qd|chest pain|intensity)\b",
-                string_after,
-                re.IGNORECASE,
-            )
+            and not self.not_date_pre_words.search(string_before)
+            and not self.not_date_post_words.search(string_after)
         ):
             return True
         return False
 
     def holiday(self, text: str):
         phi = {}
-        for m in re.finditer(
-            r"\bchristmas|thanksgiving|easter|hanukkah|rosh hashanah|ramadan|victoria day|canada day|labour day\b",
-            text,
-        ):
+        for m in self.holiday_pattern.finditer(text):
             phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append("Holiday")
         return phi
 
@@ -231,7 +375,7 @@ class DatesPHIFinder(PHITypeFinder):
         phi = {}
 
         # month/day/year
-        for m in re.finditer(r"\b(\d\d?)[\-\/\.](\d\d?)[\-\/\.](\d\d|\d{4})\b", text):
+        for m in self.month_day_year_pattern.finditer(text):
             start = m.start()
             end = m.end()
 
@@ -250,13 +394,13 @@ class DatesPHIFinder(PHITypeFinder):
             string_after = text[end : (end + 2)]
 
             if not (
-                re.search(r"(\|\|)", string_before)
-                or re.search(r"(\|\|)", string_after)
+                self.double_bar.search(string_before)
+                or self.double_bar.search(string_after)
             ):
                 if not (
-                    re.search(r"\d[\/\.\-]", string_before)
-                    or re.search(r"[\%\/]", string_after)
-                    or re.search(r"\S\d", string_after)
+                    self.digit_separator_pattern.search(string_before)
+                    or self.percent_or_slash.search(string_after)
+                    or self.nonspace_digit.search(string_after)
                 ):
                     if self.__is_valid_date(date_key):
                         phi.setdefault(PHI(start, end, date_key), []).append(
@@ -264,7 +408,7 @@ class DatesPHIFinder(PHITypeFinder):
                         )
 
         # day/month/year
-        for m in re.finditer(r"\b(\d\d?)[\-\/](\d\d?)[\-\/](\d\d|\d{4})\b", text):
+        for m in self.day_month_year_pattern.finditer(text):
             start = m.start()
             end = m.end()
 
@@ -283,9 +427,9 @@ class DatesPHIFinder(PHITypeFinder):
             string_after = text[end : (end + 2)]
 
             if not (
-                re.search(r"\d[\/\.\-]", string_before)
-                or re.search(r"[\%\/]", string_after)
-                or re.search(r"\S\d", string_after)
+                self.digit_separator_pattern.search(string_before)
+                or self.percent_or_slash.search(string_after)
+                or self.nonspace_digit.search(string_after)
             ):
                 if self.__is_valid_date(date_key):
                     phi.setdefault(PHI(start, end, date_key), []).append(
@@ -293,7 +437,7 @@ class DatesPHIFinder(PHITypeFinder):
                     )
 
         # year/month/day
-        for m in re.finditer(r"\b(\d\d|\d{4})[\-\/\.](\d\d?)[\-\/\.](\d\d?)\b", text):
+        for m in self.year_month_day_pattern.finditer(text):
             start = m.start()
             end = m.end()
 
@@ -312,9 +456,9 @@ class DatesPHIFinder(PHITypeFinder):
             string_after = text[end : (end + 2)]
 
             if not (
-                re.search(r"(\|\|)", string_before)
-                or re.search(r"(\|\|)", string_after)
-                or (re.search(r"\S\d", string_after))
+                self.double_bar.search(string_before)
+                or self.double_bar.search(string_after)
+                or (self.nonspace_digit.search(string_after))
             ):
                 if self.__is_valid_date(date_key) and (
                     (int(year) > 50) or (int(year) < 6)
@@ -322,9 +466,9 @@ class DatesPHIFinder(PHITypeFinder):
                     prev_chars = text[(start - 4) : start]
                     next_chars = text[end : (end + 11)]
 
-                    if re.search(r"(\d)(\s)?(\|)(\s)?", prev_chars) and re.search(
-                        r"\s\d{2}\:\d{2}\:\d{2}(\s)?(\|)", next_chars
-                    ):
+                    if self.header_prefix.search(
+                        prev_chars
+                    ) and self.header_suffix.search(next_chars):
                         phi.setdefault(PHI(start, end, date_key), []).append(
                             "Header Date"
                         )
@@ -335,7 +479,7 @@ class DatesPHIFinder(PHITypeFinder):
                         )
 
         # year/day/month
-        for m in re.finditer(r"\b(\d\d|\d{4})[\-\/](\d\d?)[\-\/](\d\d?)\b", text):
+        for m in self.year_day_month_pattern.finditer(text):
             start = m.start()
             end = m.end()
 
@@ -354,9 +498,9 @@ class DatesPHIFinder(PHITypeFinder):
             string_after = text[end : (end + 2)]
 
             if not (
-                re.search(r"(\|\|)", string_before)
-                or re.search(r"(\|\|)", string_after)
-                or (re.search(r"\S\d", string_after))
+                self.double_bar.search(string_before)
+                or self.double_bar.search(string_after)
+                or (self.nonspace_digit.search(string_after))
             ):
                 if self.__is_valid_date(date_key) and (
                     (int(year) > 50) or (int(year) < 6)
@@ -364,9 +508,9 @@ class DatesPHIFinder(PHITypeFinder):
                     prev_chars = text[(start - 4) : start]
                     next_chars = text[end : (end + 11)]
 
-                    if re.search(r"(\d)(\s)?(\|)(\s)?", prev_chars) and re.search(
-                        r"\s\d{2}\:\d{2}\:\d{2}(\s)?(\|)", next_chars
-                    ):
+                    if self.header_prefix.search(
+                        prev_chars
+                    ) and self.header_suffix.search(next_chars):
                         phi.setdefault(PHI(start, end, date_key), []).append(
                             "Header Date"
                         )
@@ -376,7 +520,7 @@ class DatesPHIFinder(PHITypeFinder):
                         )
 
         # mm/yyyy
-        for m in re.finditer(r"\b((\d\d?)[\-\/](\d{4}))", text):
+        for m in self.month_year_pattern.finditer(text):
             start = m.start()
             end = m.end()
 
@@ -387,13 +531,13 @@ class DatesPHIFinder(PHITypeFinder):
             string_after = text[end : (end + 2)]
 
             if not (
-                re.search(r"(\|\|)", string_before)
-                or re.search(r"(\|\|)", string_after)
+                self.double_bar.search(string_before)
+                or self.double_bar.search(string_after)
             ):
 
                 if not (
-                    re.search(r"\d[\/\.\-]", string_before)
-                    or re.search(r"[\/\.\%]", string_after)
+                    self.digit_separator_pattern.search(string_before)
+                    or self.slash_dot_or_percent.search(string_after)
                 ):
 
                     if self.__is_valid_month(month) and self.__is_valid_year(year):
@@ -403,7 +547,7 @@ class DatesPHIFinder(PHITypeFinder):
                         )
 
         # yyyy/mm
-        for m in re.finditer(r"\b((\d{4})[\-\/](\d\d?))\b", text):
+        for m in self.year_month_pattern.finditer(text):
             start = m.start()
             end = m.end()
 
@@ -414,13 +558,13 @@ class DatesPHIFinder(PHITypeFinder):
             string_after = text[end : (end + 2)]
 
             if not (
-                re.search(r"(\|\|)", string_before)
-                or re.search(r"(\|\|)", string_after)
+                self.double_bar.search(string_before)
+                or self.double_bar.search(string_after)
             ):
 
                 if not (
-                    re.search(r"\d[\/\.\-]", string_before)
-                    or re.search(r"[\/\.\%]", string_after)
+                    self.digit_separator_pattern.search(string_before)
+                    or self.slash_dot_or_percent.search(string_after)
                 ):
 
                     if self.__is_valid_month(month) and self.__is_valid_year(year):
@@ -429,13 +573,9 @@ class DatesPHIFinder(PHITypeFinder):
                             "Year/Month 1 [yy(yy)/mm]"
                         )
 
-        for month in self.months:
+        for month, patterns in self.month_patterns.items():
             # 2-May-04
-            for m in re.finditer(
-                r"\b((\d{1,2})[ \-]?" + month + r"[ \-\,]? ?\'?(\d{2,4}))\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in patterns["day_month_year"].finditer(text):
                 day = m.group(2)
                 year = m.group(3)
 
@@ -446,11 +586,7 @@ class DatesPHIFinder(PHITypeFinder):
                     )
 
             # May-02-2004
-            for m in re.finditer(
-                r"\b(" + month + r"[ \-]? ?((\d{1,2})[ \-]?[ \-\,]? ?\'?(\d{4})))\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in patterns["month_day_year"].finditer(text):
                 day = m.group(3)
                 year = m.group(4)
 
@@ -461,11 +597,7 @@ class DatesPHIFinder(PHITypeFinder):
                     )
 
             # Apr. 2 05
-            for m in re.finditer(
-                r"\b(" + month + r"\b\.? (\d{1,2})[\,\s]+ *\'?(\d{2,4}))\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in patterns["month_day_short_year"].finditer(text):
                 day = m.group(2)
                 year = m.group(3)
 
@@ -476,13 +608,7 @@ class DatesPHIFinder(PHITypeFinder):
                     )
 
             # Apr. 12th 2000
-            for m in re.finditer(
-                r"\b("
-                + month
-                + r"\b\.?,?\s*?(\d{1,2})(|st|nd|rd|th|) ?[\,\s]+ *\'?(\d{2,4}))\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in patterns["month_day_ordinal_year"].finditer(text):
                 day = m.group(2)
                 year = m.group(4)
 
@@ -493,11 +619,7 @@ class DatesPHIFinder(PHITypeFinder):
                     )
 
             # Apr. 12th
-            for m in re.finditer(
-                r"\b(" + month + r"\b\.?,?\s*(\d{1,2})(|st|nd|rd|th|)?)\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in patterns["month_day"].finditer(text):
                 day = m.group(2)
 
                 if self.__is_valid_day(day):
@@ -507,11 +629,7 @@ class DatesPHIFinder(PHITypeFinder):
                     )
 
             # 12th of April
-            for m in re.finditer(
-                r"\b((\d{1,2})(|st|nd|rd|th|)?( of)?[ \-]\b" + month + r")\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in patterns["day_of_month"].finditer(text):
                 day = m.group(2)
 
                 if self.__is_valid_day(day):
@@ -521,13 +639,7 @@ class DatesPHIFinder(PHITypeFinder):
                     )
 
             # 12th of April. 2005
-            for m in re.finditer(
-                r"\b(((\d{1,2})(|st|nd|rd|th|)?\s+(of\s)?[\-]?\b("
-                + month
-                + r")\.?,?)\s+(\d{2,4}))\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in patterns["day_of_month_year"].finditer(text):
                 day = m.group(3)
                 year = m.group(7)
 
@@ -538,9 +650,7 @@ class DatesPHIFinder(PHITypeFinder):
                     )
 
             # Apr. of 2002
-            for m in re.finditer(
-                r"\b(" + month + r"\.?,? ?(of )?(\d{2}\d{2}?))\b", text, re.IGNORECASE
-            ):
+            for m in patterns["month_of_year"].finditer(text):
                 year = m.group(3)
                 date_key = Date(m.group(), None, month, year)
 
@@ -554,7 +664,7 @@ class DatesPHIFinder(PHITypeFinder):
         phi = {}
 
         # mm/dd-mm/dd
-        for m in re.finditer(r"\b((\d\d?)\/(\d\d?)\-(\d\d?)\/(\d\d?))\b", text):
+        for m in self.date_range_1_pattern.finditer(text):
             date_1 = text[m.start(2) : m.end(3)]
             date_1_key = Date(date_1, m.group(3), m.group(2), None)
 
@@ -567,10 +677,7 @@ class DatesPHIFinder(PHITypeFinder):
                 )
 
         # mm/dd/yy-mm/dd/yy or mm/dd/yyyy-mm/dd/yyyy
-        for m in re.finditer(
-            r"\b((\d\d?)\/(\d\d?)\/(\d\d|\d\d\d\d)\-(\d\d?)\/(\d\d?)\/(\d\d|\d\d\d\d))\b",
-            text,
-        ):
+        for m in self.date_range_2_pattern.finditer(text):
             date_1 = text[m.start(2) : m.end(4)]
             date_1_key = Date(date_1, m.group(3), m.group(2), m.group(4))
 
@@ -583,9 +690,7 @@ class DatesPHIFinder(PHITypeFinder):
                 )
 
         # mm/dd-mm/dd/yy or mm/dd-mm/dd/yyyy
-        for m in re.finditer(
-            r"\b((\d\d?)\/(\d\d?)\-(\d\d?)\/(\d\d?)\/(\d\d|\d\d\d\d))\b", text
-        ):
+        for m in self.date_range_3_pattern.finditer(text):
             date_1 = text[m.start(2) : m.end(4)]
             date_1_key = Date(date_1, m.group(3), m.group(2), None)
 
@@ -597,15 +702,9 @@ class DatesPHIFinder(PHITypeFinder):
                     "Date range (3)"
                 )
 
-        for month in self.months:
+        for month, patterns in self.month_patterns.items():
             # 1 through 2-May-04
-            for m in re.finditer(
-                r"\b((\d{1,2}) ?(\-|to|through|\-\>)+ ?(\d{1,2})[ \-]?"
-                + month
-                + r"[ \-\,]? ?\'?\d{2,4})\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in patterns["date_range_4"].finditer(text):
                 day1 = m.group(2)
                 day2 = m.group(4)
 
@@ -615,13 +714,7 @@ class DatesPHIFinder(PHITypeFinder):
                     )
 
             # Mar 1 to 2 05
-            for m in re.finditer(
-                r"\b("
-                + month
-                + r"\b\.? (\d{1,2}) ?(\-|to|through|\-\>)+ ?(\d{1,2})[\,\s]+ *\'?\d{2,4})\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in patterns["date_range_5"].finditer(text):
                 day1 = m.group(2)
                 day2 = m.group(4)
 
@@ -631,13 +724,7 @@ class DatesPHIFinder(PHITypeFinder):
                     )
 
             # Apr. 12 -> 22nd
-            for m in re.finditer(
-                r"\b("
-                + month
-                + r"\b\.?,? ?(\d{1,2})(|st|nd|rd|th|)? ?(\-|to|through|\-\>)+ ?(\d{1,2})(|st|nd|rd|th|)?)\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in patterns["date_range_6"].finditer(text):
                 day1 = m.group(2)
                 day2 = m.group(4)
 
@@ -647,13 +734,7 @@ class DatesPHIFinder(PHITypeFinder):
                     )
 
             # 12th - 2nd of Apr
-            for m in re.finditer(
-                r"\b((\d{1,2})(|st|nd|rd|th|)? ?(\-|to|through|\-\>)+ ?(\d{1,2})(|st|nd|rd|th|)?( of)?[ \-]\b"
-                + month
-                + r")\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in patterns["date_range_7"].finditer(text):
                 day1 = m.group(2)
                 day2 = m.group(5)
 
@@ -668,28 +749,21 @@ class DatesPHIFinder(PHITypeFinder):
         phi = {}
 
         # mm/dd or mm/yy
-        for m in re.finditer(
-            r"\b([A-Za-z0-9%\/]+ +)?((\d\d?)([\/\-])(\d\d?))\/?\/?( +[A-Za-z]+)?\b",
-            text,
-        ):
+        for m in self.month_day_with_context_pattern.finditer(text):
             month = m.group(3)
             day_or_year = m.group(5)
 
             if (
-                m.group(1) is None
-                or not re.search(r"\b(cvp|noc|\%|RR|PCW)", m.group(1), re.IGNORECASE)
-            ) and (
-                m.group(6) is None
-                or not re.search(r"\bpersantine\b", m.group(6), re.IGNORECASE)
-            ):
+                m.group(1) is None or not self.month_day_pre_words.search(m.group(1))
+            ) and (m.group(6) is None or not self.persantine.search(m.group(6))):
                 context_len = 12
                 chars_before = text[(m.start(3) - 2) : m.start(3)]
                 chars_after = text[m.end(5) : (m.end(5) + 2)]
 
                 if (
-                    not re.search(r"\d[\/\.\-]", chars_before)
-                    and not re.search(r"[\%]", chars_after)
-                    and not re.search(r"\S\d", chars_after)
+                    not self.digit_separator_pattern.search(chars_before)
+                    and not self.percent.search(chars_after)
+                    and not self.nonspace_digit.search(chars_after)
                 ):
                     string_before = text[(m.start(3) - context_len) : m.start(3)]
                     string_after = text[m.end(5) : (m.end(5) + context_len)]
@@ -705,14 +779,8 @@ class DatesPHIFinder(PHITypeFinder):
                         if int(day_or_year) == 5:
                             if (
                                 not is_probably_measurement(string_before)
-                                and not re.search(
-                                    r"\bPSV? ", string_before, re.IGNORECASE
-                                )
-                                and not re.search(
-                                    r"\b(CPAP|PS|range|bipap|pap|pad|rate|unload|ventilation|scale|strength|drop|up|cc|rr|cvp|at|up|in|with|ICP|PSV|of) ",
-                                    string_before,
-                                    re.IGNORECASE,
-                                )
+                                and not self.psv.search(string_before)
+                                and not self.day_5_pre_words.search(string_before)
                                 and not (
                                     r" ?(packs|psv|puffs|pts|patients|range|scale|mls|liters|litres|drinks|beers|per|esophagus|tabs|pts|tablets|systolic|sem|strength|times|bottles|drop|drops|up|cc|mg|\/hr|\/hour|mcg|ug|mm|PEEP|L|hr|hrs|hour|hours|dose|doses|cultures|blood|bpm|ICP|CPAP|years|days|weeks|min|mins|minutes|seconds|months|mons|cm|mm|m|sessions|visits|episodes|drops|breaths|wbcs|beat|beats|ns)\b",
                                     string_after,
@@ -726,17 +794,9 @@ class DatesPHIFinder(PHITypeFinder):
                         elif int(day_or_year) == 2:
                             if (
                                 not is_probably_measurement(string_before)
-                                and not re.search(
-                                    r" ?hour\b", string_after, re.IGNORECASE
-                                )
-                                and not re.search(
-                                    r"\b(with|drop|bipap|pap|range|pad|rate|unload|ventilation|scale|strength|up|cc|rr|cvp|at|up|with|in|ICP|PSV|of) ",
-                                    string_before,
-                                    re.IGNORECASE,
-                                )
-                                and not re.search(
-                                    r" ?hr\b", string_after, re.IGNORECASE
-                                )
+                                and not self.hour.search(string_after)
+                                and not self.day_2_pre_words.search(string_before)
+                                and not self.hr.search(string_after)
                                 and not (
                                     r" ?(packs|L|psv|puffs|pts|patients|range|scale|dose|doses|cultures|blood|mls|liters|litres|pts|drinks|beers|per|esophagus|tabs|tablets|systolic|sem|strength|bottles|times|drop|cc|up|mg|\/hr|\/hour|mcg|ug|mm|PEEP|hr|hrs|hour|hours|bpm|ICP|CPAP|years|days|weeks|min|mins|minutes|seconds|months|mons|cm|mm|m|sessions|visits|episodes|drops|breaths|wbcs|beat|beats|ns)\b",
                                     string_after,
@@ -770,11 +830,7 @@ class DatesPHIFinder(PHITypeFinder):
         phi = {}
 
         # YEAR_INDICATOR + yy
-        for m in re.finditer(
-            r"\b((embolus|mi|mvr|REDO|pacer|ablation|cabg|avr|x2|x3|CHOLECYSTECTOMY|cva|ca|PTC|PTCA|stent|since|surgery|year) + *(\')?)(\d\d)(\.\d)?((\.|\:)\d{1,2})?\b",
-            text,
-            re.IGNORECASE,
-        ):
+        for m in self.two_digit_year_pattern.finditer(text):
 
             if (
                 m.group(5) is None and m.group(6) is None
@@ -784,11 +840,7 @@ class DatesPHIFinder(PHITypeFinder):
                     "Year (2 digits)"
                 )
 
-        for m in re.finditer(
-            r"\b((embolus|mi|mvr|REDO|pacer|ablation|cabg|x2|x3|CHOLECYSTECTOMY|cva|ca|in|PTCA|since|from|year) + *)(\d{4})((\,? )(\d{4}))?\b",
-            text,
-            re.IGNORECASE,
-        ):
+        for m in self.four_digit_year_pattern.finditer(text):
             year_1 = m.group(3)
 
             if self.__is_valid_year(year_1):
@@ -808,12 +860,8 @@ class DatesPHIFinder(PHITypeFinder):
     def season_year(self, text):
         phi = {}
 
-        for season in self.seasons:
-            for m in re.finditer(
-                r"\b((" + season + r")(( +)of( +))? ?\,?( ?)\'?(\d{2}|\d{4}))\b",
-                text,
-                re.IGNORECASE,
-            ):
+        for season_pattern in self.season_year_patterns:
+            for m in season_pattern.finditer(text):
                 year = m.group(7)
                 date_key = Date(m.group(7), None, None, year)
 
@@ -831,9 +879,7 @@ class DatesPHIFinder(PHITypeFinder):
     def find_time(self, text: str):
         phi = {}
 
-        for m in re.finditer(
-            r"\b( *)((\d{4}) *)(hours|hr|hrs|h)\b", text, re.IGNORECASE
-        ):
+        for m in self.military_time_pattern.finditer(text):
             potential_time = m.group(3)
 
             if int(potential_time) < 2359 and int(potential_time) >= 0:
@@ -845,11 +891,7 @@ class DatesPHIFinder(PHITypeFinder):
                     "Time (military)"
                 )
 
-        for m in re.finditer(
-            r"(([A-Za-z0-9%\/]+)\s[A-Za-z0-9%\/]+\s+)?(((\d\d?)\:(\d{2})(\:(\d\d))?)(\s)?(am|pm|p.m.|a.m.)?)( *([A-Za-z]+)\s+)?",
-            text,
-            re.IGNORECASE,
-        ):
+        for m in self.time_pattern.finditer(text):
 
             pre = m.group(1)
             post = m.group(12)
@@ -876,7 +918,7 @@ class DatesPHIFinder(PHITypeFinder):
                     pre is None
                     or (
                         not is_probably_measurement(pre)
-                        and not re.search(r"\bPSV? ", pre, re.IGNORECASE)
+                        and not self.psv.search(pre)
                         and not (pre.lower() in self.invalid_time_pre_words)
                     )
                 )
@@ -891,11 +933,7 @@ class DatesPHIFinder(PHITypeFinder):
     def monthly(self, text: str):
         phi = {}
 
-        for m in re.finditer(
-            r"\b(every )((\d|\d{2})(nd|st|th|rd)?(( month)?( +)of( +))? ?\,?( ?)\'?(\d{2}|\d{4}))\b",
-            text,
-            re.IGNORECASE,
-        ):
+        for m in self.monthly_pattern.finditer(text):
             year = m.group(10)
             date_key = Date(m.group(10), None, None, year)
 
@@ -1,4 +1,5 @@
 import re
+from .PatternRegistry import PatternRegistry
 from .PHITypeFinder import PHI, PHITypeFinder, PHIDict
 
 
@@ -7,10 +8,16 @@ class EmailPHIFinder(PHITypeFinder):
     Concrete implementation of PHITypeFinder for detecting email addresses.
     """
 
+    segment = "line"
+
+    def __init__(self, registry: PatternRegistry = None):
+        super().__init__(registry)
+        self.email_pattern = self.registry.compile(r"\b([\w\.]+\w ?@ ?\w+[\.\w+]((\.\w+)?){,3}\.\w{2,3})\b")
+
     def find(self) -> PHIDict:
         phi = {}
 
-        for m in re.finditer(r"\b([\w\.]+\w ?@ ?\w+[\.\w+]((\.\w+)?){,3}\.\w{2,3})\b", self.note):
+        for m in self.email_pattern.finditer(self.note):
             phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append("Email Address")
 
         return phi
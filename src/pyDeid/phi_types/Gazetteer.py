@@ -0,0 +1,215 @@
+import re
+from collections import deque
+from typing import Dict, List, Tuple
+from .PHITypeFinder import PHI
+
+
+# characters that make a wordlist entry a regex pattern rather than a literal phrase
+REGEX_METACHARACTERS = set(".^$*+?{}[]\\|()")
+
+# case-insensitive `re` matching maps these non-ASCII characters onto ASCII letters
+CASE_FOLD = {
+    **{ord(c): c.lower() for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"},
+    0x130: "i",
+    0x131: "i",
+    0x17F: "s",
+    0x212A: "k",
+}
+
+WHITESPACE = {cp: " " for cp in range(0x3001) if chr(cp).isspace()}
+
+
+class Gazetteer:
+    """
+    Finds every entry of several wordlists in a note with a single pass over the note.
+
+    Entries keep the semantics of the `re.finditer` loops they replace: an entry is a case-insensitive or
+    case-sensitive substring of the note, or, with `whole_words`, a phrase whose words are separated by exactly one
+    whitespace character and which starts and ends on a word boundary. Like `re.finditer`, the matches of each entry
+    do not overlap each other.
+
+    Plain ASCII entries are compiled into one Aho-Corasick automaton. Entries containing regex metacharacters,
+    non-ASCII characters or whitespace other than spaces are matched with their own precompiled regex instead,
+    so that they behave exactly as before.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.tags = {}
+        self.patterns = {}
+
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        self.built = True
+
+        self._note = None
+        self._hits = {}
+
+    def add(
+        self, phrase: str, tag: str, ignore_case: bool = True, whole_words: bool = False
+    ) -> None:
+        """Adds a wordlist entry whose matches will be reported under `tag`.
+
+        Args:
+            phrase: The wordlist entry.
+            tag: Label the matches of this entry are grouped under, e.g. "Hospital".
+            ignore_case: Whether the entry matches the note case-insensitively.
+            whole_words: Whether the entry must start and end on a word boundary, with any single whitespace
+                character between its words.
+        """
+        index = len(self.entries)
+        self.entries.append((phrase, ignore_case, whole_words))
+        self._note = None
+        self.tags.setdefault(tag, []).append(index)
+
+        if (
+            phrase
+            and phrase.isascii()
+            and not REGEX_METACHARACTERS.intersection(phrase)
+            and not any(c.isspace() and c != " " for c in phrase)
+        ):
+            self.built = False
+        else:
+            pattern = (
+                r"\b(" + r")\s(".join(phrase.split(" ")) + r")\b"
+                if whole_words
+                else phrase
+            )
+            self.patterns[index] = re.compile(
+                pattern, re.IGNORECASE if ignore_case else 0
+            )
+
+    def build(self) -> None:
+        """Compiles the literal entries into the automaton. Called automatically by `find` if entries were added."""
+        self.goto = [{}]
+        self.output = [[]]
+
+        for index, (phrase, _, _) in enumerate(self.entries):
+            if index in self.patterns:
+                continue
+
+            state = 0
+
+            for c in phrase.lower():
+                next_state = self.goto[state].get(c)
+
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][c] = next_state
+                    self.goto.append({})
+                    self.output.append([])
+
+                state = next_state
+
+            self.output[state].append(index)
+
+        # breadth-first, so the fail link of every shallower state is known before it is needed
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+
+            for c, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+
+                while fallback and c not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+
+                self.fail[next_state] = (
+                    self.goto[fallback][c] if state and c in self.goto[fallback] else 0
+                )
+                self.output[next_state] = (
+                    self.output[next_state] + self.output[self.fail[next_state]]
+                )
+
+        self.built = True
+        self._note = None
+
+    def find(self, note: str, tag: str) -> List[PHI]:
+        """Returns the matches of the entries added under `tag`, in entry order and then in order of position.
+
+        The note is only scanned once, however many tags are looked up for it.
+        """
+        if note is not self._note:
+            self._hits = self._search(note)
+            self._note = note
+
+        return [
+            PHI(start, end, note[start:end])
+            for index in self.tags.get(tag, [])
+            for start, end in self._hits.get(index, [])
+        ]
+
+    def _search(self, note: str) -> Dict[int, List[Tuple[int, int]]]:
+        if not self.built:
+            self.build()
+
+        folded = note.translate(CASE_FOLD)
+        scanned = folded.translate(WHITESPACE)
+
+        candidates = {}
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        state = 0
+
+        for end, c in enumerate(scanned, 1):
+            while state and c not in goto[state]:
+                state = fail[state]
+
+            state = goto[state].get(c, 0)
+
+            for index in output[state]:
+                candidates.setdefault(index, []).append(end)
+
+        hits = {}
+
+        for index, ends in candidates.items():
+            phrase, ignore_case, whole_words = self.entries[index]
+            length = len(phrase)
+            key = phrase.lower()
+            last_end = 0
+
+            for end in ends:
+                start = end - length
+
+                # the automaton sees every whitespace character as a space and ignores case, so check the
+                # characters the entry's regex would have been stricter about
+                if start < last_end:
+                    continue
+                elif whole_words:
+                    if not (_is_boundary(note, start) and _is_boundary(note, end)):
+                        continue
+                    elif (
+                        not ignore_case
+                        and note[start:end].translate(WHITESPACE) != phrase
+                    ):
+                        continue
+                elif ignore_case:
+                    if " " in key and folded[start:end] != key:
+                        continue
+                elif note[start:end] != phrase:
+                    continue
+
+                hits.setdefault(index, []).append((start, end))
+                last_end = end
+
+        for index, pattern in self.patterns.items():
+            hits[index] = [m.span() for m in pattern.finditer(note)]
+
+        return hits
+
+
+def _is_word(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+def _is_boundary(note: str, pos: int) -> bool:
+    """Whether `\\b` matches at `pos` in `note`."""
+    before = pos > 0 and _is_word(note[pos - 1])
+    after = pos < len(note) and _is_word(note[pos])
+
+    return before != after
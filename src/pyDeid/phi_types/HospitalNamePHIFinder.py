@@ -1,5 +1,5 @@
-import re
 from .PHITypeFinder import PHITypeFinder, PHI, PHIDict
+from .Gazetteer import Gazetteer
 
 
 class HospitalNamePHIFinder(PHITypeFinder):
@@ -7,108 +7,39 @@ class HospitalNamePHIFinder(PHITypeFinder):
     Concrete implementation of PHITypeFinder for detecting hospital names and their acronyms.
     """
 
-    def __init__(self, hospitals: list[str], hospital_acronyms: list[str] = None):
+    def __init__(
+        self,
+        hospitals: list[str],
+        hospital_acronyms: list[str] = None,
+        gazetteer: Gazetteer = None,
+    ):
         super().__init__()
         self.hospitals = hospitals
         self.hospital_acronyms = (
             hospital_acronyms if hospital_acronyms is not None else []
         )
+        self.gazetteer = gazetteer if gazetteer is not None else Gazetteer()
 
-    def find(self) -> PHIDict:
-        phi = {}
-
+        # hospitals of one term match anywhere, and of two to six terms as whole words separated by a single
+        # whitespace character; longer names are not searched for
         for hospital in self.hospitals:
-            terms = hospital.split(" ")
-            n_terms = len(terms)
+            n_terms = len(hospital.split(" "))
 
             if n_terms == 1:
-                for m in re.finditer(hospital, self.note, re.IGNORECASE):
-                    phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append(
-                        "Hospital"
-                    )
-
-            if n_terms == 2:
-                for m in re.finditer(
-                    r"\b(" + terms[0] + ")\s(" + terms[1] + r")\b", self.note, re.IGNORECASE
-                ):
-                    phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append(
-                        "Hospital"
-                    )
-
-            if n_terms == 3:
-                for m in re.finditer(
-                    r"\b(" + terms[0] + ")\s(" + terms[1] + ")\s(" + terms[2] + r")\b",
-                    self.note,
-                    re.IGNORECASE,
-                ):
-                    phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append(
-                        "Hospital"
-                    )
+                self.gazetteer.add(hospital, "Hospital")
+            elif n_terms <= 6:
+                self.gazetteer.add(hospital, "Hospital", whole_words=True)
 
-            if n_terms == 4:
-                for m in re.finditer(
-                    r"\b("
-                    + terms[0]
-                    + ")\s("
-                    + terms[1]
-                    + ")\s("
-                    + terms[2]
-                    + ")\s("
-                    + terms[3]
-                    + r")\b",
-                    self.note,
-                    re.IGNORECASE,
-                ):
-                    phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append(
-                        "Hospital"
-                    )
+        for acronym in self.hospital_acronyms:
+            self.gazetteer.add(acronym, "Site Acronym", ignore_case=False)
 
-            if n_terms == 5:
-                for m in re.finditer(
-                    r"\b("
-                    + terms[0]
-                    + ")\s("
-                    + terms[1]
-                    + ")\s("
-                    + terms[2]
-                    + ")\s("
-                    + terms[3]
-                    + ")\s("
-                    + terms[4]
-                    + r")\b",
-                    self.note,
-                    re.IGNORECASE,
-                ):
-                    phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append(
-                        "Hospital"
-                    )
+    def find(self) -> PHIDict:
+        phi = {}
 
-            if n_terms == 6:
-                for m in re.finditer(
-                    r"\b("
-                    + terms[0]
-                    + ")\s("
-                    + terms[1]
-                    + ")\s("
-                    + terms[2]
-                    + ")\s("
-                    + terms[3]
-                    + ")\s("
-                    + terms[4]
-                    + ")\s("
-                    + terms[5]
-                    + r")\b",
-                    self.note,
-                    re.IGNORECASE,
-                ):
-                    phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append(
-                        "Hospital"
-                    )
+        for key in self.gazetteer.find(self.note, "Hospital"):
+            phi.setdefault(key, []).append("Hospital")
 
-        for acronym in self.hospital_acronyms:
-            for m in re.finditer(acronym, self.note):
-                phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append(
-                    "Site Acronym"
-                )
+        for key in self.gazetteer.find(self.note, "Site Acronym"):
+            phi.setdefault(key, []).append("Site Acronym")
 
-        return phi
\ No newline at end of file
+        return phi
@@ -1,5 +1,6 @@
 from typing import Dict, List
 import re
+from .PatternRegistry import PatternRegistry
 from .PHITypeFinder import PHITypeFinder, PHI, PHIDict
 
 
@@ -8,14 +9,20 @@ class MrnPHIFinder(PHITypeFinder):
     Concrete implementation of PHITypeFinder for detecting Medical Record Numbers (MRNs).
     """
 
-    def find(self) -> PHIDict:
-        phi = {}
+    # the label may end a line and the number start the next one, but a match never spans a blank line
+    segment = "paragraph"
 
-        for m in re.finditer(
+    def __init__(self, registry: PatternRegistry = None):
+        super().__init__(registry)
+        self.mrn_pattern = self.registry.compile(
             r"((mrn|medical record|hospital number)( *)(number|num|no|#)?( *)[\)\#\:\-\=\s\.]?( *)(\t*)( *)[a-zA-Z]*?((\d+)[\/\-\:]?(\d+)?))[a-zA-Z]*?",
-            self.note,
             re.IGNORECASE,
-        ):
+        )
+
+    def find(self) -> PHIDict:
+        phi = {}
+
+        for m in self.mrn_pattern.finditer(self.note):
             phi.setdefault(PHI(m.start(9), m.end(9), m.group(9)), []).append("MRN")
 
         return phi
@@ -1,7 +1,8 @@
+from bisect import bisect_left
 from dataclasses import dataclass, field
 import re
-from typing import List, Set
-from .PHITypeFinder import PHI, PHITypeFinder, PHIDict
+from typing import Dict, List, Set
+from .PHITypeFinder import PHI, PHITypeFinder, PHIDict, WindowDependsOnNote
 from .utils import (
     is_common,
     is_type,
@@ -9,6 +10,11 @@ from .utils import (
     is_commonest,
     merge_phi_dicts,
 )
+from .Gazetteer import Gazetteer
+from .PatternRegistry import PatternRegistry
+
+# the initials patterns match at most 7 characters before a name, counting a trailing newline
+INITIALS_CONTEXT = 8
 
 
 class NamesPHIFinder(PHITypeFinder):
@@ -147,10 +153,114 @@ class NamesPHIFinder(PHITypeFinder):
             ]
         )
 
-    def __init__(self, config: Config = None):
-        super().__init__()
+    plural_titles = ["doctors", "drs", "drs\.", "professors"]
+    names_pre = ["PCP", "physician", "provider", "created by"]
+    specific_titles = ["MR", "MISTER", "MS"]
+    strict_titles = ["Dr", "DRS", "Mrs"]
+    other_titles = [
+        "MISTER",
+        "DOCTOR",
+        "DOCTORS",
+        "MISS",
+        "PROF",
+        "PROFESSOR",
+        "REV",
+        "RABBI",
+        "NURSE",
+        "MD",
+        "PRINCESS",
+        "PRINCE",
+        "DEACON",
+        "DEACONESS",
+        "CAREGIVER",
+        "PRACTITIONER",
+        "MR",
+        "MS",
+        "RESIDENT",
+        "STAFF",
+        "FELLOW",
+    ]
+
+    def __init__(self, config: Config = None, gazetteer: Gazetteer = None, registry: PatternRegistry = None):
+        super().__init__(registry)
         self.config = config or self.Config()
 
+        self.gazetteer = gazetteer if gazetteer is not None else Gazetteer()
+        for phrase in self.config.medical_phrases:
+            self.gazetteer.add(phrase, "MedicalPhrase")
+        for name in self.config.doctor_first_names:
+            self.gazetteer.add(name, "Doctor First Name")
+
+        compile = self.registry.compile
+
+        self.word_pattern = compile("\w+")
+        self.capitalized_word = compile(r"\b(([A-Z])([a-z]+))\b")
+        self.upper_word = compile("\b(([A-Z]+))\b")
+        # the patterns below are matched at a candidate's end, or searched up to its start, in the whole note rather than
+        # in a copy of the text after or before it; `(?=\w)` is what `^\b` meant at the start of the copied text
+        self.word_after_indicator = compile(r"(?=\w)(and )?( *)([A-Za-z]+)\b", re.IGNORECASE)
+        self.single_digit = compile(r"\b[\d]\b")
+        self.and_pattern = compile(r"and")
+        self.lastname_comma_firstname_pattern = compile(r"\b([A-Za-z]+)( ?\, ?)([A-Za-z]+)\b", re.IGNORECASE)
+        self.followed_by_md_pattern = compile(r"\b((([A-Za-z\']+|[A-Za-z]\.) +)?((\([A-Za-z\']+\)|[A-Za-z\']+|[A-Za-z]\.) +)?([A-Za-z\-\']+)((\, *)|(\s+))(rrt|md|m\.d\.|crt|np|rn|nnp|msw|r\.n\.|staff|fellow|resident|\(fellow\)|\(resident\)|\(staff\))(\.|\,)*)", re.IGNORECASE)
+        self.md_apostrophe = compile(r"(m\.?d\.?\')")
+        self.md_plural = compile(r"(m\.?d\.?s)")
+        self.dotted_initials_ignorecase = compile(r"\b([A-Za-z])\.+\b", re.IGNORECASE)
+        self.dotted_initials = compile(r"\b([A-Za-z])\.+\b")
+        self.dotted_initial = compile(r"\b([A-Za-z])\.\b")
+        self.dotted_initial_ignorecase = compile(r"\b([A-Za-z])\.\b", re.IGNORECASE)
+        self.leading_apostrophe = compile(r"\'([A-Za-z]+)")
+        self.trailing_apostrophe = compile(r"([A-Za-z]+)\'")
+        self.word_after_title = compile(r"^( ?)(\')?( ?)([A-Za-z]+)\b")
+        self.apostrophes = compile(r"(\')?([A-Za-z]+)(\')?")
+        self.no_middle_initial = compile(r"( +)([A-Za-z\']{2,})\b")
+        self.middle_initial = compile(r"( +)([A-Za-z])(\.? )([A-Za-z\-][A-Za-z\-]+)\b")
+        self.middle_initial_anywhere = compile(r"( +)([A-Za-z])(\.? )([A-Za-z][A-Za-z]+)\b\s*")
+        self.word_before = compile(r"\b([A-Za-z]+)( *)$")
+        self.hyphenated_last_name = compile(r"-([A-Za-z]+)\b")
+        self.double_last_name = compile(r"( *)([A-Za-z]+)\b")
+        self.two_initials_before = compile(r"\b([A-Za-z][\. ] ?[A-Za-z]\.?) ?$")
+        self.single_initial_before = compile(r"\b([A-Za-z]\.?) ?$")
+        # `^ or|and ([A-Za-z]+)\b`: " or" only right after the name, "and <name>" anywhere after it
+        self.and_or = compile(r" or|and ([A-Za-z]+)\b", re.IGNORECASE)
+        self.and_name = compile(r"(?=and ([A-Za-z]+)\b)", re.IGNORECASE)
+        self.and_or_symbols = compile(r"( ?[\&\+] ?)([A-Za-z]+)\b", re.IGNORECASE)
+        self.three_names = compile(r", ([A-Za-z]+)(,? and )([A-Za-z]+)\b", re.IGNORECASE)
+        self.first_last_split = compile(r"(.*)\s(.*)")
+
+        # patterns built from the name indicator, title and prefix lists
+        self.name_indicator_patterns = [
+            compile(r"\b(" + indicator + r")(s)?( *)(\-|\,|\.|\()?(  *)([A-Za-z]+\b)\b", re.IGNORECASE)
+            for indicator in self.config.name_indicators
+        ]
+        self.plural_title_patterns = [
+            compile(r"\b(((" + title + r" +)([A-Za-z]+) *(and +)?\,? *)([A-Za-z]+) *(and +)?\,? *)([A-Za-z]+)?\b", re.IGNORECASE)
+            for title in self.plural_titles
+        ]
+        self.names_pre_patterns = [
+            (
+                compile(r"\b((" + pre + r"( +name)?( +is)?\s\s*)([A-Za-z\-]+)((\s*\,*\s*)? *)([A-Za-z\-]+\.?)(((\s*\,*\s*)? *)([A-Za-z\-]+))?)\b", re.IGNORECASE),
+                compile(r"\b((" + pre + r"( +name)?( +is)? ?([\#\:\-\=\.\,])+ *)([A-Za-z\-]+)((\s*\,*\s*)? *)([A-Za-z\-]+\.?)((\s*\,*\s*)? *)([A-Za-z\-]+)?)\b", re.IGNORECASE),
+            )
+            for pre in self.names_pre
+        ]
+        self.prefix_patterns = [
+            compile(r"\b((" + pre + r")([\s\'\-])+ *)([A-Za-z]+)\b", re.IGNORECASE)
+            for pre in self.config.prefixes_unambig
+        ]
+        self.specific_title_patterns = [
+            compile(r"\b(" + title + r"\.( *))([A-Za-z\'\-]+)\b", re.IGNORECASE)
+            for title in self.specific_titles
+        ]
+        self.strict_title_patterns = [
+            compile(r"\b(" + title + r"\b\.? *)([A-Za-z\'\-]+)( ?)(\')?( ?)([A-Za-z]+)?( ?)([A-Za-z]+)?\b", re.IGNORECASE)
+            for title in self.strict_titles
+        ]
+        self.other_title_patterns = [
+            compile(r"\b(" + title + r"\b\.? ?)([A-Za-z]+) *([A-Za-z]+)?(\,)?\b", re.IGNORECASE)
+            for title in self.other_titles
+        ]
+
         self.custom_names = []
         if self.config.custom_dr_first_names is not None:
             self.custom_names.append(({name.upper() for name in self.config.custom_dr_first_names}, "Custom Doctor First Name"))
@@ -175,6 +285,18 @@ class NamesPHIFinder(PHITypeFinder):
             # TODO: add patients here
         ]
 
+        # facts about the whole of a long note when only one of its windows is searched, see `set_window_facts`
+        self.window_facts = None
+
+    def note_facts(self, note: str) -> Dict[str, bool]:
+        """Returns the facts about `note` as a whole that the PHI found in any part of it depend on: whether it mentions
+        MDs in the plural or possessive, which turns off the names followed by "MD" everywhere in the note."""
+        return {"mentions_mds": bool(self.md_apostrophe.search(note) or self.md_plural.search(note))}
+
+    def set_window_facts(self, facts: Dict[str, bool] = None) -> None:
+        """Searches the note as one window of a long note whose `note_facts` are `facts`, or as a whole note if None."""
+        self.window_facts = facts
+
     def __is_medical_eponym(self, text: str) -> bool:
         return text is not None and text.lower() in self.config.eponym_indicators
 
@@ -187,7 +309,7 @@ class NamesPHIFinder(PHITypeFinder):
             or (is_type(key, "Name", True, phi) and is_type(key, "(un)", True, phi))
             or (
                 is_type(key, "Name", True, phi)
-                and (re.search(r"\b(([A-Z])([a-z]+))\b", key.phi) or re.search("\b(([A-Z]+))\b", key.phi))
+                and (self.capitalized_word.search(key.phi) or self.upper_word.search(key.phi))
                 or is_type(key, "popular", True, phi)
             )
         ):
@@ -200,9 +322,7 @@ class NamesPHIFinder(PHITypeFinder):
 
     def __first_pass(self, text: str) -> PHIDict:
         phi = {}
-        word_pattern = re.compile("\w+")
-
-        for word in word_pattern.finditer(text):
+        for word in self.word_pattern.finditer(text):
             for names, tag in self.namesets:
                 if word.group().upper() in names:
                     phi.setdefault(PHI(word.start(), word.end(), word.group()), []).append(tag)
@@ -216,13 +336,11 @@ class NamesPHIFinder(PHITypeFinder):
                 ):  # reduces false positives for initials in custom names
                     phi.setdefault(PHI(word.start(), word.end(), word.group()), []).append(tag)
 
-        for phrase in self.config.medical_phrases:
-            for m in re.finditer(phrase, text, re.IGNORECASE):
-                phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append("MedicalPhrase")
+        for key in self.gazetteer.find(text, "MedicalPhrase"):
+            phi.setdefault(key, []).append("MedicalPhrase")
 
-        for name in self.config.doctor_first_names:
-            for m in re.finditer(name, text, re.IGNORECASE):
-                phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append("Doctor First Name")
+        for key in self.gazetteer.find(text, "Doctor First Name"):
+            phi.setdefault(key, []).append("Doctor First Name")
 
         return phi
 
@@ -256,8 +374,8 @@ class NamesPHIFinder(PHITypeFinder):
 
     def __follows_name_indicator(self, text: str, phi: PHIDict) -> PHIDict:
         found_phi = {}
-        for indicator in self.config.name_indicators:
-            for m in re.finditer(r"\b(" + indicator + r")(s)?( *)(\-|\,|\.|\()?(  *)([A-Za-z]+\b)\b", text, re.IGNORECASE):
+        for indicator_pattern in self.name_indicator_patterns:
+            for m in indicator_pattern.finditer(text):
                 start = m.start(6)
                 end = m.end(6)
 
@@ -266,11 +384,11 @@ class NamesPHIFinder(PHITypeFinder):
                 if self.__is_probably_name(key, phi):
                     found_phi.setdefault(key, []).append("Name (NI)")
 
-                string_after = text[end:]
+                n = self.word_after_indicator.match(text, end)
 
-                for n in re.finditer(r"^\b(and )?( *)([A-Za-z]+)\b", string_after, re.IGNORECASE):
+                if n:
                     word_after = n.group(3)
-                    key_after = PHI(end + n.start(3), end + n.end(3), word_after)
+                    key_after = PHI(n.start(3), n.end(3), word_after)
 
                     if not self.__is_medical_eponym(word_after) and (
                         not self.__is_name_indicator(word_after)
@@ -278,16 +396,16 @@ class NamesPHIFinder(PHITypeFinder):
                             not is_common(word_after)
                             or (
                                 (is_type(key_after, "Name", True, phi) and is_type(key_after, "\(un\)", True, phi))
-                                or (is_type(key_after, "Name", True, phi) and re.search(r"\b(([A-Z])([a-z]+))\b", word_after))
+                                or (is_type(key_after, "Name", True, phi) and self.capitalized_word.search(word_after))
                                 or (not is_commonest(word_after) and is_type(key_after, "Name", True, phi))
                                 or is_type(key_after, "popular", True, phi)
                             )
                         )
                     ):
-                        if not re.search(r"\b[\d]\b", string_after):
+                        if not self.single_digit.search(text, end):
                             found_phi.setdefault(key_after, []).append("Name2 (NI)")
 
-                    elif re.search(r"and", m.group(1)) and not self.__is_medical_eponym(word_after):
+                    elif self.and_pattern.search(m.group(1)) and not self.__is_medical_eponym(word_after):
                         if not (is_common(word_after) or self.__is_name_indicator(word_after)):
                             found_phi.setdefault(key_after, []).append("Name2 (NI)")
 
@@ -295,7 +413,7 @@ class NamesPHIFinder(PHITypeFinder):
 
     def __lastname_comma_firstname(self, text: str, phi: PHIDict) -> PHIDict:
         found_phi = {}
-        for m in re.finditer(r"\b([A-Za-z]+)( ?\, ?)([A-Za-z]+)\b", text, re.IGNORECASE):
+        for m in self.lastname_comma_firstname_pattern.finditer(text):
             start_1 = m.start(1)
             end_1 = m.end(1)
 
@@ -320,11 +438,9 @@ class NamesPHIFinder(PHITypeFinder):
         return found_phi
 
     def __multiple_names_following_title(self, text: str, phi: PHIDict) -> PHIDict:
-        plural_titles = ["doctors", "drs", "drs\.", "professors"]
-
         found_phi = {}
-        for title in plural_titles:
-            for m in re.finditer(r"\b(((" + title + r" +)([A-Za-z]+) *(and +)?\,? *)([A-Za-z]+) *(and +)?\,? *)([A-Za-z]+)?\b", text, re.IGNORECASE):
+        for title_pattern in self.plural_title_patterns:
+            for m in title_pattern.finditer(text):
                 keys = []
 
                 name1 = m.group(4)
@@ -346,21 +462,20 @@ class NamesPHIFinder(PHITypeFinder):
 
     def __followed_by_md(self, text: str, phi: PHIDict) -> PHIDict:
         found_phi = {}
+        facts = self.window_facts
 
-        for m in re.finditer(
-            r"\b((([A-Za-z\']+|[A-Za-z]\.) +)?((\([A-Za-z\']+\)|[A-Za-z\']+|[A-Za-z]\.) +)?([A-Za-z\-\']+)((\, *)|(\s+))(rrt|md|m\.d\.|crt|np|rn|nnp|msw|r\.n\.|staff|fellow|resident|\(fellow\)|\(resident\)|\(staff\))(\.|\,)*)",
-            text,
-            re.IGNORECASE,
-        ):
+        for m in self.followed_by_md_pattern.finditer(text):
+            if facts is None:
+                facts = self.note_facts(text)
 
-            if not re.search(r"(m\.?d\.?\')", text) and not re.search(r"(m\.?d\.?s)", text):
+            if not facts["mentions_mds"]:
 
                 first_name = m.group(3)
 
                 if first_name is not None:
                     first_name_key = PHI(m.start(3), m.end(3), first_name)
 
-                    if len(first_name) == 1 or (len(first_name) == 2 and re.search(r"\b([A-Za-z])\.+\b", first_name, re.IGNORECASE)):
+                    if len(first_name) == 1 or (len(first_name) == 2 and self.dotted_initials_ignorecase.search(first_name)):
                         found_phi.setdefault(first_name_key, []).append("Name Initial (MD)")
                     elif self.__is_probably_name(first_name_key, phi):
                         found_phi.setdefault(first_name_key, []).append("Name6 (MD)")
@@ -380,7 +495,7 @@ class NamesPHIFinder(PHITypeFinder):
 
                     if (
                         len(initials) == 1
-                        or (len(initials) == 2 and re.search(r"\b([A-Za-z])\.+\b", initials))
+                        or (len(initials) == 2 and self.dotted_initials.search(initials))
                         or self.__is_probably_prefix(initials)
                     ):
                         found_phi.setdefault(initials_key, []).append("Name Initial (MD)")
@@ -391,15 +506,9 @@ class NamesPHIFinder(PHITypeFinder):
         return found_phi
 
     def __follows_pcp_name(self, text: str, phi: PHIDict) -> PHIDict:
-        names_pre = ["PCP", "physician", "provider", "created by"]
-
         found_phi = {}
-        for pre in names_pre:
-            for m in re.finditer(
-                r"\b((" + pre + r"( +name)?( +is)?\s\s*)([A-Za-z\-]+)((\s*\,*\s*)? *)([A-Za-z\-]+\.?)(((\s*\,*\s*)? *)([A-Za-z\-]+))?)\b",
-                text,
-                re.IGNORECASE,
-            ):
+        for pre_pattern, pre_punctuation_pattern in self.names_pre_patterns:
+            for m in pre_pattern.finditer(text):
                 keys = []
 
                 first_name = m.group(5)
@@ -415,18 +524,12 @@ class NamesPHIFinder(PHITypeFinder):
                     keys.append(PHI(m.start(12), m.end(12), last_name))
 
                 for key in keys:
-                    if len(key[2]) == 1 or re.search(r"\b([A-Za-z])\.\b", key[2]):
+                    if len(key[2]) == 1 or self.dotted_initial.search(key[2]):
                         found_phi.setdefault(key, []).append("Name Initial (PRE)")
                     elif self.__is_probably_name(key, phi):
                         found_phi.setdefault(key, []).append("Name9 (PRE)")
 
-            for m in re.finditer(
-                r"\b(("
-                + pre
-                + r"( +name)?( +is)? ?([\#\:\-\=\.\,])+ *)([A-Za-z\-]+)((\s*\,*\s*)? *)([A-Za-z\-]+\.?)((\s*\,*\s*)? *)([A-Za-z\-]+)?)\b",
-                text,
-                re.IGNORECASE,
-            ):
+            for m in pre_punctuation_pattern.finditer(text):
 
                 first_name = m.group(6)
                 if first_name is not None:
@@ -442,7 +545,7 @@ class NamesPHIFinder(PHITypeFinder):
 
                 first_found = False
                 if first_name is not None:
-                    if len(first_name) == 1 or re.search(r"\b([A-Za-z])\.\b", first_name, re.IGNORECASE):
+                    if len(first_name) == 1 or self.dotted_initial_ignorecase.search(first_name):
                         found_phi.setdefault(first_name_key, []).append("Name Initial (NameIs)")
                         first_found = True
 
@@ -454,7 +557,7 @@ class NamesPHIFinder(PHITypeFinder):
                     second_found = False
 
                     if initials is not None:
-                        if len(initials) == 2 or re.search(r"\b([A-Za-z])\.\b", initials, re.IGNORECASE):
+                        if len(initials) == 2 or self.dotted_initial_ignorecase.search(initials):
                             found_phi.setdefault(initials_key, []).append("Name Initial (NameIs)")
                             second_found = True
 
@@ -464,7 +567,7 @@ class NamesPHIFinder(PHITypeFinder):
 
                         if second_found:
                             if last_name is not None:
-                                if (len(last_name) == 1) or re.search(r"\b([A-Za-z])\.\b", last_name, re.IGNORECASE):
+                                if (len(last_name) == 1) or self.dotted_initial_ignorecase.search(last_name):
                                     found_phi.setdefault(last_name_key, []).append("Name Initial (NameIs)")
 
                                 elif self.__is_probably_name(last_name_key, phi):
@@ -475,8 +578,8 @@ class NamesPHIFinder(PHITypeFinder):
     def __prefixes(self, text: str, phi: PHIDict) -> PHIDict:
         found_phi = {}
         # Van Der Meer
-        for pre in self.config.prefixes_unambig:
-            for m in re.finditer(r"\b((" + pre + r")([\s\'\-])+ *)([A-Za-z]+)\b", text, re.IGNORECASE):
+        for prefix_pattern in self.prefix_patterns:
+            for m in prefix_pattern.finditer(text):
                 prefix_key = PHI(m.start(2), m.end(2), m.group(2))
 
                 last_name = m.group(4)
@@ -491,11 +594,9 @@ class NamesPHIFinder(PHITypeFinder):
     def __titles(self, text: str, phi: PHIDict) -> PHIDict:
         found_phi = {}
 
-        specific_titles = ["MR", "MISTER", "MS"]
-
         # Mr. Sanders
-        for title in specific_titles:
-            for m in re.finditer(r"\b(" + title + r"\.( *))([A-Za-z\'\-]+)\b", text, re.IGNORECASE):
+        for title_pattern in self.specific_title_patterns:
+            for m in title_pattern.finditer(text):
                 potential_name = m.group(3)
                 start = m.start(3)
                 end = start + len(potential_name)
@@ -506,10 +607,8 @@ class NamesPHIFinder(PHITypeFinder):
                 elif not is_common(potential_name):
                     phi.setdefault(key, []).append("Name14 (STitle)")
 
-        strict_titles = ["Dr", "DRS", "Mrs"]
-
-        for title in strict_titles:
-            for m in re.finditer(r"\b(" + title + r"\b\.? *)([A-Za-z\'\-]+)( ?)(\')?( ?)([A-Za-z]+)?( ?)([A-Za-z]+)?\b", text, re.IGNORECASE):
+        for title_pattern in self.strict_title_patterns:
+            for m in title_pattern.finditer(text):
 
                 word = m.group(2)
 
@@ -538,8 +637,8 @@ class NamesPHIFinder(PHITypeFinder):
                                 phi.setdefault(key, []).append("Last Name (STitle)")
 
                 else:
-                    starts_w_apostophe = re.search(r"\'([A-Za-z]+)", word)
-                    ends_w_apostrophe = re.search(r"([A-Za-z]+)\'", word)
+                    starts_w_apostophe = self.leading_apostrophe.search(word)
+                    ends_w_apostrophe = self.trailing_apostrophe.search(word)
 
                     if starts_w_apostophe:
                         word = starts_w_apostophe.group(1)
@@ -565,36 +664,12 @@ class NamesPHIFinder(PHITypeFinder):
                         self.__is_probably_name(potential_last_name_key, phi)
                         or (not is_commonest(potential_last_name))
                         or (is_type(potential_last_name_key, "Name", True, phi) and is_type(potential_last_name_key, "(un)", False, phi))
-                        or (is_type(potential_last_name_key, "Name", True, phi) and re.search(r"\b(([A-Z])([a-z]+))\b", potential_last_name))
+                        or (is_type(potential_last_name_key, "Name", True, phi) and self.capitalized_word.search(potential_last_name))
                     ):
                         phi.setdefault(potential_last_name_key, []).append("Name (STitle)")
 
-        other_titles = [
-            "MISTER",
-            "DOCTOR",
-            "DOCTORS",
-            "MISS",
-            "PROF",
-            "PROFESSOR",
-            "REV",
-            "RABBI",
-            "NURSE",
-            "MD",
-            "PRINCESS",
-            "PRINCE",
-            "DEACON",
-            "DEACONESS",
-            "CAREGIVER",
-            "PRACTITIONER",
-            "MR",
-            "MS",
-            "RESIDENT",
-            "STAFF",
-            "FELLOW",
-        ]
-
-        for title in other_titles:
-            for m in re.finditer(r"\b(" + title + r"\b\.? ?)([A-Za-z]+) *([A-Za-z]+)?(\,)?\b", text, re.IGNORECASE):
+        for title_pattern in self.other_title_patterns:
+            for m in title_pattern.finditer(text):
                 word = m.group(2)
 
                 start = m.start(2)
@@ -612,7 +687,7 @@ class NamesPHIFinder(PHITypeFinder):
                     next_word = m.group(8)
                     string_after = text[end:]
 
-                    search_after = re.search(r"^( ?)(\')?( ?)([A-Za-z]+)\b", string_after)
+                    search_after = self.word_after_title.search(string_after)
 
                     if search_after:
                         token = search_after.group(4)
@@ -638,7 +713,7 @@ class NamesPHIFinder(PHITypeFinder):
                             if self.__is_probably_name(new_key, phi) and len(token) > 1:
                                 phi.setdefault(new_key, []).append("Last Name (Titles)")
                 else:
-                    apostrophes = re.search(r"(\')?([A-Za-z]+)(\')?", word)
+                    apostrophes = self.apostrophes.search(word)
 
                     if apostrophes.group(1) is not None:
                         word = apostrophes.group(1)
@@ -652,7 +727,7 @@ class NamesPHIFinder(PHITypeFinder):
                     if (not self.__is_medical_eponym(word_after)) and (
                         (not is_commonest(word_after))
                         or (is_type(key_after, "Name", True, phi) and is_type(key_after, "(un)", False, phi))
-                        or (is_type(key_after, "Name", True, phi) and re.search(r"\b(([A-Z])([a-z]+))\b", word_after))
+                        or (is_type(key_after, "Name", True, phi) and self.capitalized_word.search(word_after))
                     ):
                         phi.setdefault(key_after, []).append("Last Name (Titles)")
                         phi.setdefault(key, []).append("First Name (Titles)")
@@ -674,12 +749,10 @@ class NamesPHIFinder(PHITypeFinder):
             if (is_type(i, "Male First Name", True, phi) or is_type(i, "Female First Name", True, phi)) and (
                 is_type(i, "(un)", True, phi) or is_type(i, "pop", True, phi)
             ):
-                string_after = text[i[1] :]
-
-                no_middle_initial = re.search(r"^( +)([A-Za-z\']{2,})\b", string_after)
+                no_middle_initial = self.no_middle_initial.match(text, i[1])
 
                 if no_middle_initial:
-                    key = PHI(i[1] + no_middle_initial.start(2), i[1] + no_middle_initial.end(2), no_middle_initial.group(2))
+                    key = PHI(no_middle_initial.start(2), no_middle_initial.end(2), no_middle_initial.group(2))
 
                     if key in phi:
                         if is_type(key, "Name", True, phi) and (self.__is_probably_name(key, phi)):
@@ -690,13 +763,13 @@ class NamesPHIFinder(PHITypeFinder):
                         found_phi.setdefault(key, []).append("Last Name (NamePattern1)")
                         found_phi.setdefault(i, []).append("First Name5 (NamePattern1)")
 
-                        middle_initial = re.search(r"^( +)([A-Za-z])(\.? )([A-Za-z\-][A-Za-z\-]+)\b", string_after)
+                        middle_initial = self.middle_initial.match(text, i[1])
 
                         if middle_initial:
-                            initial_start = i[1] + middle_initial.start(2)
+                            initial_start = middle_initial.start(2)
                             initial_key = PHI(initial_start, initial_start + 1, middle_initial.group(2))
                             last_name = middle_initial.group(4)
-                            last_name_key = PHI(i[1] + middle_initial.start(4), i[1] + middle_initial.end(4), last_name)
+                            last_name_key = PHI(middle_initial.start(4), middle_initial.end(4), last_name)
 
                             if last_name_key in phi and not is_type(last_name_key, "Last Name", False, phi):
                                 found_phi.setdefault(last_name_key, []).append("Last Name (NamePattern1)")
@@ -704,7 +777,7 @@ class NamesPHIFinder(PHITypeFinder):
                                 found_phi.setdefault(i, []).append("First Name11 (NamePattern1)")
 
                             else:
-                                if re.search(r"( +)([A-Za-z])(\.? )([A-Za-z][A-Za-z]+)\b\s*", string_after):
+                                if self.middle_initial_anywhere.search(text, i[1]):
                                     found_phi.setdefault(last_name_key, []).append("Last Name (NamePattern1)")
                                     found_phi.setdefault(initial_key, []).append("Initial (NamePattern1)")
                                     found_phi.setdefault(i, []).append("First Name6 (NamePattern1)")
@@ -720,16 +793,15 @@ class NamesPHIFinder(PHITypeFinder):
 
         for i in list(phi):  # transform to list because we are 1. iterating, 2. modifying
             if is_type(i, "Last Name", True, phi) and is_type(i, "(un)", True, phi):
-                string_before = text[: i[0]]
-
-                first_name_exists = re.search(r"\b([A-Za-z]+)( *)$", string_before)
+                first_name_exists = self.word_before.search(text, _last_word_start(text, i[0]), i[0])
 
                 if first_name_exists:
                     first_name = first_name_exists.group(1)
                     first_name_key = PHI(first_name_exists.start(1), first_name_exists.end(1), first_name)
 
                     if first_name_key in phi:
-                        if is_type(first_name_key, "First Name", True, merge_phi_dicts(phi, found_phi, in_place=False)) and (
+                        # same as looking the key up in `phi` merged with `found_phi`, without copying both
+                        if (is_type(first_name_key, "First Name", True, phi) or is_type(first_name_key, "First Name", True, found_phi)) and (
                             not self.__is_name_indicator(first_name)
                         ):
                             found_phi.setdefault(first_name_key, []).append("First Name8 (NamePattern2)")
@@ -743,22 +815,20 @@ class NamesPHIFinder(PHITypeFinder):
         found_phi = {}
 
         for i in list(phi):  # transform to list because we are 1. iterating, 2. modifying
-            string_after = text[i[1] :]
-
             if is_type(i, "Last Name", False, phi):
 
-                hyphenated_last_name = re.search(r"^-([A-Za-z]+)\b", string_after)
+                hyphenated_last_name = self.hyphenated_last_name.match(text, i[1])
 
                 if hyphenated_last_name:
                     found_phi.setdefault(
-                        PHI(i[1] + hyphenated_last_name.start(1), i[1] + hyphenated_last_name.end(1), hyphenated_last_name.group(1)), []
+                        PHI(hyphenated_last_name.start(1), hyphenated_last_name.end(1), hyphenated_last_name.group(1)), []
                     ).append("Last Name (NamePattern3)")
 
-                double_last_name = re.search(r"^( *)([A-Za-z]+)\b", string_after)
+                double_last_name = self.double_last_name.match(text, i[1])
 
                 if double_last_name:
                     last_name = double_last_name.group(2)
-                    last_name_key = PHI(i[1] + double_last_name.start(2), i[1] + double_last_name.end(2), last_name)
+                    last_name_key = PHI(double_last_name.start(2), double_last_name.end(2), last_name)
 
                     if last_name_key in phi:
                         if not is_type(last_name_key, "ambig", True, phi) and not is_type(last_name_key, "Last Name", False, phi):
@@ -774,10 +844,8 @@ class NamesPHIFinder(PHITypeFinder):
 
         for i in list(phi):  # transform to list because we are 1. iterating, 2. modifying
             if (not is_type(i, "ambig", True, phi) or is_type(i, "(un)", True, phi)) and is_type(i, "Name", True, phi):
-                string_before = text[: i[0]]
-
-                two_initials = re.search(r"\b([A-Za-z][\. ] ?[A-Za-z]\.?) ?$", string_before)
-                single_initial = re.search(r"\b([A-Za-z]\.?) ?$", string_before)
+                two_initials = self.two_initials_before.search(text, max(0, i[0] - INITIALS_CONTEXT), i[0])
+                single_initial = self.single_initial_before.search(text, max(0, i[0] - INITIALS_CONTEXT), i[0])
 
                 if two_initials:
                     found_phi.setdefault(
@@ -796,13 +864,11 @@ class NamesPHIFinder(PHITypeFinder):
                         found_phi.setdefault(i, []).append("Last Name (NamePattern4)")
 
             if is_type(i, "Last Name", True, phi) and not is_type(i, "ambig", True, phi):
-                string_before = text[: i[0]]
-
-                two_initials = re.search(r"\b([A-Za-z][\. ] ?[A-Za-z]\.?) ?$", string_before)
-                single_initial = re.search(r"\b([A-Za-z]\.?) ?$", string_before)
+                two_initials = self.two_initials_before.search(text, max(0, i[0] - INITIALS_CONTEXT), i[0])
+                single_initial = self.single_initial_before.search(text, max(0, i[0] - INITIALS_CONTEXT), i[0])
 
                 if two_initials:
-                    found_phi.setdefault(PHI(i[1] + two_initials.start(1), i[1] + two_initials.end(1), two_initials.group(1)), []).append(
+                    found_phi.setdefault(PHI(two_initials.start(1), two_initials.end(1), two_initials.group(1)), []).append(
                         "Initials (NamePattern5)"
                     )
 
@@ -811,31 +877,41 @@ class NamesPHIFinder(PHITypeFinder):
 
                 elif single_initial:
                     initial = single_initial.group(1)
-                    initial_key = PHI(i[1] + single_initial.start(1), i[1] + single_initial.end(1), initial)
+                    initial_key = PHI(single_initial.start(1), single_initial.end(1), initial)
 
         return found_phi
 
     def __list_of_names(self, text: str, phi: PHIDict) -> PHIDict:
         found_phi = {}
 
+        and_names = list(self.and_name.finditer(text))
+        and_name_starts = [m.start() for m in and_names]
+
         for i in list(phi):  # transform to list because we are 1. iterating, 2. modifying
             if is_type(i, "Last Name", False, phi) or is_type(i, "Male First Name", False, phi) or is_type(i, "Female First Name", False, phi):
-                string_after = text[i[1] :]
+                if self.window_facts is not None:
+                    # the "and <name>" looked for below may be anywhere after the name, outside of the window
+                    raise WindowDependsOnNote("a list of names may continue past the window")
+
+                and_or = self.and_or.match(text, i[1])
+                and_or_symbols = self.and_or_symbols.match(text, i[1])
+                three_names = self.three_names.match(text, i[1])
 
-                and_or = re.search(r"^ or|and ([A-Za-z]+)\b", string_after, re.IGNORECASE)
-                and_or_symbols = re.search(r"^( ?[\&\+] ?)([A-Za-z]+)\b", string_after, re.IGNORECASE)
-                three_names = re.search(r"^, ([A-Za-z]+)(,? and )([A-Za-z]+)\b", string_after, re.IGNORECASE)
+                if not and_or:
+                    # the first "and <name>" anywhere after the name
+                    next_and_name = bisect_left(and_name_starts, i[1] + 1)
+                    and_or = and_names[next_and_name] if next_and_name < len(and_names) else None
 
                 if and_or:
                     name = and_or.group(1)
-                    name_key = PHI(i[1] + and_or.start(1), i[1] + and_or.end(1), name)
+                    name_key = PHI(and_or.start(1), and_or.end(1), name)
 
                     if is_type(name_key, "Name", True, phi) or is_common(name):
                         found_phi.setdefault(name_key, []).append("Last Name (NamePattern6)")
 
                 elif and_or_symbols:
                     name = and_or_symbols.group(2)
-                    name_key = PHI(i[1] + and_or_symbols.start(2), i[1] + and_or_symbols.end(2), name)
+                    name_key = PHI(and_or_symbols.start(2), and_or_symbols.end(2), name)
 
                     if not is_common(name):
                         found_phi.setdefault(name_key, []).append("Last Name (NamePattern6)")
@@ -844,8 +920,8 @@ class NamesPHIFinder(PHITypeFinder):
                     name1 = three_names.group(1)
                     name2 = three_names.group(3)
 
-                    name1_key = PHI(i[1] + three_names.start(1), i[1] + three_names.end(1), name1)
-                    name2_key = PHI(i[1] + three_names.start(3), i[1] + three_names.end(3), name2)
+                    name1_key = PHI(three_names.start(1), three_names.end(1), name1)
+                    name2_key = PHI(three_names.start(3), three_names.end(3), name2)
 
                     if not is_common(name1):
                         found_phi.setdefault(name1_key, []).append("Last Name (NamePattern6)")
@@ -862,7 +938,7 @@ class NamesPHIFinder(PHITypeFinder):
         for ent in res.ents:
             if ent.label_ == "PERSON":
                 # check for firstname lastname
-                m = re.search(r"(.*)\s(.*)", ent.text)
+                m = self.first_last_split.search(ent.text)
                 if m is not None:
                     found_phi.setdefault(PHI(ent.start_char, ent.start_char + m.end(1), m.group(1)), []).append("First Name (NER)")
                     found_phi.setdefault(PHI(ent.start_char + m.start(2), ent.end_char, m.group(2)), []).append("Last Name (NER)")
@@ -890,3 +966,23 @@ class NamesPHIFinder(PHITypeFinder):
             merge_phi_dicts(phi, self.__ner(self.note, self.config.ner_model))
 
         return phi
+
+
+def _last_word_start(text: str, end: int) -> int:
+    """Start of the last word before `end`, skipping the spaces (and a final newline) after it.
+
+    `\\b([A-Za-z]+)( *)$` can only match `text[:end]` from this position, so searching from it gives the same match
+    as searching the whole prefix.
+    """
+    start = end
+
+    if start and text[start - 1] == "\n":
+        start -= 1
+
+    while start and text[start - 1] == " ":
+        start -= 1
+
+    while start and text[start - 1].isascii() and text[start - 1].isalpha():
+        start -= 1
+
+    return start
@@ -1,5 +1,6 @@
 from typing import Dict, List
 import re
+from .PatternRegistry import PatternRegistry
 from .PHITypeFinder import PHITypeFinder, PHI, PHIDict
 
 
@@ -8,10 +9,16 @@ class OhipPHIFinder(PHITypeFinder):
     Concrete implementation of PHITypeFinder for detecting OHIP numbers.
     """
 
+    segment = "line"
+
+    def __init__(self, registry: PatternRegistry = None):
+        super().__init__(registry)
+        self.ohip_pattern = self.registry.compile(r"\b\d{4}[- \/]?\d{3}[- \/]?\d{3}[- \/]?([a-zA-Z]?[a-zA-Z]?)\b")
+
     def find(self) -> PHIDict:
         phi = {}
 
-        for m in re.finditer(r"\b\d{4}[- \/]?\d{3}[- \/]?\d{3}[- \/]?([a-zA-Z]?[a-zA-Z]?)\b", self.note):
+        for m in self.ohip_pattern.finditer(self.note):
             phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append("OHIP")
 
         return phi
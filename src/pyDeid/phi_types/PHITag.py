@@ -0,0 +1,127 @@
+import re
+from enum import IntFlag
+from functools import lru_cache
+from typing import Iterable
+
+
+class PHITag(IntFlag):
+    """
+    What a PHI type label such as "Female First Name (popular/ambig)" says about the PHI.
+
+    Finders label PHI with human-readable type strings, which are written to the PHI output file as they are. The
+    pruner and replacer classify PHI by these flags instead of searching the labels, and each label is only classified
+    once per process, by `PHITag.of`.
+    """
+
+    NONE = 0
+
+    # names
+    NAME = 1 << 0
+    FIRST_NAME = 1 << 1
+    LAST_NAME = 1 << 2
+    NAME_PREFIX = 1 << 3
+    INITIALS_SINGLE = 1 << 4
+    INITIALS_DOUBLE = 1 << 5
+
+    # ambiguity, as the wordlist labels spell it
+    AMBIG = 1 << 6
+    MEDICAL_PHRASE = 1 << 7
+
+    # dates and times
+    DATE = 1 << 8
+    DATE_RANGE = 1 << 9
+    TIME = 1 << 10
+    HOLIDAY = 1 << 11
+    DAY_MONTH = 1 << 12
+    DAY_MONTH_YEAR = 1 << 13
+    MONTH_DAY = 1 << 14
+    MONTH_DAY_YEAR = 1 << 15
+
+    # identifiers and contact details
+    MRN = 1 << 16
+    SIN = 1 << 17
+    OHIP = 1 << 18
+    TELEPHONE_FAX = 1 << 19
+    EMAIL = 1 << 20
+
+    # locations
+    ADDRESS = 1 << 21
+    LOCATION = 1 << 22
+    POSTAL_CODE = 1 << 23
+    HOSPITAL = 1 << 24
+    SITE_ACRONYM = 1 << 25
+
+    # columns of the master linking log
+    MLL_FIRST_NAME = 1 << 26
+    MLL_LAST_NAME = 1 << 27
+    MLL_POSTAL_CODE = 1 << 28
+    MLL_ID = 1 << 29
+
+    @classmethod
+    def of(cls, label: str) -> "PHITag":
+        """Returns the flags of a PHI type label.
+
+        Args:
+            label: A PHI type label, e.g. "Last Name (NamePattern1)" or "first_name (MLL)".
+
+        Returns:
+            The union of the flags whose pattern is found in `label`.
+        """
+        return _tag_of(label)
+
+    @classmethod
+    def of_all(cls, labels: Iterable[str]) -> "PHITag":
+        """Returns the union of the flags of several PHI type labels, e.g. all the types of one PHI."""
+        tag = cls.NONE
+
+        for label in labels:
+            tag |= _tag_of(label)
+
+        return tag
+
+
+# the patterns the labels used to be searched with, so that every label keeps its meaning
+TAG_PATTERNS = [
+    (PHITag.NAME, re.compile("Name")),
+    (PHITag.FIRST_NAME, re.compile("First Name")),
+    (PHITag.LAST_NAME, re.compile("Last Name")),
+    (PHITag.NAME_PREFIX, re.compile("Name Prefix")),
+    (PHITag.INITIALS_SINGLE, re.compile(r"Initials \(single\)", re.IGNORECASE)),
+    (PHITag.INITIALS_DOUBLE, re.compile(r"Initials \(double\)", re.IGNORECASE)),
+    (PHITag.AMBIG, re.compile("ambig")),
+    (PHITag.MEDICAL_PHRASE, re.compile("MedicalPhrase")),
+    (PHITag.DATE, re.compile(r"date|day|month|year", re.IGNORECASE)),
+    (PHITag.DATE_RANGE, re.compile(r"Date range", re.IGNORECASE)),
+    (PHITag.TIME, re.compile("Time", re.IGNORECASE)),
+    (PHITag.HOLIDAY, re.compile("Holiday")),
+    (PHITag.DAY_MONTH, re.compile(r"^Day Month \[")),
+    (PHITag.DAY_MONTH_YEAR, re.compile(r"^Day Month Year \[")),
+    (PHITag.MONTH_DAY, re.compile(r"^Month Day \[")),
+    (PHITag.MONTH_DAY_YEAR, re.compile(r"^Month Day Year \[")),
+    (PHITag.MRN, re.compile("MRN", re.IGNORECASE)),
+    (PHITag.SIN, re.compile("SIN", re.IGNORECASE)),
+    (PHITag.OHIP, re.compile("OHIP", re.IGNORECASE)),
+    (PHITag.TELEPHONE_FAX, re.compile("Telephone/Fax")),
+    (PHITag.EMAIL, re.compile("Email Address")),
+    (PHITag.ADDRESS, re.compile("Address")),
+    (PHITag.LOCATION, re.compile("Location")),
+    (PHITag.POSTAL_CODE, re.compile("Postalcode")),
+    (PHITag.HOSPITAL, re.compile("Hospital")),
+    (PHITag.SITE_ACRONYM, re.compile("Site Acronym", re.IGNORECASE)),
+    (PHITag.MLL_FIRST_NAME, re.compile(r"first_name \(MLL\)")),
+    (PHITag.MLL_LAST_NAME, re.compile(r"last_name \(MLL\)")),
+    (PHITag.MLL_POSTAL_CODE, re.compile(r"postal_code \(MLL\)")),
+    # the replacer has always searched for "_id (MLL)", which as a regex matches "_id MLL"
+    (PHITag.MLL_ID, re.compile("_id (MLL)")),
+]
+
+
+@lru_cache(maxsize=None)
+def _tag_of(label: str) -> PHITag:
+    tag = PHITag.NONE
+
+    for flag, pattern in TAG_PATTERNS:
+        if pattern.search(label):
+            tag |= flag
+
+    return tag
@@ -1,19 +1,30 @@
 from abc import ABC, abstractmethod
 from collections import namedtuple
 from typing import Dict, List
+from .PatternRegistry import PatternRegistry
 
 PHI = namedtuple("PHI", ["start", "end", "phi"])
 PHIDict = Dict[str, List[str]]
 
 
+class WindowDependsOnNote(Exception):
+    """Raised by a finder searching one window of a long note when the PHI it finds there depends on text outside of
+    the window, so that the note is searched whole instead."""
+
+
 class PHITypeFinder(ABC):
     """
     Abstract base class for Protected Health Information (PHI) finders.
     """
 
-    def __init__(self):
+    # "line" or "paragraph" if no match of the finder ever crosses a line break or a blank line, or depends on the text
+    # outside of it, so that `PHIFinder` can memoize its results per segment; None if matches depend on the wider note
+    segment = None
+
+    def __init__(self, registry: PatternRegistry = None):
         self.phis = {}
         self.note = ''
+        self.registry = registry if registry is not None else PatternRegistry()
 
     def set_note(self, new_note:str)-> None:
         self.note = new_note
@@ -0,0 +1,43 @@
+import re
+import time
+
+
+class PatternRegistry:
+    """
+    Compiles the regular expressions used by the finders once, and keeps them for the life of the process.
+
+    A single note runs more distinct patterns than the `re` module caches, so passing pattern strings to
+    `re.finditer` and friends recompiles most of them on every note. Finders compile their static and
+    wordlist-derived patterns through a shared registry when they are constructed and call the compiled
+    objects directly. Identical patterns used by several finders are compiled once.
+    """
+
+    def __init__(self):
+        self.patterns = {}
+        self.compile_time = 0.0
+
+    def compile(self, pattern: str, flags: int = 0) -> re.Pattern:
+        """Returns the compiled `pattern`, compiling it on first use.
+
+        Args:
+            pattern: The regular expression.
+            flags: `re` flags to compile it with.
+
+        Returns:
+            The compiled regular expression.
+        """
+        compiled = self.patterns.get((pattern, flags))
+
+        if compiled is None:
+            start_time = time.perf_counter()
+            compiled = re.compile(pattern, flags)
+            self.compile_time += time.perf_counter() - start_time
+            self.patterns[(pattern, flags)] = compiled
+
+        return compiled
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def report(self) -> str:
+        return f"Compiled {len(self)} patterns in {self.compile_time:.3f} s"
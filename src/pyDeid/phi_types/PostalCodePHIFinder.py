@@ -1,5 +1,6 @@
 from typing import List, Tuple
 import re
+from .PatternRegistry import PatternRegistry
 from .PHITypeFinder import PHIDict, PHITypeFinder, PHI
 
 
@@ -8,10 +9,18 @@ class PostalCodePHIFinder(PHITypeFinder):
     Concrete implementation of PHITypeFinder for detecting postal codes.
     """
 
+    segment = "line"
+
+    def __init__(self, registry: PatternRegistry = None):
+        super().__init__(registry)
+        self.postal_code_pattern = self.registry.compile(
+            r"\b([a-zA-Z]\d[a-zA-Z][ \-]?\d[a-zA-Z]\d)\b"
+        )
+
     def find(self) -> PHIDict:
         phi = {}
 
-        for m in re.finditer(r"\b([a-zA-Z]\d[a-zA-Z][ \-]?\d[a-zA-Z]\d)\b", self.note):
+        for m in self.postal_code_pattern.finditer(self.note):
             phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append("Postalcode")
 
         return phi
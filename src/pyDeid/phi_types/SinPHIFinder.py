@@ -1,5 +1,6 @@
 from typing import Dict, List
 import re
+from .PatternRegistry import PatternRegistry
 from .PHITypeFinder import PHITypeFinder, PHI, PHIDict
 
 
@@ -8,10 +9,16 @@ class SinPHIFinder(PHITypeFinder):
     Concrete implementation of PHITypeFinder for detecting Canadian Social Insurance Numbers (SIN).
     """
 
+    segment = "line"
+
+    def __init__(self, registry: PatternRegistry = None):
+        super().__init__(registry)
+        self.sin_pattern = self.registry.compile(r"\b(\d{3}([- \/]?)\d{3}\2\d{3})\b")
+
     def find(self) -> PHIDict:
         phi = {}
 
-        for m in re.finditer(r"\b(\d{3}([- \/]?)\d{3}\2\d{3})\b", self.note):
+        for m in self.sin_pattern.finditer(self.note):
             phi.setdefault(PHI(m.start(), m.end(), m.group()), []).append("SIN")
 
         return phi
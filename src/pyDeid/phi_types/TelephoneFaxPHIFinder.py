@@ -1,5 +1,6 @@
 import re
 from typing import List
+from .PatternRegistry import PatternRegistry
 from .PHITypeFinder import PHI, PHITypeFinder, PHIDict
 
 
@@ -8,11 +9,20 @@ class TelephoneFaxPHIFinder(PHITypeFinder):
     Concrete implementation of PHITypeFinder for detecting telephone and fax numbers.
     """
 
-    def __init__(self, area_codes: List[str] = None, disqualifiers: List[str] = None):
-        super().__init__()
+    def __init__(self, area_codes: List[str] = None, disqualifiers: List[str] = None, registry: PatternRegistry = None):
+        super().__init__(registry)
         self.area_codes = area_codes if area_codes is not None else []
         self.disqualifiers = disqualifiers if disqualifiers is not None else []
 
+        compile = self.registry.compile
+
+        self.extension_pattern = compile(r"^(\s*(x|ex|ext|extension)\.?\s*[\(]?[\d]+[\)]?)\b", re.IGNORECASE)
+        self.telephone_pattern = compile(r"\(?(\d{3})\s*[\)\.\/\-\, ]*\s*\d\s*\d\s*\d\s*[ \-\.\/]*\s*\d\s*\d\s*\d\s*\d")
+        self.full_telephone_pattern = compile(r"\(?\d{3}\s*[\)\.\/\-\, ]*\s*\d{3}\s*[ \-\.\/]*\s*\d{4}")
+        self.telephone_9_digit_pattern = compile(r"\(?(\d{3})\s*[\)\.\/\-\=\, ]*\s*\d{3}\s*[ \-\.\/\=]*\s*\d{3}\b")
+        self.telephone_11_digit_pattern = compile(r"\(?(\d{3})\s*[\)\.\/\-\=\, ]*\s*\d{3}\s*[ \-\.\/\=]*\s*\d{5}\b")
+        self.telephone_4_digit_exchange_pattern = compile(r"\(?\d{3}?\s?[\)\.\/\-\=\, ]*\s?\d{4}\s?[ \-\.\/\=]*\s?\d{3}\b")
+
     def __is_common_area_code(self, x):
         return x in self.area_codes
 
@@ -28,7 +38,7 @@ class TelephoneFaxPHIFinder(PHITypeFinder):
 
         next_seg = x[end:]
 
-        extension = re.search(r"^(\s*(x|ex|ext|extension)\.?\s*[\(]?[\d]+[\)]?)\b", next_seg, re.IGNORECASE)
+        extension = self.extension_pattern.search(next_seg)
 
         if extension:
             end = end + extension.end()
@@ -40,28 +50,26 @@ class TelephoneFaxPHIFinder(PHITypeFinder):
 
         # ###-###-#### (potentially with arbitrary line breaks)
         # accept number with line breaks only if it starts with a valid area code
-        for m in re.finditer(
-            r"\(?(\d{3})\s*[\)\.\/\-\, ]*\s*\d\s*\d\s*\d\s*[ \-\.\/]*\s*\d\s*\d\s*\d\s*\d", self.note
-        ):  # prepend all regex w/ '\(?' outside of testing
+        for m in self.telephone_pattern.finditer(self.note):  # prepend all regex w/ '\(?' outside of testing
 
-            if re.search(r"\(?\d{3}\s*[\)\.\/\-\, ]*\s*\d{3}\s*[ \-\.\/]*\s*\d{4}", m.group()):
+            if self.full_telephone_pattern.search(m.group()):
                 phi.setdefault(self.__telephone_match(self.note, m), []).append("Telephone/Fax")
             elif self.__is_common_area_code(m.group(1)):
                 phi.setdefault(self.__telephone_match(self.note, m), []).append("Telephone/Fax")
 
         # ###-###-###
-        for m in re.finditer(r"\(?(\d{3})\s*[\)\.\/\-\=\, ]*\s*\d{3}\s*[ \-\.\/\=]*\s*\d{3}\b", self.note):
+        for m in self.telephone_9_digit_pattern.finditer(self.note):
             if self.__is_common_area_code(m.group(1)):
                 phi.setdefault(self.__telephone_match(self.note, m), []).append("Telephone/Fax")
 
         # this will always create multiple matches with pattern 1, its ok, double obscure it.
         # ###-###-#####
-        for m in re.finditer(r"\(?(\d{3})\s*[\)\.\/\-\=\, ]*\s*\d{3}\s*[ \-\.\/\=]*\s*\d{5}\b", self.note):
+        for m in self.telephone_11_digit_pattern.finditer(self.note):
             if self.__is_common_area_code(m.group(1)):
                 phi.setdefault(self.__telephone_match(self.note, m), []).append("Telephone/Fax")
 
         # ###-####-###
-        for m in re.finditer(r"\(?\d{3}?\s?[\)\.\/\-\=\, ]*\s?\d{4}\s?[ \-\.\/\=]*\s?\d{3}\b", self.note):
+        for m in self.telephone_4_digit_exchange_pattern.finditer(self.note):
             phi.setdefault(self.__telephone_match(self.note, m), []).append("Telephone/Fax")
 
         return phi
@@ -0,0 +1,261 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, Optional
+
+MAGIC = b"PYDEIDIX"
+VERSION = 2
+
+# magic, version and length of the JSON header
+PREAMBLE = struct.Struct("<8sII")
+
+
+class WordlistIndex:
+    """
+    A read-only set of wordlist entries stored in a memory-mapped index file.
+
+    `load_file` turns the text wordlists into Python sets in every process, which takes most of the startup time and
+    tens of MB of memory per worker for the large name and common word lists. The index file holds every wordlist as
+    an open-addressing hash table over its sorted, UTF-8 encoded entries, and is mapped read-only, so the pages are
+    loaded on demand and shared by all the processes on the machine. Membership checks hash the word with CRC-32,
+    which slots also store, and only compare the bytes of entries whose hash matches, without building a Python
+    object for any entry or remembering the words looked up.
+
+    Index files are written by `compile_wordlist_index`, or `python -m pyDeid.wordlists` for the bundled wordlists, and
+    opened with `open_wordlist_index`.
+    """
+
+    def __init__(self, path: str, name: str):
+        """
+        Args:
+            path: Path of the index file.
+            name: Name of the wordlist in the index, e.g. "all_last_names.txt".
+        """
+        self.path = path
+        self.name = name
+
+        data, lists = _map_index(path)
+        table_offset, slots, offsets_offset, count, strings_offset = lists[name]
+
+        self.data = data
+        self.count = count
+        self.mask = slots - 1
+        # pairs of the CRC-32 of an entry and its position + 1, or 0 for an empty slot
+        self.table = data[table_offset : table_offset + 8 * slots].cast("I")
+        self.offsets = data[offsets_offset : offsets_offset + 4 * (count + 1)].cast("I")
+        self.strings_offset = strings_offset
+
+    def __reduce__(self):
+        # workers map the file again rather than receiving a copy of it
+        return (WordlistIndex, (self.path, self.name))
+
+    def __contains__(self, word) -> bool:
+        if not isinstance(word, str):
+            return False
+
+        try:
+            key = word.encode()
+        except UnicodeEncodeError:
+            # lone surrogates, which no wordlist contains
+            return False
+
+        crc = zlib.crc32(key)
+        mask = self.mask
+        slot = crc & mask
+        table = self.table
+
+        while True:
+            entry = table[2 * slot + 1]
+
+            if not entry:
+                return False
+
+            if table[2 * slot] == crc:
+                start = self.strings_offset + self.offsets[entry - 1]
+                end = self.strings_offset + self.offsets[entry]
+
+                if self.data[start:end] == key:
+                    return True
+
+            slot = (slot + 1) & mask
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[str]:
+        base = self.strings_offset
+        offsets = self.offsets
+
+        for i in range(self.count):
+            yield str(self.data[base + offsets[i] : base + offsets[i + 1]], "utf-8")
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the wordlist in the index file."""
+        return self.table.nbytes + self.offsets.nbytes + self.offsets[self.count]
+
+
+def compile_wordlist_index(
+    path: str, wordlists: Dict[str, Iterable[str]], sources: Iterable[str] = ()
+) -> None:
+    """Writes an index file holding `wordlists`.
+
+    Args:
+        path: Path of the index file to write.
+        wordlists: The entries of each wordlist, by name.
+        sources: Paths of the files the wordlists were read from. `open_wordlist_index` only opens the index while
+            the size and modification time of these files are unchanged.
+    """
+    header = {
+        "byteorder": sys.byteorder,
+        "sources": {os.path.basename(source): _file_stamp(source) for source in sources},
+        "lists": {},
+    }
+    sections = []
+    size = 0
+
+    for name, entries in wordlists.items():
+        encoded = sorted({entry.encode("utf-8") for entry in entries})
+
+        slots = 1
+        while slots < 2 * len(encoded):
+            slots *= 2
+
+        table = array("I", [0]) * (2 * slots)
+        offsets = array("I", [0])
+
+        for i, key in enumerate(encoded):
+            crc = zlib.crc32(key)
+            slot = crc & (slots - 1)
+
+            while table[2 * slot + 1]:
+                slot = (slot + 1) & (slots - 1)
+
+            table[2 * slot] = crc
+            table[2 * slot + 1] = i + 1
+            offsets.append(offsets[-1] + len(key))
+
+        strings = b"".join(encoded)
+        header["lists"][name] = [size, slots, size + 8 * slots, len(encoded)]
+        size += 8 * slots + 4 * len(offsets)
+        header["lists"][name].append(size)
+        size += len(strings) + -len(strings) % 4
+
+        sections += [
+            table.tobytes(),
+            offsets.tobytes(),
+            strings,
+            bytes(-len(strings) % 4),
+        ]
+
+    encoded_header = json.dumps(header).encode("utf-8")
+    encoded_header += b" " * (-(PREAMBLE.size + len(encoded_header)) % 4)
+
+    directory = os.path.dirname(os.path.abspath(path))
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory, mode=0o700)
+
+    # write next to the destination and move it into place, so readers never map a partly written file
+    partial_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(partial_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded_header)))
+        f.write(encoded_header)
+
+        for section in sections:
+            f.write(section)
+
+    os.replace(partial_path, path)
+
+
+def open_wordlist_index(
+    path: str, source_dir: str
+) -> Optional[Dict[str, WordlistIndex]]:
+    """Opens the wordlists of an index file.
+
+    Args:
+        path: Path of the index file.
+        source_dir: Directory holding the text files the index was compiled from.
+
+    Returns:
+        The wordlists of the index by name, or None if there is no index at `path`, it was written by another version
+        or on a machine of another byte order, or any of its source files changed size or was modified since it was
+        compiled. Source files are only stat'ed, so opening the index costs no more than reading its header.
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        header = _read_header(path)
+    except ValueError:
+        return None
+
+    if header["byteorder"] != sys.byteorder:
+        return None
+
+    for source, stamp in header["sources"].items():
+        source_path = os.path.join(source_dir, source)
+
+        if not os.path.exists(source_path) or _file_stamp(source_path) != stamp:
+            return None
+
+    return {name: WordlistIndex(path, name) for name in header["lists"]}
+
+
+def _read_header(path: str) -> dict:
+    with open(path, "rb") as f:
+        preamble = f.read(PREAMBLE.size)
+
+        if len(preamble) < PREAMBLE.size:
+            raise ValueError(f"{path} is not a wordlist index")
+
+        magic, version, header_length = PREAMBLE.unpack(preamble)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} wordlist index")
+
+        header = json.loads(f.read(header_length))
+        header["data_offset"] = PREAMBLE.size + header_length
+
+        return header
+
+
+@lru_cache(maxsize=None)
+def _map_index(path: str):
+    """Maps an index file once per process, and returns its data and the absolute offsets of its wordlists."""
+    header = _read_header(path)
+
+    with open(path, "rb") as f:
+        data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    offset = header["data_offset"]
+    lists = {
+        name: (
+            offset + table_offset,
+            slots,
+            offset + offsets_offset,
+            count,
+            offset + strings_offset,
+        )
+        for name, (
+            table_offset,
+            slots,
+            offsets_offset,
+            count,
+            strings_offset,
+        ) in header["lists"].items()
+    }
+
+    return data, lists
+
+
+def _file_stamp(path: str) -> list:
+    stat = os.stat(path)
+
+    return [stat.st_size, stat.st_mtime_ns]
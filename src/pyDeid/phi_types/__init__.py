@@ -4,10 +4,13 @@ from os import path
 from .AddressPHIFinder import *
 from .DatesPHIFinder import *
 from .EmailPHIFinder import *
+from .Gazetteer import *
 from .HospitalNamePHIFinder import *
 from .MrnPHIFinder import *
 from .NamesPHIFinder import *
 from .OhipPHIFinder import *
+from .PatternRegistry import *
+from .PHITag import *
 from .PostalCodePHIFinder import *
 from .SinPHIFinder import *
 from .TelephoneFaxPHIFinder import *
@@ -1,11 +1,18 @@
+import hashlib
 import os
 import re
 from collections import namedtuple
+from functools import lru_cache
 from .. import wordlists
+from .PHITag import PHITag
+from .WordlistIndex import open_wordlist_index
 
 
 DATA_PATH = wordlists.__path__[0]
 
+# an index built into the package before it was installed, see `wordlist_index`
+INDEX_PATH = os.path.join(DATA_PATH, "wordlists.idx")
+
 
 PHI = namedtuple("PHI", ["start", "end", "phi"])
 
@@ -113,32 +120,122 @@ def load_file(filename, optimization="lookup"):
         return [line.strip().upper() for line in open(filename)]
 
 
-unambig_common_words = load_file(os.path.join(DATA_PATH, "notes_common.txt"))
+# common word lists, loaded on first use rather than on import, as most PHI types never look at them
+SHARED_WORDLISTS = {
+    "unambig_common_words": ["notes_common.txt"],
+    "medical_words": ["sno_edited.txt"],
+    "very_common_words": ["commonest_words.txt"],
+    "just_common_words": ["common_words.txt"],
+    "common_words": ["sno_edited.txt", "commonest_words.txt", "common_words.txt"],
+}
+
+
+def user_cache_dir() -> str:
+    """Returns `pyDeid` in `$XDG_CACHE_HOME`, or in `~/.cache`, where the files pyDeid builds for later runs are kept."""
+    return os.path.join(
+        os.environ.get("XDG_CACHE_HOME")
+        or os.path.join(os.path.expanduser("~"), ".cache"),
+        "pyDeid",
+    )
+
+
+def user_index_path() -> str:
+    """Returns the path `python -m pyDeid.wordlists` compiles the index to by default, in the user cache directory.
+
+    The file is named after the wordlists directory, so that installs of pyDeid in different environments each keep
+    their own index.
+    """
+    digest = hashlib.sha256(DATA_PATH.encode("utf-8")).hexdigest()[:16]
+
+    return os.path.join(user_cache_dir(), f"wordlists-{digest}.idx")
+
+
+@lru_cache(maxsize=None)
+def wordlist_index():
+    """Returns the wordlists of the compiled index by name, or None if the index was not compiled or is out of date.
+
+    The index is looked for in the user cache directory, then in the package for one built before it was installed.
+    Lookup wordlists are read from the memory-mapped index instead of being loaded into sets when it is available.
+    """
+    for path in (user_index_path(), INDEX_PATH):
+        index = open_wordlist_index(path, DATA_PATH)
+
+        if index is not None:
+            return index
 
+    return None
 
-medical_words = load_file(os.path.join(DATA_PATH, "sno_edited.txt"))
-very_common_words = load_file(os.path.join(DATA_PATH, "commonest_words.txt"))
-just_common_words = load_file(os.path.join(DATA_PATH, "common_words.txt"))
 
+def wordlist_index_sources():
+    """Returns the wordlists the index is compiled from, as loaded for lookup, and the files they are read from.
+
+    The index holds every wordlist file under its file name and every one of the `SHARED_WORDLISTS` under its name.
+    """
+    sources = sorted(
+        os.path.join(DATA_PATH, filename)
+        for filename in os.listdir(DATA_PATH)
+        if filename.endswith(".txt")
+    )
+    indexed = {os.path.basename(source): load_file(source) for source in sources}
+
+    for name, filenames in SHARED_WORDLISTS.items():
+        indexed[name] = set().union(*(indexed[filename] for filename in filenames))
 
-common_words = medical_words | very_common_words | just_common_words
+    return indexed, sources
+
+
+@lru_cache(maxsize=None)
+def load_wordlist(name: str):
+    """Returns the words of one of the `SHARED_WORDLISTS`, loading its files the first time it is asked for."""
+    index = wordlist_index()
+
+    if index is not None and name in index:
+        return index[name]
+
+    return set().union(
+        *(
+            load_file(os.path.join(DATA_PATH, filename))
+            for filename in SHARED_WORDLISTS[name]
+        )
+    )
+
+
+def __getattr__(name):
+    # the word lists used to be module attributes, loaded on import
+    if name in SHARED_WORDLISTS:
+        return load_wordlist(name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def is_type(key: str, phitype: str, pattern: bool, phi):
     types = phi.get(key)
     if types is not None:
-        for val in phi.get(key):
+        for val in types:
             if pattern:
-                if re.search(phitype, val):
+                if _label_matches(phitype, val):
                     return True
             else:
                 return val == phitype
 
 
+@lru_cache(maxsize=None)
+def _label_matches(phitype: str, label: str) -> bool:
+    # the finders ask about the same few type patterns and labels over and over
+    return re.search(phitype, label) is not None
+
+
+def has_tag(key, tag: PHITag, phi) -> bool:
+    """Whether any of the types of `key` in `phi` has any of the flags in `tag`."""
+    types = phi.get(key)
+
+    return types is not None and bool(PHITag.of_all(types) & tag)
+
+
 def is_ambig(key, phi):
     types = phi.get(key)
 
-    if all(re.search("ambig", val) for val in types):
+    if all(PHITag.AMBIG in PHITag.of(val) for val in types):
         return True
     else:
         return False
@@ -187,16 +284,19 @@ def is_name_indicator(x):
 
 def is_common(x):
     return x is not None and (
-        x.upper() in common_words or x.upper() in unambig_common_words
+        x.upper() in load_wordlist("common_words")
+        or x.upper() in load_wordlist("unambig_common_words")
     )
 
 
 def is_commonest(x):
-    return x is not None and (x.upper() in very_common_words or is_unambig_common(x))
+    return x is not None and (
+        x.upper() in load_wordlist("very_common_words") or is_unambig_common(x)
+    )
 
 
 def is_unambig_common(x):
-    return x is not None and x.upper() in unambig_common_words
+    return x is not None and x.upper() in load_wordlist("unambig_common_words")
 
 
 def is_probably_measurement(x):
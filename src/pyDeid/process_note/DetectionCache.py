@@ -0,0 +1,294 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from multiprocessing.util import Finalize
+from typing import Dict, List, Optional, Tuple
+from ..phi_types.DatesPHIFinder import Date
+from ..phi_types.utils import PHI
+
+# name and version of the database format, kept in its `cache_format` table; databases of another format are refused
+FORMAT = "pyDeid detection cache"
+FORMAT_VERSION = 1
+
+
+class DetectionCache:
+    """
+    Remembers the pruned PHI of each note by a hash of its content, so a note seen before skips the finders and the
+    pruner and goes straight to the replacer.
+
+    Copied-forward and templated notes are often byte-identical across encounters. Detection only depends on the note,
+    its master linking log row and the finder configuration, which are all hashed into the key, while surrogates are
+    still drawn for every note. Entries are kept in a bounded in-memory LRU and, with a `path`, in an SQLite database
+    shared by the worker processes and by later runs.
+
+    The database stores each entry as JSON holding the offsets and types of the PHI, and the day, month and year parsed
+    from each date. The PHI text is taken from the note on a hit, so it is not stored, but the parsed dates and the
+    offsets are still PHI of the notes: the database must be protected like the notes themselves. Writes are
+    committed every `commit_every` notes and when the process exits, and the oldest entries are deleted once there
+    are more than `max_disk_entries`.
+
+    Each entry also keeps the time its detection took, so that a hit can report the time it saved.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100000,
+        path: str = None,
+        max_disk_entries: int = 1000000,
+        commit_every: int = 256,
+    ):
+        """
+        Args:
+            max_entries: Largest number of notes kept in memory, per process.
+            path: Path of an SQLite database persisting the entries, created if needed. Without it, entries are only
+                kept in memory. A database that is not a detection cache of this format raises a ValueError.
+            max_disk_entries: Largest number of notes kept in the database.
+            commit_every: Number of notes written by a process between commits to the database.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+
+        if max_disk_entries < 1:
+            raise ValueError("max_disk_entries must be positive")
+
+        if commit_every < 1:
+            raise ValueError("commit_every must be positive")
+
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.commit_every = commit_every
+        self.path = None if path is None else os.path.abspath(os.path.expanduser(path))
+
+        # fail on a foreign database when the cache is set up, rather than on every note in the workers
+        if self.path is not None:
+            _open_database(self.path).close()
+
+        # hash of the finder configuration, set by `pyDeidBuilder.build()`
+        self.namespace = ""
+
+        self.entries = OrderedDict()
+        self.connection = None
+        self.pending_writes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_time = 0.0
+
+    def __getstate__(self):
+        # every process opens its own connection, and copies sent to workers start with an empty LRU rather than
+        # carrying the parent's entries with every task
+        state = self.__dict__.copy()
+        state["entries"] = OrderedDict()
+        state["connection"] = None
+        state["pending_writes"] = 0
+
+        return state
+
+    def key(self, note: str, row_from_mll: Dict[str, str] = None) -> str:
+        """Returns the key of a note and its master linking log row."""
+        content = json.dumps([self.namespace, note, row_from_mll], sort_keys=True)
+
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, note: str) -> Optional[Dict[PHI, List[str]]]:
+        """Returns a copy of the pruned PHI stored under `key` for `note`, or None if there is none."""
+        start_time = time.perf_counter()
+        entry = self.entries.get(key)
+
+        if entry is not None:
+            self.entries.move_to_end(key)
+        elif self.path is not None:
+            row = (
+                self._database()
+                .execute("SELECT spans FROM phi_spans WHERE key = ?", (key,))
+                .fetchone()
+            )
+
+            if row is not None:
+                entry = _decode(row[0], note)
+                self._remember(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        items, detection_time = entry
+        self.hits += 1
+        self.saved_time += detection_time - (time.perf_counter() - start_time)
+
+        return {phi: list(types) for phi, types in items}
+
+    def put(
+        self,
+        key: str,
+        note: str,
+        pruned_phi: Dict[PHI, List[str]],
+        detection_time: float,
+    ) -> None:
+        """Stores the pruned PHI of `note`, and the time its detection took."""
+        entry = (
+            [(phi, list(types)) for phi, types in pruned_phi.items()],
+            detection_time,
+        )
+        self._remember(key, entry)
+
+        if self.path is None:
+            return
+
+        spans = _encode(entry, note)
+
+        # PHI whose text is not the note's text at its offsets cannot be rebuilt from the note, so it is only kept
+        # in memory
+        if spans is None:
+            return
+
+        database = self._database()
+        database.execute(
+            "INSERT OR REPLACE INTO phi_spans (key, spans) VALUES (?, ?)",
+            (key, spans),
+        )
+        self.pending_writes += 1
+
+        if self.pending_writes >= self.commit_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Commits the pending writes to the database, deleting its oldest entries beyond `max_disk_entries`."""
+        if self.connection is None or not self.pending_writes:
+            return
+
+        _commit(self.connection, self.max_disk_entries)
+        self.pending_writes = 0
+
+    def stats(self) -> Tuple[int, int, float]:
+        """Returns the hits, misses and seconds saved so far in this process."""
+        return self.hits, self.misses, self.saved_time
+
+    def report(self) -> str:
+        lookups = self.hits + self.misses
+
+        return (
+            f"Detection cache: {self.hits} hits of {lookups} notes "
+            f"({self.hits / lookups if lookups else 0:.1%}), {self.saved_time:.3f} s saved"
+        )
+
+    def _remember(self, key, entry) -> None:
+        self.entries[key] = entry
+
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _database(self) -> sqlite3.Connection:
+        if self.connection is None:
+            self.connection = _open_database(self.path)
+
+            # commits the last writes when the cache is collected or the process exits, as worker processes exit
+            # without running `atexit` handlers but do run these finalizers
+            Finalize(
+                self,
+                _commit,
+                args=(self.connection, self.max_disk_entries),
+                exitpriority=10,
+            )
+
+        return self.connection
+
+
+def _open_database(path: str) -> sqlite3.Connection:
+    """Connects to the database at `path`, creating it if it is new, and checks that it is a detection cache of
+    `FORMAT_VERSION`."""
+    directory = os.path.dirname(path)
+
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # concurrent workers wait for each other's writes rather than failing
+    connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+
+    try:
+        # processes opening a new database one after the other create its tables once
+        connection.execute("BEGIN IMMEDIATE")
+        tables = {
+            name
+            for name, in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+
+        if not tables:
+            connection.execute(
+                "CREATE TABLE cache_format (format TEXT NOT NULL, version INTEGER NOT NULL)"
+            )
+            connection.execute(
+                "INSERT INTO cache_format (format, version) VALUES (?, ?)",
+                (FORMAT, FORMAT_VERSION),
+            )
+            connection.execute(
+                "CREATE TABLE phi_spans (key TEXT PRIMARY KEY, spans TEXT)"
+            )
+        elif "cache_format" not in tables or connection.execute(
+            "SELECT format, version FROM cache_format"
+        ).fetchall() != [(FORMAT, FORMAT_VERSION)]:
+            raise ValueError(
+                f"{path} is not a version {FORMAT_VERSION} {FORMAT} database"
+            )
+
+        connection.commit()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+    except sqlite3.DatabaseError as e:
+        connection.close()
+        raise ValueError(f"{path} is not a {FORMAT} database") from e
+    except BaseException:
+        connection.close()
+        raise
+
+    return connection
+
+
+def _commit(connection: sqlite3.Connection, max_disk_entries: int) -> None:
+    # rows are numbered in the order they were written, and replacing a row renumbers it
+    connection.execute(
+        "DELETE FROM phi_spans WHERE rowid <= (SELECT MAX(rowid) FROM phi_spans) - ?",
+        (max_disk_entries,),
+    )
+    connection.commit()
+
+
+def _encode(entry, note: str) -> Optional[str]:
+    """Returns the JSON stored for an entry: the offsets and types of each PHI and the parsed fields of each date,
+    without the PHI text. None if the text of a PHI is not the note's text at its offsets.
+    """
+    items, detection_time = entry
+    spans = []
+
+    for phi, types in items:
+        if isinstance(phi.phi, Date):
+            text = phi.phi.date_string
+            date = [phi.phi.day, phi.phi.month, phi.phi.year]
+        else:
+            text = phi.phi
+            date = None
+
+        if text != note[phi.start : phi.end]:
+            return None
+
+        spans.append([phi.start, phi.end, types, date])
+
+    return json.dumps([detection_time, spans])
+
+
+def _decode(spans: str, note: str):
+    """Returns the entry stored as `spans` by `_encode`, taking the PHI text from `note`."""
+    detection_time, spans = json.loads(spans)
+    items = []
+
+    for start, end, types, date in spans:
+        text = note[start:end]
+        phi = PHI(start, end, text if date is None else Date(text, *date))
+        items.append((phi, types))
+
+    return items, detection_time
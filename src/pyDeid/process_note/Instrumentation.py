@@ -0,0 +1,99 @@
+import json
+import time
+from typing import Callable, Dict, Iterable, List
+
+# stage name, seconds, PHI spans emitted
+Hook = Callable[[str, float, int], None]
+
+
+class Instrumentation:
+    """
+    Records the wall time, number of calls and PHI spans emitted by each stage of de-identification.
+
+    Stages are named after what they time: "find.<finder class>" for each finder in `PHIFinder.find_phi`, "prune",
+    "replace", and on the main process of `Deidentifier.run()` "read", "write" and "wait" (blocked on the workers).
+    Stages are recorded in the process that ran them. After each task, `run()` drains the records of the worker and
+    merges them into its own, so the totals cover every process, and writes them as a JSON report at the end.
+
+    Hooks are called with the stage, seconds and spans of every record, in the process the stage ran in, e.g. to
+    forward them to a tracing system. They are sent to the worker processes with the handler, so they must be
+    picklable.
+    """
+
+    def __init__(self, hooks: Iterable[Hook] = ()):
+        """
+        Args:
+            hooks: Functions called with the stage name, seconds and spans of every record.
+        """
+        self.hooks = list(hooks)
+
+        # calls, seconds and spans of each stage
+        self.stages = {}
+
+    def __getstate__(self):
+        # copies sent to workers start empty, so that draining them never returns the records of this process
+        state = self.__dict__.copy()
+        state["stages"] = {}
+
+        return state
+
+    def record(self, stage: str, seconds: float, spans: int = 0) -> None:
+        totals = self.stages.get(stage)
+
+        if totals is None:
+            totals = self.stages[stage] = [0, 0.0, 0]
+
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] += spans
+
+        for hook in self.hooks:
+            hook(stage, seconds, spans)
+
+    def time(self, stage: str, function: Callable, *args):
+        """Calls `function(*args)` and records it under `stage`, with the length of the result as its spans."""
+        start_time = time.perf_counter()
+        result = function(*args)
+        self.record(stage, time.perf_counter() - start_time, len(result))
+
+        return result
+
+    def drain(self) -> Dict[str, List]:
+        """Returns the records so far and starts over, e.g. to send a worker's records to the main process."""
+        stages = self.stages
+        self.stages = {}
+
+        return stages
+
+    def merge(self, stages: Dict[str, List]) -> None:
+        """Adds records drained from another process. Hooks were already called by that process."""
+        for stage, (calls, seconds, spans) in stages.items():
+            totals = self.stages.setdefault(stage, [0, 0.0, 0])
+            totals[0] += calls
+            totals[1] += seconds
+            totals[2] += spans
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Returns the totals of each stage, slowest first."""
+        return {
+            stage: {
+                "calls": calls,
+                "seconds": seconds,
+                "spans": spans,
+                "ms_per_call": 1000 * seconds / calls if calls else 0.0,
+            }
+            for stage, (calls, seconds, spans) in sorted(
+                self.stages.items(), key=lambda item: -item[1][1]
+            )
+        }
+
+    def report(self) -> str:
+        return "Stages (calls, s, spans): " + ", ".join(
+            f"{stage} ({totals['calls']}, {totals['seconds']:.3f}, {totals['spans']})"
+            for stage, totals in self.to_dict().items()
+        )
+
+    def dump(self, path: str, **summary) -> None:
+        """Writes the totals of each stage as JSON, along with `summary` fields such as the run's wall time."""
+        with open(path, "w") as f:
+            json.dump({**summary, "stages": self.to_dict()}, f, indent=2)
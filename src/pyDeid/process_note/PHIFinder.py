@@ -2,8 +2,36 @@ from typing import *
 from ..phi_types.utils import CustomRegex
 
 from ..phi_types import *
+from ..phi_types.utils import load_wordlist, wordlist_index
+from ..phi_types.WordlistIndex import WordlistIndex
 
+import hashlib
 import pkg_resources
+import sys
+import time
+from collections import OrderedDict
+from copy import copy
+
+# attributes of the finders of each PHI type, None for the types that are not enabled
+FINDER_ATTRIBUTES = (
+    "names_finder",
+    "date_finder",
+    "email_finder",
+    "telephone_fax_finder",
+    "address_finder",
+    "postal_code_finder",
+    "sin_finder",
+    "ohip_finder",
+    "mrn_finder",
+    "hospital_name_finder",
+)
+
+# separators of the segments named by `PHITypeFinder.segment`
+SEGMENT_SEPARATORS = {"line": "\n", "paragraph": "\n\n"}
+
+# approximate bytes held by a segment cache entry and by each PHI in it, besides the PHI text
+SEGMENT_ENTRY_BYTES = 256
+SEGMENT_SPAN_BYTES = 192
 
 
 class PHIFinder:
@@ -41,198 +69,319 @@ class PHIFinder:
         custom_patient_first_names: List[str] = field(default_factory=list)
         custom_patient_last_names: List[str] = field(default_factory=list)
         ner_model: Any = None
+        segment_cache_bytes: int = 4 * 2**20
 
     def __init__(self, config: Config) -> None:
         """Initializes a PHIFinder object used to find PHIs on a note"""
 
         self.types = config.phi_types
-        self.custom_regexes = config.custom_regexes
 
         self.phis = {}
         self.note = ""
 
-        DATA_PATH = pkg_resources.resource_filename("pyDeid", "wordlists/")
-
-        self.postal_code_finder = PostalCodePHIFinder()
-        self.hospital_name_finder = HospitalNamePHIFinder(
-            hospitals=load_file(
-                os.path.join(DATA_PATH, "ontario_hospitals.txt"),
-                optimization="iteration",
-            ),
-            hospital_acronyms=load_file(
-                os.path.join(DATA_PATH, "hospital_acronyms.txt"),
-                optimization="iteration",
-            ),
-        )
-        self.address_finder = AddressPHIFinder(
-            local_places_unambig=load_file(
-                os.path.join(DATA_PATH, "local_places_unambig_v2.txt"),
-                optimization="iteration",
-            ),
-        )
-        self.sin_finder = SinPHIFinder()
-        self.ohip_finder = OhipPHIFinder()
-        self.mrn_finder = MrnPHIFinder()
-        self.telephone_fax_finder = TelephoneFaxPHIFinder(
-            area_codes=load_file(os.path.join(DATA_PATH, "canadian_area_code.txt")),
-            disqualifiers=[
-                "HR",
-                "Heart",
-                "BP",
-                "SVR",
-                "STV",
-                "VT",
-                "Tidal Volumes",
-                "Tidal Volume",
-                "TV",
-                "CKS",
-            ],
-        )
-        self.email_finder = EmailPHIFinder()
-        self.date_finder = DatesPHIFinder(
-            # two_digit_threshold=config.two_digit_threshold,
-            # valid_year_low=config.valid_year_low,
-            # valid_year_high=config.valid_year_high,
-            invalid_time_pre_words=[
-                "CPAP",
-                "PS",
-                "range",
-                "bipap",
-                "pap",
-                "pad",
-                "rate",
-                "unload",
-                "ventilation",
-                "scale",
-                "strength",
-                "drop",
-                "up",
-                "cc",
-                "rr",
-                "cvp",
-                "up",
-                "in",
-                "with",
-                "ICP",
-                "PSV",
-                "of",
-            ],
-            invalid_time_post_words=[
-                "packs",
-                "psv",
-                "puffs",
-                "pts",
-                "patients",
-                "range",
-                "scale",
-                "mls",
-                "liters",
-                "litres",
-                "drinks",
-                "beers",
-                "per",
-                "esophagus",
-                "tabs",
-                "pts",
-                "tablets",
-                "systolic",
-                "sem",
-                "strength",
-                "times",
-                "bottles",
-                "drop",
-                "drops",
-                "up",
-                "cc",
-                "mg",
-                "/hr",
-                "/hour",
-                "mcg",
-                "ug",
-                "mm",
-                "PEEP",
-                "L",
-                "dose",
-                "doses",
-                "cultures",
-                "bpm",
-                "ICP",
-                "CPAP",
-                "cm",
-                "mm",
-                "m",
-                "sessions",
-                "visits",
-                "episodes",
-                "drops",
-                "breaths",
-                "wbcs",
-                "beat",
-                "beats",
-                "ns",  # ,'blood' creates many false negatives
-            ],
-        )
-        self.names_finder = NamesPHIFinder(
-            config=NamesPHIFinder.Config(
-                female_names_unambig=load_file(
-                    os.path.join(DATA_PATH, "female_names_unambig_v2.txt")
-                ),
-                male_names_unambig=load_file(
-                    os.path.join(DATA_PATH, "male_names_unambig_v2.txt")
-                ),
-                all_first_names=load_file(
-                    os.path.join(DATA_PATH, "all_first_names.txt")
-                ),
-                last_names_unambig=load_file(
-                    os.path.join(DATA_PATH, "last_names_unambig_v2.txt")
-                ),
-                all_last_names=load_file(os.path.join(DATA_PATH, "all_last_names.txt")),
-                doctor_first_names=load_file(
-                    os.path.join(DATA_PATH, "doctor_first_names.txt"),
-                    optimization="iteration",
-                ),
-                doctor_last_names=load_file(
-                    os.path.join(DATA_PATH, "doctor_last_names.txt")
-                ),
-                female_names_ambig=load_file(
-                    os.path.join(DATA_PATH, "female_names_ambig.txt")
-                ),
-                male_names_ambig=load_file(
-                    os.path.join(DATA_PATH, "male_names_ambig.txt")
-                ),
-                last_names_ambig=load_file(
-                    os.path.join(DATA_PATH, "last_names_ambig.txt")
-                ),
-                female_names_popular=load_file(
-                    os.path.join(DATA_PATH, "female_names_popular_v2.txt")
-                ),
-                male_names_popular=load_file(
-                    os.path.join(DATA_PATH, "male_names_popular_v2.txt")
-                ),
-                last_names_popular=load_file(
-                    os.path.join(DATA_PATH, "last_names_popular_v2.txt")
+        start_time = time.perf_counter()
+
+        self.data_path = pkg_resources.resource_filename("pyDeid", "wordlists/")
+        self.wordlists = {}
+        self.wordlist_sizes = {}
+        self.load_time = 0.0
+
+        # hospital, place, medical phrase and doctor first name lists are all matched by one automaton
+        self.gazetteer = Gazetteer()
+
+        # PHI found by the line- and paragraph-local finders in recently seen segments, see `_find_local`
+        self.segment_cache_bytes = config.segment_cache_bytes
+        self.segment_cache = OrderedDict()
+        self.segment_cache_used = 0
+        self.segment_hits = 0
+        self.segment_misses = 0
+
+        # segments of the current note and their digests, by separator, shared by the finders of the same segment
+        self.note_segments = {}
+
+        # see `set_instrumentation`
+        self.instrumentation = None
+
+        # every finder compiles its patterns once, through one registry
+        self.registry = PatternRegistry()
+        self.set_custom_regexes(config.custom_regexes)
+
+        # finders and their wordlists are only constructed for the enabled PHI types
+        self.names_finder = None
+        self.date_finder = None
+        self.email_finder = None
+        self.telephone_fax_finder = None
+        self.address_finder = None
+        self.postal_code_finder = None
+        self.sin_finder = None
+        self.ohip_finder = None
+        self.mrn_finder = None
+        self.hospital_name_finder = None
+
+        if "hospitals" in self.types:
+            self.hospital_name_finder = HospitalNamePHIFinder(
+                hospitals=self.load_wordlist(
+                    "ontario_hospitals.txt", optimization="iteration"
                 ),
-                prefixes_unambig=set(
-                    load_file(os.path.join(DATA_PATH, "prefixes_unambig.txt"))
+                hospital_acronyms=self.load_wordlist(
+                    "hospital_acronyms.txt", optimization="iteration"
                 ),
-                last_name_prefixes=set(
-                    line.strip()
-                    for line in open(os.path.join(DATA_PATH, "last_name_prefixes.txt"))
+                gazetteer=self.gazetteer,
+            )
+
+        if "locations" in self.types:
+            self.postal_code_finder = PostalCodePHIFinder(registry=self.registry)
+            self.address_finder = AddressPHIFinder(
+                local_places_unambig=self.load_wordlist(
+                    "local_places_unambig_v2.txt", optimization="iteration"
                 ),
-                medical_phrases=load_file(
-                    os.path.join(DATA_PATH, "medical_phrases.txt"),
-                    optimization="iteration",
+                gazetteer=self.gazetteer,
+                registry=self.registry,
+            )
+
+        if "sin" in self.types:
+            self.sin_finder = SinPHIFinder(registry=self.registry)
+
+        if "ohip" in self.types:
+            self.ohip_finder = OhipPHIFinder(registry=self.registry)
+
+        if "mrn" in self.types:
+            self.mrn_finder = MrnPHIFinder(registry=self.registry)
+
+        if "contact" in self.types:
+            self.telephone_fax_finder = TelephoneFaxPHIFinder(
+                area_codes=self.load_wordlist("canadian_area_code.txt"),
+                disqualifiers=[
+                    "HR",
+                    "Heart",
+                    "BP",
+                    "SVR",
+                    "STV",
+                    "VT",
+                    "Tidal Volumes",
+                    "Tidal Volume",
+                    "TV",
+                    "CKS",
+                ],
+                registry=self.registry,
+            )
+            self.email_finder = EmailPHIFinder(registry=self.registry)
+
+        if "dates" in self.types:
+            self.date_finder = DatesPHIFinder(
+                # two_digit_threshold=config.two_digit_threshold,
+                # valid_year_low=config.valid_year_low,
+                # valid_year_high=config.valid_year_high,
+                invalid_time_pre_words=[
+                    "CPAP",
+                    "PS",
+                    "range",
+                    "bipap",
+                    "pap",
+                    "pad",
+                    "rate",
+                    "unload",
+                    "ventilation",
+                    "scale",
+                    "strength",
+                    "drop",
+                    "up",
+                    "cc",
+                    "rr",
+                    "cvp",
+                    "up",
+                    "in",
+                    "with",
+                    "ICP",
+                    "PSV",
+                    "of",
+                ],
+                invalid_time_post_words=[
+                    "packs",
+                    "psv",
+                    "puffs",
+                    "pts",
+                    "patients",
+                    "range",
+                    "scale",
+                    "mls",
+                    "liters",
+                    "litres",
+                    "drinks",
+                    "beers",
+                    "per",
+                    "esophagus",
+                    "tabs",
+                    "pts",
+                    "tablets",
+                    "systolic",
+                    "sem",
+                    "strength",
+                    "times",
+                    "bottles",
+                    "drop",
+                    "drops",
+                    "up",
+                    "cc",
+                    "mg",
+                    "/hr",
+                    "/hour",
+                    "mcg",
+                    "ug",
+                    "mm",
+                    "PEEP",
+                    "L",
+                    "dose",
+                    "doses",
+                    "cultures",
+                    "bpm",
+                    "ICP",
+                    "CPAP",
+                    "cm",
+                    "mm",
+                    "m",
+                    "sessions",
+                    "visits",
+                    "episodes",
+                    "drops",
+                    "breaths",
+                    "wbcs",
+                    "beat",
+                    "beats",
+                    "ns",  # ,'blood' creates many false negatives
+                ],
+                registry=self.registry,
+            )
+
+        if "names" in self.types:
+            self.names_finder = NamesPHIFinder(
+                config=NamesPHIFinder.Config(
+                    female_names_unambig=self.load_wordlist(
+                        "female_names_unambig_v2.txt"
+                    ),
+                    male_names_unambig=self.load_wordlist("male_names_unambig_v2.txt"),
+                    all_first_names=self.load_wordlist("all_first_names.txt"),
+                    last_names_unambig=self.load_wordlist("last_names_unambig_v2.txt"),
+                    all_last_names=self.load_wordlist("all_last_names.txt"),
+                    doctor_first_names=self.load_wordlist(
+                        "doctor_first_names.txt", optimization="iteration"
+                    ),
+                    doctor_last_names=self.load_wordlist("doctor_last_names.txt"),
+                    female_names_ambig=self.load_wordlist("female_names_ambig.txt"),
+                    male_names_ambig=self.load_wordlist("male_names_ambig.txt"),
+                    last_names_ambig=self.load_wordlist("last_names_ambig.txt"),
+                    female_names_popular=self.load_wordlist(
+                        "female_names_popular_v2.txt"
+                    ),
+                    male_names_popular=self.load_wordlist("male_names_popular_v2.txt"),
+                    last_names_popular=self.load_wordlist("last_names_popular_v2.txt"),
+                    prefixes_unambig=set(self.load_wordlist("prefixes_unambig.txt")),
+                    last_name_prefixes=set(
+                        line.strip()
+                        for line in open(
+                            os.path.join(self.data_path, "last_name_prefixes.txt")
+                        )
+                    ),
+                    medical_phrases=self.load_wordlist(
+                        "medical_phrases.txt", optimization="iteration"
+                    ),
+                    ner_model=config.ner_model,
+                    custom_dr_first_names=config.custom_dr_first_names,
+                    custom_dr_last_names=config.custom_dr_last_names,
+                    custom_patient_first_names=config.custom_patient_first_names,
+                    custom_patient_last_names=config.custom_patient_last_names,
                 ),
-                ner_model=config.ner_model,
-                custom_dr_first_names=config.custom_dr_first_names,
-                custom_dr_last_names=config.custom_dr_last_names,
-                custom_patient_first_names=config.custom_patient_first_names,
-                custom_patient_last_names=config.custom_patient_last_names,
+                gazetteer=self.gazetteer,
+                registry=self.registry,
             )
+
+        # the common word lists are shared by the finders through `phi_types.utils`, which only loads them when they
+        # are first needed; load them now so that they are counted in `report` and inherited by forked workers
+        if "names" in self.types:
+            self.load_shared_wordlist("common_words")
+            self.load_shared_wordlist("very_common_words")
+
+        if "names" in self.types or "locations" in self.types:
+            self.load_shared_wordlist("unambig_common_words")
+
+        self.gazetteer.build()
+
+        self.startup_time = time.perf_counter() - start_time
+
+    def set_custom_regexes(self, custom_regexes: List[CustomRegex]) -> None:
+        """Sets the custom regexes whose matches are labelled with their `phi_type`, compiling their patterns."""
+        self.custom_regexes = custom_regexes
+        self.custom_patterns = [
+            self.registry.compile(r"" + custom_regex.pattern)
+            for custom_regex in self.custom_regexes
+        ]
+
+    def load_wordlist(self, filename: str, optimization: str = "lookup"):
+        """Returns the entries of a wordlist file, loading it with `load_file` the first time it is asked for.
+
+        Args:
+            filename: Name of the file in the `wordlists` package.
+            optimization: "lookup" for a set of entries, or their `WordlistIndex` if the wordlist index is compiled,
+                "iteration" for a list.
+
+        Returns:
+            The uppercased entries of the wordlist.
+        """
+        key = (filename, optimization)
+
+        if key not in self.wordlists:
+            index = wordlist_index()
+
+            if optimization == "lookup" and index is not None and filename in index:
+                self.wordlists[key] = self._timed_load(filename, index.get, filename)
+            else:
+                self.wordlists[key] = self._timed_load(
+                    filename,
+                    load_file,
+                    os.path.join(self.data_path, filename),
+                    optimization,
+                )
+
+        return self.wordlists[key]
+
+    def load_shared_wordlist(self, name: str) -> set:
+        """Returns one of the `SHARED_WORDLISTS` of `phi_types.utils`, loading it if no finder has used it yet.
+
+        Shared word lists are not kept by the finder, so they are not pickled along with it.
+        """
+        return self._timed_load(name, load_wordlist, name)
+
+    def report(self) -> str:
+        entries = sum(entries for entries, _, _ in self.wordlist_sizes.values())
+        size = sum(size for _, size, _ in self.wordlist_sizes.values())
+        mapped = sum(mapped for _, _, mapped in self.wordlist_sizes.values())
+
+        return (
+            f"Set up finders for {', '.join(self.types)} in {self.startup_time:.3f} s, including "
+            f"{len(self.wordlist_sizes)} wordlists ({entries} entries, {size / 2**20:.1f} MiB in memory, "
+            f"{mapped / 2**20:.1f} MiB mapped from the wordlist index) loaded in {self.load_time:.3f} s"
         )
 
+    def _timed_load(self, name, load, *args):
+        start_time = time.perf_counter()
+        entries = load(*args)
+        self.load_time += time.perf_counter() - start_time
+
+        # indexed wordlists are mapped from the index file rather than held in memory
+        if isinstance(entries, WordlistIndex):
+            self.wordlist_sizes[name] = (len(entries), 0, entries.nbytes)
+        else:
+            self.wordlist_sizes[name] = (
+                len(entries),
+                sys.getsizeof(entries) + sum(map(sys.getsizeof, entries)),
+                0,
+            )
+
+        return entries
+
     def set_note(self, new_note: str) -> None:
         self.note = new_note
+        self.note_segments = {}
         finders = [
             self.names_finder,
             self.date_finder,
@@ -278,54 +427,217 @@ class PHIFinder:
         phi_collector = self.phis
 
         if "names" in self.types:
-            merge_phi_dicts(phi_collector, self.names_finder.find())
+            merge_phi_dicts(phi_collector, self._find(self.names_finder))
 
         if "dates" in self.types:
-            found_dates = self.date_finder.find()
+            found_dates = self._find(self.date_finder)
             merge_phi_dicts(phi_collector, found_dates)
 
         if "sin" in self.types:
-            found_sins = self.sin_finder.find()
+            found_sins = self._find(self.sin_finder)
             merge_phi_dicts(phi_collector, found_sins)
 
         if "ohip" in self.types:
-            found_ohips = self.ohip_finder.find()
+            found_ohips = self._find(self.ohip_finder)
             merge_phi_dicts(phi_collector, found_ohips)
 
         if "mrn" in self.types:
-            found_mrns = self.mrn_finder.find()
+            found_mrns = self._find(self.mrn_finder)
             merge_phi_dicts(phi_collector, found_mrns)
 
         if "locations" in self.types:
-            found_post_codes = self.postal_code_finder.find()
+            found_post_codes = self._find(self.postal_code_finder)
             merge_phi_dicts(phi_collector, found_post_codes)
-            found_addresses = self.address_finder.find()
+            found_addresses = self._find(self.address_finder)
             merge_phi_dicts(phi_collector, found_addresses)
 
         if "hospitals" in self.types:
-            found_hospitals = self.hospital_name_finder.find()
+            found_hospitals = self._find(self.hospital_name_finder)
             merge_phi_dicts(phi_collector, found_hospitals)
 
         if "contact" in self.types:
-            found_emails = self.email_finder.find()
+            found_emails = self._find(self.email_finder)
             merge_phi_dicts(phi_collector, found_emails)
-            found_telephones = self.telephone_fax_finder.find()
+            found_telephones = self._find(self.telephone_fax_finder)
             merge_phi_dicts(phi_collector, found_telephones)
 
         self.set_phis(phi_collector)
 
         if row_from_mll is not None:
-            self._mll_process(row_from_mll)
+            self._timed_step("find.mll", self._mll_process, row_from_mll)
 
-        self._find_custom_regexes()
+        self._timed_step("find.custom_regexes", self._find_custom_regexes)
 
         return self.phis
 
+    def __getstate__(self):
+        # copies sent to workers or to the build cache start with an empty segment cache
+        state = self.__dict__.copy()
+        state["segment_cache"] = OrderedDict()
+        state["segment_cache_used"] = 0
+        state["note_segments"] = {}
+
+        return state
+
+    def copy(self) -> "PHIFinder":
+        """Returns a finder with its own note, PHIs, segment cache, instrumentation and custom regexes, sharing the
+        wordlists, compiled patterns and gazetteer automaton of this one, which are not changed after construction.
+        """
+        finder = copy(self)
+        finder.note = ""
+        finder.phis = {}
+        finder.segment_hits = 0
+        finder.segment_misses = 0
+        finder.instrumentation = None
+        finder.custom_regexes = list(self.custom_regexes)
+        finder.custom_patterns = list(self.custom_patterns)
+
+        # the gazetteer keeps the matches of the last note it scanned
+        finder.gazetteer = copy(self.gazetteer)
+        finder.gazetteer._note = None
+        finder.gazetteer._hits = {}
+
+        for attribute in FINDER_ATTRIBUTES:
+            type_finder = getattr(self, attribute)
+
+            if type_finder is not None:
+                type_finder = copy(type_finder)
+                type_finder.set_note("")
+                type_finder.set_phis({})
+
+                if getattr(type_finder, "gazetteer", None) is self.gazetteer:
+                    type_finder.gazetteer = finder.gazetteer
+
+                setattr(finder, attribute, type_finder)
+
+        return finder
+
+    def note_facts(self, note: str) -> Dict[str, bool]:
+        """Returns the facts about `note` as a whole that the PHI found in any of its windows depend on, to be computed once
+        on the whole note and given to the finder of each window through `set_window_facts`."""
+        if self.names_finder is None:
+            return {}
+
+        return self.names_finder.note_facts(note)
+
+    def set_window_facts(self, facts: Dict[str, bool] = None) -> None:
+        """Searches the note as one window of a long note whose `note_facts` are `facts`, or as a whole note if None."""
+        if self.names_finder is not None:
+            self.names_finder.set_window_facts(facts)
+
+    def set_instrumentation(self, instrumentation=None) -> None:
+        """Records the time and PHI spans of every finder with `instrumentation`, or stops recording if None."""
+        self.instrumentation = instrumentation
+
+    def _find(self, finder: PHITypeFinder) -> Dict[PHI, List[str]]:
+        """Runs one finder on the note, through `_find_local` if its matches are local to a segment."""
+        start_time = time.perf_counter()
+
+        if finder.segment is not None and self.segment_cache_bytes:
+            found = self._find_local(finder)
+        else:
+            found = finder.find()
+
+        if self.instrumentation is not None:
+            self.instrumentation.record(
+                f"find.{type(finder).__name__}",
+                time.perf_counter() - start_time,
+                len(found),
+            )
+
+        return found
+
+    def _timed_step(self, stage: str, step, *args) -> None:
+        """Runs a step that adds PHI to `self.phis`, recording the PHI it added as its spans."""
+        if self.instrumentation is None:
+            step(*args)
+            return
+
+        start_time = time.perf_counter()
+        found_before = len(self.phis)
+        step(*args)
+        self.instrumentation.record(
+            stage, time.perf_counter() - start_time, len(self.phis) - found_before
+        )
+
+    def _find_local(self, finder: PHITypeFinder) -> Dict[PHI, List[str]]:
+        """Runs a finder whose matches never cross its `segment` on each line or paragraph of the note.
+
+        Headers, tables and instructions repeat across notes, so the PHI found in each segment are kept in an LRU
+        bounded to about `segment_cache_bytes`, and reused when the same segment is seen again, shifted to its offset in
+        the note. Entries are keyed by a digest of the segment rather than the segment itself, so a long segment costs no
+        more than the PHI found in it.
+        """
+        separator = SEGMENT_SEPARATORS[finder.segment]
+        name = type(finder).__name__
+        cache = self.segment_cache
+        found = {}
+        offset = 0
+
+        for segment, digest in self._segments(separator):
+            if segment:
+                key = (name, digest)
+                entry = cache.get(key)
+
+                if entry is None:
+                    self.segment_misses += 1
+                    finder.set_note(segment)
+                    # tuples of strings and numbers only, which the garbage collector stops tracking
+                    spans = tuple(
+                        (phi.start, phi.end, phi.phi, tuple(types))
+                        for phi, types in finder.find().items()
+                    )
+                    self._remember_segment(key, spans)
+                else:
+                    self.segment_hits += 1
+                    cache.move_to_end(key)
+                    spans = entry[0]
+
+                for start, end, text, types in spans:
+                    found[PHI(start + offset, end + offset, text)] = list(types)
+
+            offset += len(segment) + len(separator)
+
+        finder.set_note(self.note)
+
+        return found
+
+    def _segments(self, separator: str) -> List[Tuple[str, bytes]]:
+        segments = self.note_segments.get(separator)
+
+        if segments is None:
+            segments = self.note_segments[separator] = [
+                (
+                    segment,
+                    hashlib.blake2b(
+                        segment.encode("utf-8", "surrogatepass"), digest_size=16
+                    ).digest(),
+                )
+                for segment in self.note.split(separator)
+            ]
+
+        return segments
+
+    def _remember_segment(self, key, spans) -> None:
+        size = SEGMENT_ENTRY_BYTES + sum(
+            SEGMENT_SPAN_BYTES + len(str(text)) for _, _, text, _ in spans
+        )
+
+        if size > self.segment_cache_bytes:
+            return
+
+        self.segment_cache[key] = (spans, size)
+        self.segment_cache_used += size
+
+        while self.segment_cache_used > self.segment_cache_bytes:
+            _, (_, evicted) = self.segment_cache.popitem(last=False)
+            self.segment_cache_used -= evicted
+
     def _find_custom_regexes(self) -> None:
         """Mutates PHI object to have PHI satisfying the custom regexes from the note"""
 
-        for custom_regex in self.custom_regexes:
-            for m in re.finditer(r"" + custom_regex.pattern, self.note):
+        for custom_regex, pattern in zip(self.custom_regexes, self.custom_patterns):
+            for m in pattern.finditer(self.note):
                 start = m.start()
                 end = m.end()
                 key = PHI(start, end, m.group())
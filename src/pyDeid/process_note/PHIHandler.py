@@ -1,4 +1,7 @@
 # from ..phi_types.utils import phi_dict_to_list
+import time
+from ..phi_types.PHITypeFinder import WindowDependsOnNote
+from ..phi_types.utils import PHI
 from typing import *
 
 
@@ -16,6 +19,8 @@ class PHIHandler:
         self.regex_replace = regex_replace
         self.mll_rows = mll_rows
         self.finder = self.pruner = self.replacer = None
+        self.detection_cache = None
+        self.instrumentation = None
 
     def set_note(self, new_note: str) -> None:
         self.note = new_note
@@ -42,27 +47,108 @@ class PHIHandler:
     def set_replacer(self, replacer=None):
         self.replacer = replacer
 
+    def set_detection_cache(self, detection_cache=None):
+        self.detection_cache = detection_cache
+
+    def set_instrumentation(self, instrumentation=None):
+        self.instrumentation = instrumentation
+
+        if self.finder is not None:
+            self.finder.set_instrumentation(instrumentation)
+
     def handle_string(
-        self, note: str, row_from_mll: str = None
+        self, note: str, row_from_mll: str = None, found_phi=None
     ) -> Tuple[List[Dict[str, str]], str]:
+        """Find, prune and replace the PHI in `note`.
+
+        If `found_phi` is given (e.g. merged from the windows of a long note), the find step is skipped and the
+        given PHI is pruned and replaced instead. Otherwise, with a detection cache, a note seen before skips both the
+        find and prune steps.
+        """
 
         self.set_note(note)
         self.set_phis({})
 
-        found_phi = self.finder.find_phi(row_from_mll)
-        self.set_phis(found_phi)
+        pruned_phi = None
+        cache = self.detection_cache if found_phi is None else None
+
+        if cache is not None:
+            start_time = time.perf_counter()
+            key = cache.key(note, row_from_mll)
+            pruned_phi = cache.get(key, note)
+
+        if pruned_phi is None:
+            if found_phi is None:
+                found_phi = self.finder.find_phi(row_from_mll)
+
+            self.set_phis(found_phi)
+
+            if self.instrumentation is None:
+                pruned_phi = self.pruner.prune_phi()
+            else:
+                pruned_phi = self.instrumentation.time("prune", self.pruner.prune_phi)
+
+            if cache is not None:
+                cache.put(key, note, pruned_phi, time.perf_counter() - start_time)
 
-        pruned_phi = self.pruner.prune_phi()
         self.set_phis(pruned_phi)
 
         surrogates = []
         new_note = ""
 
         if self.regex_replace:
+            replace_start_time = time.perf_counter()
             surrogates, new_note = self.replacer.replace_phi()
 
+            if self.instrumentation is not None:
+                self.instrumentation.record(
+                    "replace",
+                    time.perf_counter() - replace_start_time,
+                    len(pruned_phi),
+                )
+
         return surrogates, new_note
 
+    def find_in_window(
+        self,
+        text: str,
+        window: Tuple[int, int, int, int],
+        note_facts: Dict[str, bool],
+        encounter_id: str = None,
+    ) -> Optional[Dict[PHI, List[str]]]:
+        """Find the PHI in one window of a long note.
+
+        Args:
+            text: The window's slice of the note, `note[start:end]`.
+            window: `(start, end, core_start, core_end)` offsets into the note, as returned by `split_note`.
+            note_facts: The facts about the whole note the PHI found in the window depend on, see `PHIFinder.note_facts`.
+            encounter_id: The encounter of the note, to look up its master linking log row.
+
+        Returns:
+            The PHI found in the window whose start falls within its core, with offsets relative to the whole note,
+            or None if they depend on text outside of the window, in which case the note must be searched whole.
+        """
+        start, end, core_start, core_end = window
+
+        self.set_note(text)
+        self.set_phis({})
+        self.finder.set_window_facts(note_facts)
+
+        try:
+            found_phi = self.finder.find_phi(
+                self.mll_rows.get(encounter_id) if self.mll_rows else None
+            )
+        except WindowDependsOnNote:
+            return None
+        finally:
+            self.finder.set_window_facts(None)
+
+        return {
+            PHI(key.start + start, key.end + start, key.phi): types
+            for key, types in found_phi.items()
+            if core_start <= key.start + start < core_end
+        }
+
     def handle_csv_row(
         self,
         row: Dict[str, str],
@@ -70,6 +156,7 @@ class PHIHandler:
         encounter_id_varname: str = "genc_id",
         note_id_varname: str = None,
         note_varname: str = "note_text",
+        found_phi=None,
     ) -> Tuple[int, int, List[str]]:
         """Handle the note - with find, prune, and replace"""
         note = row[note_varname]
@@ -79,14 +166,10 @@ class PHIHandler:
 
         try:
             # Handle MLL logic
-            row_from_mll = None
-
-            if self.mll_rows:
-                enc_id = row[encounter_id_varname]
-                row_from_mll = self.mll_rows.get(enc_id)
+            row_from_mll = self._row_from_mll(row, encounter_id_varname)
 
             # Process PHI
-            surrogates, new_note = self.handle_string(note, row_from_mll)
+            surrogates, new_note = self.handle_string(note, row_from_mll, found_phi)
 
         except Exception as e:
             print("out", e)
@@ -109,3 +192,54 @@ class PHIHandler:
                 errors.append(row[encounter_id_varname])
 
         return errors, surrogates, new_note, self.phis
+
+    def _row_from_mll(self, row, encounter_id_varname):
+        if self.mll_rows:
+            return self.mll_rows.get(row[encounter_id_varname])
+
+        return None
+
+
+def split_note(
+    note: str, window_chars: int, overlap_chars: int
+) -> List[Tuple[int, int, int, int]]:
+    """Split a long note into overlapping windows at line or whitespace boundaries.
+
+    The note is cut into consecutive cores of about `window_chars` characters, preferring a line break and otherwise
+    any whitespace in the second half of each core. Each window extends its core by `overlap_chars` on both sides, so
+    the finders see the context around the seams. A PHI is kept only by the window whose core holds its start, so
+    every PHI is reported once as long as it and its context fit within the overlap.
+
+    Returns:
+        List of `(start, end, core_start, core_end)` offsets into the note.
+    """
+    cuts = [0]
+
+    while len(note) - cuts[-1] > window_chars:
+        low = cuts[-1] + window_chars // 2
+        high = cuts[-1] + window_chars
+        cut = note.rfind("\n", low, high) + 1
+
+        if not cut:
+            cut = max(note.rfind(c, low, high) for c in " \t\r") + 1
+
+        cuts.append(cut or high)
+
+    cuts.append(len(note))
+
+    windows = []
+
+    for core_start, core_end in zip(cuts, cuts[1:]):
+        start = _snap_to_whitespace(note, max(0, core_start - overlap_chars), -1)
+        end = _snap_to_whitespace(note, min(len(note), core_end + overlap_chars), 1)
+        windows.append((start, end, core_start, core_end))
+
+    return windows
+
+
+def _snap_to_whitespace(note, pos, direction):
+    """Moves `pos` away from the core until it sits on a whitespace boundary, so no token is cut in half."""
+    while 0 < pos < len(note) and not note[pos - 1].isspace():
+        pos += direction
+
+    return pos
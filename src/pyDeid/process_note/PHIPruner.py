@@ -1,5 +1,5 @@
 import re
-from ..phi_types.utils import PHI, is_common, is_ambig, is_type, add_type
+from ..phi_types.utils import PHI, PHITag, is_common, is_ambig, has_tag, add_type
 from typing import *
 
 
@@ -51,23 +51,23 @@ class PHIPruner:
                 prev_key = phi_keys[i-1]
 
                 if (
-                    (is_type(prev_key, 'Name', 1, self.phis) and is_type(current_key, 'Name', 1, self.phis))
+                    (has_tag(prev_key, PHITag.NAME, self.phis) and has_tag(current_key, PHITag.NAME, self.phis))
                     # and (not is_common(current_key.phi) or not is_common(prev_key.phi))
                     and not is_common(current_key.phi) and not is_common(prev_key.phi)
                     and not re.search(r'\.', prev_key.phi)
                     and not ((current_key.end - prev_key.start) < 3)
                 ):
                     if (
-                         (is_ambig(current_key, self.phis) and is_ambig(prev_key, self.phis) and is_type(prev_key, 'First Name', 1, self.phis) and is_type(current_key, 'Last Name', 1, self.phis)) or
-                    (not is_ambig(current_key, self.phis) and is_ambig(prev_key, self.phis) and is_type(prev_key, 'First Name', 1, self.phis) and is_type(current_key, 'Last Name', 1, self.phis)) or
-                    (is_ambig(current_key, self.phis) and not is_ambig(prev_key, self.phis) and is_type(prev_key, 'First Name', 1, self.phis) and is_type(current_key, 'Last Name', 1, self.phis))
+                         (is_ambig(current_key, self.phis) and is_ambig(prev_key, self.phis) and has_tag(prev_key, PHITag.FIRST_NAME, self.phis) and has_tag(current_key, PHITag.LAST_NAME, self.phis)) or
+                    (not is_ambig(current_key, self.phis) and is_ambig(prev_key, self.phis) and has_tag(prev_key, PHITag.FIRST_NAME, self.phis) and has_tag(current_key, PHITag.LAST_NAME, self.phis)) or
+                    (is_ambig(current_key, self.phis) and not is_ambig(prev_key, self.phis) and has_tag(prev_key, PHITag.FIRST_NAME, self.phis) and has_tag(current_key, PHITag.LAST_NAME, self.phis))
                     ):
                         add_type(current_key, 'Last Name (probably)', self.phis)
                         add_type(prev_key, 'First Name (probably)', self.phis)
 
                     if (
-                        (not is_ambig(current_key, self.phis) and is_ambig(prev_key, self.phis) and is_type(current_key, "First Name", 1, self.phis) and is_type(prev_key, "Last Name", 1, self.phis)) or
-                    (is_ambig(current_key, self.phis) and not is_ambig(prev_key, self.phis) and is_type(current_key, "First Name", 1, self.phis) and is_type(prev_key, "Last Name", 1, self.phis))
+                        (not is_ambig(current_key, self.phis) and is_ambig(prev_key, self.phis) and has_tag(current_key, PHITag.FIRST_NAME, self.phis) and has_tag(prev_key, PHITag.LAST_NAME, self.phis)) or
+                    (is_ambig(current_key, self.phis) and not is_ambig(prev_key, self.phis) and has_tag(current_key, PHITag.FIRST_NAME, self.phis) and has_tag(prev_key, PHITag.LAST_NAME, self.phis))
                     ):
                         add_type(current_key, 'First Name (probably)', self.phis)
                         add_type(prev_key, 'Last Name (probably)', self.phis)
@@ -107,7 +107,7 @@ class PHIPruner:
                 self._check_overlap_and_add_bad_keys(previous_key, current_key, bad_keys)
 
         for key in phi_keys:
-            if any(re.search('MedicalPhrase', val) for val in self.phis[key]):
+            if PHITag.MEDICAL_PHRASE in PHITag.of_all(self.phis[key]):
                 bad_keys.append(key)
 
         # Remove PHI entries marked as bad
@@ -141,10 +141,10 @@ class PHIPruner:
             bad_keys.append(previous_key)
 
         # if found PHI is part of a medical phrase, ignore it to reduce false positives
-        elif any(re.search('MedicalPhrase', val) for val in self.phis[current_key]) and (current_start <= previous_start and current_end >= previous_end):
+        elif PHITag.MEDICAL_PHRASE in PHITag.of_all(self.phis[current_key]) and (current_start <= previous_start and current_end >= previous_end):
             bad_keys.extend([previous_key, current_key])
 
-        elif any(re.search('MedicalPhrase', val) for val in self.phis[previous_key]) and (current_start > previous_start and current_start < previous_end and current_end > previous_end):
+        elif PHITag.MEDICAL_PHRASE in PHITag.of_all(self.phis[previous_key]) and (current_start > previous_start and current_start < previous_end and current_end > previous_end):
             bad_keys.extend([previous_key, current_key])
 
         # if any(re.search('MedicalPhrase', val) for val in phi[previous_key]):
@@ -158,8 +158,11 @@ class PHIPruner:
         Returns true if previous key should be removed, else false.
 
         """
-        return any(re.match(r'^Day Month \[', x) for x in self.phis[previous_key]) and any(re.match(r'^Day Month Year \[', x) for x in self.phis[current_key]) or \
-               any(re.match(r'^Month Day \[', x) for x in self.phis[previous_key]) and any(re.match(r'^Month Day Year \[', x) for x in self.phis[current_key])
+        previous_tag = PHITag.of_all(self.phis[previous_key])
+        current_tag = PHITag.of_all(self.phis[current_key])
+
+        return PHITag.DAY_MONTH in previous_tag and PHITag.DAY_MONTH_YEAR in current_tag or \
+               PHITag.MONTH_DAY in previous_tag and PHITag.MONTH_DAY_YEAR in current_tag
 
     def _combine_and_replace_keys(self, previous_key:PHI, current_key:PHI, bad_keys:List[PHI])-> None:
 
@@ -174,34 +177,30 @@ class PHIPruner:
         bad_keys.extend([previous_key, current_key])
         self.phis[new_key] = new_val
 
-    def _combine_overlapping_dates(self, phi_keys: List[PHI]):
-        merged = True
-        while merged:
-            merged = False
-            phi_keys = sorted(self.phis.keys(), key=lambda x: x.start)
-            to_remove = set()
-            to_add = []
-            for i in range(len(phi_keys)):
-                for j in range(i + 1, len(phi_keys)):
-                    key1 = phi_keys[i]
-                    key2 = phi_keys[j]
-                    vals1 = self.phis.get(key1, [])
-                    vals2 = self.phis.get(key2, [])
-                    if any(re.search(r"(Date|Year|Month|Day|Time)", v, re.IGNORECASE) for v in vals1) and \
-                    any(re.search(r"(Date|Year|Month|Day|Time)", v, re.IGNORECASE) for v in vals2):
-                        if not (key1.end <= key2.start or key2.end <= key1.start):
-                            new_start = min(key1.start, key2.start)
-                            new_end = max(key1.end, key2.end)
-                            new_key = PHI(new_start, new_end, self.note[new_start:new_end])
-                            new_val = list(set(vals1 + vals2))
-                            to_remove.update([key1, key2])
-                            to_add.append((new_key, new_val))
-                            merged = True
-                            break
-                if merged:
-                    break
-            for key in to_remove:
-                self.phis.pop(key, None)
-            for key, val in to_add:
-                self.phis[key] = val
-        return
+    def _combine_overlapping_dates(self, phi_keys: List[PHI]) -> None:
+
+        """
+        Merges date PHIs that overlap each other into a single PHI spanning all of them.
+
+        Date PHIs are swept in order of position, so every run of overlapping dates is merged in one pass, and the merged
+        PHI keeps the types of all of them.
+
+        """
+
+        date_keys = sorted(
+            (key for key, types in self.phis.items() if PHITag.of_all(types) & (PHITag.DATE | PHITag.TIME)),
+            key=lambda x: (x.start, x.end),
+        )
+
+        runs = []
+        for key in date_keys:
+            if runs and runs[-1][0] < key.end and key.start < runs[-1][1]:
+                runs[-1][1] = max(runs[-1][1], key.end)
+                runs[-1][2].append(key)
+            else:
+                runs.append([key.start, key.end, [key]])
+
+        for start, end, keys in runs:
+            if len(keys) > 1:
+                types = [t for key in keys for t in self.phis.pop(key)]
+                self.phis[PHI(start, end, self.note[start:end])] = list(dict.fromkeys(types))
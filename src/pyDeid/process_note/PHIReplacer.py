@@ -2,10 +2,39 @@ import re
 import calendar
 import random
 import string
-from ..phi_types.DatesPHIFinder import Date
+from ..phi_types.DatesPHIFinder import Date, DatesPHIFinder
+from ..phi_types.PHITag import PHITag
+from ..phi_types.utils import CustomRegex
 from datetime import datetime
-
-from faker import Faker
+from functools import partial
+from typing import Callable
+from .SurrogatePool import SurrogatePool
+
+# the surrogate builder of a PHI type label is the first one whose flags it has
+SURROGATE_BUILDERS = [
+    (PHITag.INITIALS_DOUBLE, "_build_double_initials"),
+    (PHITag.INITIALS_SINGLE, "_build_single_initial"),
+    (PHITag.MRN, "_build_mrn"),
+    (PHITag.SIN, "_build_sin_for"),
+    (PHITag.OHIP, "_build_ohip_for"),
+    (PHITag.TELEPHONE_FAX, "_build_telephone_for"),
+    (PHITag.EMAIL, "_build_email"),
+    (PHITag.ADDRESS, "_build_street_address"),
+    (PHITag.LOCATION, "_build_location"),
+    (PHITag.FIRST_NAME | PHITag.MLL_FIRST_NAME, "_build_first_name"),
+    (PHITag.LAST_NAME | PHITag.MLL_LAST_NAME, "_build_last_name"),
+    (PHITag.NAME_PREFIX, "_build_empty"),
+    (PHITag.NAME, "_build_first_name"),
+    (PHITag.POSTAL_CODE | PHITag.MLL_POSTAL_CODE, "_build_postal_code_for"),
+    # every date range label is also a date label
+    (PHITag.DATE_RANGE, "_build_date_range"),
+    (PHITag.DATE, "_build_any_date"),
+    (PHITag.TIME, "_build_shifted_time"),
+    (PHITag.HOLIDAY, "_build_empty"),
+    (PHITag.MLL_ID, "_build_id_for"),
+    (PHITag.HOSPITAL, "_build_hospital"),
+    (PHITag.SITE_ACRONYM, "_build_site_acronym"),
+]
 
 
 class PHIReplacer:
@@ -36,12 +65,16 @@ class PHIReplacer:
         self.name_lookup = None
         self.months = None
         self.days = None
-        self.canadian_area_codes = None
-        self.local_places_unambig = None
+
+        # loads the wordlists the surrogate builders draw from, see `_wordlist`
+        self.finder = None
 
         self.custom_regexes = []
 
-        self.fake = Faker()
+        # PHI type label -> surrogate builder, see `_surrogate_builder`
+        self.surrogate_builders = {}
+
+        self.surrogates = SurrogatePool()
 
     def set_note(self, new_note: str) -> None:
         self.note = new_note
@@ -50,36 +83,42 @@ class PHIReplacer:
         self.phis = new_phis
 
     def load_phi_types(self, finder):
-        self.months = finder.date_finder.months
-        self.days = finder.date_finder.days
-        self.canadian_area_codes = finder.telephone_fax_finder.area_codes
-        self.local_places_unambig = finder.address_finder.local_places_unambig
-        self.hospitals = finder.hospital_name_finder.hospitals
-        self.hospital_acronyms = finder.hospital_name_finder.hospital_acronyms
+        self.months = DatesPHIFinder.months
+        self.days = DatesPHIFinder.days
+        self.finder = finder
+
+    def _wordlist(self, filename: str, optimization: str = "lookup"):
+        """Returns the entries of a wordlist a surrogate builder draws from, see `PHIFinder.load_wordlist`.
+
+        The finder only loads the wordlists of its enabled PHI types, and custom types may still need surrogates, so
+        the others are only loaded the first time a surrogate is built from them.
+        """
+        return self.finder.load_wordlist(filename, optimization)
 
     def replace_phi(self):
         """Replaces PHI in the text with surrogate values, ensuring no  overlapping replacements."""
-        deid_text = ""
+        segments = []
+        deid_length = 0
         surrogates = []
         where_we_left_off = 0
-        replaced_ranges = set()  # Track replaced ranges
 
         self._randomize()
 
         # Sort PHI keys by starting position
         sorted_keys = sorted(self.phis.keys(), key=lambda x: x.start)
 
-        for key in sorted_keys:
-            # Check if this range overlaps with an already replaced range
-            if any(r.start <= key.start and key.end <= r.end for r in replaced_ranges):
-                for r in replaced_ranges:
-                    if r.start <= key.start < r.end or r.start < key.end <= r.end:
-                        # print(f"Overlapping key: {key}, Overlaps with: {r}")
-                        continue  # Skip overlapping PHI
+        for i, key in enumerate(sorted_keys):
+            # every PHI replaced so far starts at or before this one, and the last one ends furthest,
+            # so this PHI lies inside an already replaced range exactly when it ends before that
+            if i and key.end <= where_we_left_off:
+                continue
 
             surrogate = self._get_surrogate(self.phis[key], key)
-            surrogate_start = len(deid_text + self.note[where_we_left_off : key.start])
-            deid_text = deid_text + self.note[where_we_left_off : key.start] + surrogate
+            text_before = self.note[where_we_left_off : key.start]
+            surrogate_start = deid_length + len(text_before)
+            segments.append(text_before)
+            segments.append(surrogate)
+            deid_length = surrogate_start + len(surrogate)
 
             if self.return_surrogates:
                 surrogate_end = surrogate_start + len(surrogate)
@@ -95,15 +134,12 @@ class PHIReplacer:
                     }
                 )
 
-            # Add this range to replaced_ranges
-            replaced_ranges.add(key)
-            # replaced_ranges.add((key.start, key.end))
             where_we_left_off = key.end
 
         # Append remaining text after the last PHI
-        deid_text = deid_text + self.note[where_we_left_off:]
+        segments.append(self.note[where_we_left_off:])
 
-        return (surrogates, deid_text)
+        return (surrogates, "".join(segments))
 
     def _randomize(self):
         """ """
@@ -326,7 +362,7 @@ class PHIReplacer:
     def _build_telephone(self):
         """Generates a random telephone number."""
         return (
-            random.choice(tuple(self.canadian_area_codes))
+            random.choice(tuple(self._wordlist("canadian_area_code.txt")))
             + "-"
             + str(random.randint(100, 999))
             + "-"
@@ -362,105 +398,156 @@ class PHIReplacer:
         surrogate = ""
 
         for val in phi_values:
-            if re.search(r"Initials \(double\)", val, re.IGNORECASE):
-                surrogate = f"{random.choice(string.ascii_uppercase)}.{random.choice(string.ascii_uppercase)}."
-                while surrogate == key.phi:
-                    surrogate = f"{random.choice(string.ascii_uppercase)}.{random.choice(string.ascii_uppercase)}."
+            surrogate = self._surrogate_builder(val)(key, surrogate)
 
-            elif re.search(r"Initials \(single\)", val, re.IGNORECASE):
+            if (
+                surrogate != "<PHI>"
+            ):  # for multiple PHI types for a single token, just pick one
+                break
 
-                surrogate = f"{random.choice(string.ascii_uppercase)}."
-                while surrogate == key.phi:
-                    surrogate = f"{random.choice(string.ascii_uppercase)}."
+        # if surrogate == '<PHI>': # in the case, phitypes has only types giving <PHI> surrogates
+        #     surrogate = ''
 
-            elif re.search("MRN", val, re.IGNORECASE):
-                surrogate = str(random.randint(0, 10**7))
+        return surrogate
 
-            elif re.search("SIN", val, re.IGNORECASE):
-                surrogate = self._build_sin()
+    def add_custom_regex(self, custom_regex: CustomRegex) -> None:
+        """Registers the surrogate builder of a custom PHI type.
 
-            elif re.search("OHIP", val, re.IGNORECASE):
-                surrogate = self._build_ohip()
+        Args:
+            custom_regex: The custom regex, whose `surrogate_builder_fn` is called with its `arguments` to replace PHI
+                labelled with its `phi_type`.
+        """
+        self.custom_regexes = self.custom_regexes + [custom_regex]
 
-            elif re.search("Telephone/Fax", val):
-                surrogate = self._build_telephone()
+        # labels resolved before may now resolve to this custom regex
+        self.surrogate_builders = {}
 
-            elif re.search("Email Address", val):
-                surrogate = self.fake.company_email()
+    def _surrogate_builder(self, label: str) -> Callable:
+        """Returns the surrogate builder for PHI of type `label`, resolving it the first time the label is seen.
 
-            elif re.search("Address", val):
-                surrogate = self.fake.street_address()
+        Builders are called with the PHI and the surrogate built for its previous type, and return its surrogate.
+        """
+        builder = self.surrogate_builders.get(label)
 
-            elif re.search("Location", val):
-                surrogate = random.choice(tuple(self.local_places_unambig))
+        if builder is None:
+            builder = self.surrogate_builders[label] = self._resolve_surrogate_builder(
+                label
+            )
 
-            elif re.search("(First Name)|(first_name \(MLL\))", val):
-                if key.phi not in self.name_lookup:
-                    self.name_lookup[key.phi] = self.fake.first_name()
-                surrogate = self.name_lookup[key.phi]
+        return builder
 
-            elif re.search("(Last Name)|(last_name \(MLL\))", val):
-                if key.phi not in self.name_lookup:
-                    self.name_lookup[key.phi] = self.fake.last_name()
-                surrogate = self.name_lookup[key.phi]
+    def _resolve_surrogate_builder(self, label: str) -> Callable:
+        tag = PHITag.of(label)
 
-            elif re.search("Name Prefix", val):
-                surrogate = ""
+        for flags, name in SURROGATE_BUILDERS:
+            if tag & flags:
+                return getattr(self, name)
 
-            elif re.search("Name", val):
-                if key.phi not in self.name_lookup:
-                    self.name_lookup[key.phi] = self.fake.first_name()
-                surrogate = self.name_lookup[key.phi]
+        # custom types only apply to labels no built-in type claims, and the last one registered for a label wins
+        for custom_regex in reversed(self.custom_regexes):
+            if label == custom_regex.phi_type:
+                return partial(self._build_custom, custom_regex)
 
-            elif re.search("(Postalcode)|(postal_code \(MLL\))", val):
-                surrogate = self._build_postal_code()
+        if self.custom_regexes:
+            return self._keep_surrogate
 
-            elif re.search(r"date|day|month|year|(_date \(MLL\))", val, re.IGNORECASE):
-                if isinstance(key.phi, Date):
-                    day, month, year = self._date_shifter(key.phi)
-                    surrogate = self._build_date(day, month, year)
-                elif re.search(r"Date range", val, re.IGNORECASE):
-                    surrogate += (
-                        self.fake.date()
-                        + " to "
-                        + self.fake.future_date().strftime("%Y-%m-%d")
-                    )
+        return self._build_placeholder
 
-                else:
-                    surrogate = self.fake.date()
+    def _build_double_initials(self, key, surrogate):
+        surrogate = f"{random.choice(string.ascii_uppercase)}.{random.choice(string.ascii_uppercase)}."
+        while surrogate == key.phi:
+            surrogate = f"{random.choice(string.ascii_uppercase)}.{random.choice(string.ascii_uppercase)}."
 
-            elif re.search("Time", val, re.IGNORECASE):
-                surrogate = self._time_shifter(key.phi)
+        return surrogate
 
-            elif re.search("Holiday", val):
-                surrogate = ""
+    def _build_single_initial(self, key, surrogate):
+        surrogate = f"{random.choice(string.ascii_uppercase)}."
+        while surrogate == key.phi:
+            surrogate = f"{random.choice(string.ascii_uppercase)}."
 
-            elif re.search("_id (MLL)", val):
-                surrogate = self._build_id()
+        return surrogate
 
-            elif re.search("Hospital", val):
-                surrogate = random.choice(self.hospitals).title()
+    def _build_mrn(self, key, surrogate):
+        return str(random.randint(0, 10**7))
 
-            elif re.search("Site Acronym", val, re.IGNORECASE):
-                surrogate = random.choice(self.hospital_acronyms)
+    def _build_email(self, key, surrogate):
+        return self.surrogates.draw("company_email")
 
-            elif self.custom_regexes:
+    def _build_street_address(self, key, surrogate):
+        return self.surrogates.draw("street_address")
 
-                for custom_regex in self.custom_regexes:
-                    if val == custom_regex.phi_type:
-                        surrogate = custom_regex.surrogate_builder_fn(
-                            *custom_regex.arguments
-                        )
+    def _build_location(self, key, surrogate):
+        return random.choice(
+            self._wordlist("local_places_unambig_v2.txt", optimization="iteration")
+        )
 
-            else:
-                surrogate = "<PHI>"
+    def _build_first_name(self, key, surrogate):
+        if key.phi not in self.name_lookup:
+            self.name_lookup[key.phi] = self.surrogates.draw("first_name")
+        return self.name_lookup[key.phi]
 
-            if (
-                surrogate != "<PHI>"
-            ):  # for multiple PHI types for a single token, just pick one
-                break
+    def _build_last_name(self, key, surrogate):
+        if key.phi not in self.name_lookup:
+            self.name_lookup[key.phi] = self.surrogates.draw("last_name")
+        return self.name_lookup[key.phi]
 
-        # if surrogate == '<PHI>': # in the case, phitypes has only types giving <PHI> surrogates
-        #     surrogate = ''
+    def _build_date_range(self, key, surrogate):
+        if isinstance(key.phi, Date):
+            return self._build_shifted_date(key, surrogate)
+
+        return (
+            surrogate
+            + self.surrogates.draw("date")
+            + " to "
+            + self.surrogates.draw("future_date")
+        )
+
+    def _build_any_date(self, key, surrogate):
+        if isinstance(key.phi, Date):
+            return self._build_shifted_date(key, surrogate)
+
+        return self.surrogates.draw("date")
+
+    def _build_shifted_date(self, key, surrogate):
+        day, month, year = self._date_shifter(key.phi)
+        return self._build_date(day, month, year)
+
+    def _build_shifted_time(self, key, surrogate):
+        return self._time_shifter(key.phi)
+
+    def _build_hospital(self, key, surrogate):
+        return random.choice(
+            self._wordlist("ontario_hospitals.txt", optimization="iteration")
+        ).title()
 
+    def _build_site_acronym(self, key, surrogate):
+        return random.choice(
+            self._wordlist("hospital_acronyms.txt", optimization="iteration")
+        )
+
+    def _build_empty(self, key, surrogate):
+        return ""
+
+    def _build_custom(self, custom_regex, key, surrogate):
+        return custom_regex.surrogate_builder_fn(*custom_regex.arguments)
+
+    def _keep_surrogate(self, key, surrogate):
         return surrogate
+
+    def _build_placeholder(self, key, surrogate):
+        return "<PHI>"
+
+    def _build_sin_for(self, key, surrogate):
+        return self._build_sin()
+
+    def _build_ohip_for(self, key, surrogate):
+        return self._build_ohip()
+
+    def _build_telephone_for(self, key, surrogate):
+        return self._build_telephone()
+
+    def _build_postal_code_for(self, key, surrogate):
+        return self._build_postal_code()
+
+    def _build_id_for(self, key, surrogate):
+        return self._build_id()
@@ -0,0 +1,177 @@
+import os
+import random
+import time
+import weakref
+from datetime import date, timedelta
+from itertools import accumulate
+
+from faker import Faker
+from faker.providers.person.en_US import Provider as PersonProvider
+
+# kinds whose pools are filled by calling the Faker method of the same name
+FAKER_KINDS = ("street_address", "company_email")
+
+
+class SurrogatePool:
+    """
+    Draws surrogate names, addresses, emails and dates from pools generated in batches.
+
+    Calling Faker for every PHI goes through its provider machinery on each call, and a `Faker` instance is pickled
+    into worker processes along with the replacer. A pool is only filled when it runs out, with a batch twice as
+    large as the previous one up to `batch_size`, so a note with a single name does not pay for thousands of them.
+
+    First and last names are sampled with `random.choices` from the weighted name lists of Faker's `en_US` person
+    provider, which is the distribution `Faker().first_name()` and `last_name()` draw from, and dates are sampled
+    uniformly like `Faker().date()` and `future_date()`. Street addresses and emails are composed by Faker, which is
+    only constructed if they are needed, and seeded from the pool's random number generator. Neither Faker nor the
+    pools are pickled.
+
+    Worker processes must not all draw the same surrogates, so a copy unpickled in another process, or inherited by a
+    forked one, starts over with empty pools and its own random state. Without a seed, that state is drawn from the
+    operating system; with one, from the seed and the process id.
+    """
+
+    def __init__(self, batch_size: int = 4096, first_batch_size: int = 64, seed=None):
+        """
+        Args:
+            batch_size: Largest number of surrogates generated at once for one kind.
+            first_batch_size: Number of surrogates generated the first time a kind is drawn.
+            seed: Seed of the pool's random number generator, and of Faker.
+        """
+        if first_batch_size < 1 or batch_size < first_batch_size:
+            raise ValueError(
+                "batch_size must be at least first_batch_size, which must be positive"
+            )
+
+        self.batch_size = batch_size
+        self.first_batch_size = first_batch_size
+        self.seed = seed
+        self.pid = os.getpid()
+        self.rng = random.Random(seed)
+
+        self.pools = {}
+        self.next_batch_sizes = {}
+        self._fake = None
+
+        _POOLS.add(self)
+
+        self.drawn = 0
+        self.generated = 0
+        self.fill_time = 0.0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["pools"] = {}
+        state["next_batch_sizes"] = {}
+        state["_fake"] = None
+        del state["rng"]
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.rng = random.Random(self.seed)
+        _POOLS.add(self)
+
+        if self.pid != os.getpid():
+            self.reseed()
+
+    def reseed(self) -> None:
+        """Empties the pools and starts a random state of this process, as done in every worker process."""
+        self.pid = os.getpid()
+        self.rng = random.Random(
+            None if self.seed is None else f"{self.seed}:{self.pid}"
+        )
+        self.pools = {}
+        self.next_batch_sizes = {}
+        self._fake = None
+
+    @property
+    def fake(self) -> Faker:
+        if self._fake is None:
+            # Faker's own random state is shared by the whole process, and inherited by forked workers
+            self._fake = Faker()
+            self._fake.seed_instance(self.rng.getrandbits(64))
+
+        return self._fake
+
+    def draw(self, kind: str) -> str:
+        """Returns a surrogate of the given kind.
+
+        Args:
+            kind: One of "first_name", "last_name", "street_address", "company_email", "date" or "future_date". Dates
+                are formatted as "%Y-%m-%d".
+
+        Returns:
+            The surrogate.
+        """
+        pool = self.pools.get(kind)
+
+        if not pool:
+            pool = self._fill(kind)
+
+        self.drawn += 1
+
+        return pool.pop()
+
+    def report(self) -> str:
+        return f"Drew {self.drawn} surrogates from pools of {self.generated} generated in {self.fill_time:.3f} s"
+
+    def _fill(self, kind: str) -> list:
+        size = self.next_batch_sizes.get(kind, self.first_batch_size)
+        self.next_batch_sizes[kind] = min(2 * size, self.batch_size)
+
+        start_time = time.perf_counter()
+
+        if kind == "first_name":
+            pool = self.rng.choices(
+                FIRST_NAMES, cum_weights=FIRST_NAME_CUM_WEIGHTS, k=size
+            )
+        elif kind == "last_name":
+            pool = self.rng.choices(
+                LAST_NAMES, cum_weights=LAST_NAME_CUM_WEIGHTS, k=size
+            )
+        elif kind == "date":
+            # Faker's date() is a date between the Unix epoch and today
+            first = date(1970, 1, 1).toordinal()
+            last = date.today().toordinal()
+            pool = [
+                date.fromordinal(self.rng.randint(first, last)).isoformat()
+                for _ in range(size)
+            ]
+        elif kind == "future_date":
+            # Faker's future_date() is a date between tomorrow and 30 days from now
+            today = date.today()
+            pool = [
+                (today + timedelta(days=self.rng.randint(1, 30))).isoformat()
+                for _ in range(size)
+            ]
+        elif kind in FAKER_KINDS:
+            generate = getattr(self.fake, kind)
+            pool = [generate() for _ in range(size)]
+        else:
+            raise ValueError(f"Unknown surrogate kind {kind}")
+
+        self.fill_time += time.perf_counter() - start_time
+        self.generated += size
+        self.pools[kind] = pool
+
+        return pool
+
+
+def _reseed_after_fork():
+    # pools are sent to pool initializers of forked workers without being pickled
+    for pool in list(_POOLS):
+        pool.reseed()
+
+
+# pools of this process, to reseed in forked children
+_POOLS = weakref.WeakSet()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_after_fork)
+
+FIRST_NAMES = list(PersonProvider.first_names)
+FIRST_NAME_CUM_WEIGHTS = list(accumulate(PersonProvider.first_names.values()))
+LAST_NAMES = list(PersonProvider.last_names)
+LAST_NAME_CUM_WEIGHTS = list(accumulate(PersonProvider.last_names.values()))
@@ -223,6 +223,7 @@ def deid_string(
         "hospitals",
         "contact",
     ],
+    build_cache_dir: str = None,
     **custom_regexes: str,
 ):
     """Remove and replace PHI from a single string for debugging
@@ -247,6 +248,9 @@ def deid_string(
         Whether to use NER as implemented in the spaCy package for better detection of names.
     detect_only
         Boolean to decide on whether to only output detected phis
+    build_cache_dir
+        (Optional) directory of an on-disk cache of the PHI finder, see `pyDeidBuilder.set_build_cache`.
+        Repeated calls with the same settings then reuse the finder instead of building it again.
     **custom_regexes
         These are named arguments that will be taken as regexes to be scrubbed from
         the given note. The keyword/argument name itself will be used to label the
@@ -272,6 +276,9 @@ def deid_string(
 
     builder = pyDeidBuilder().replace_phi().set_phi_types(types)
 
+    if build_cache_dir is not None:
+        builder.set_build_cache(build_cache_dir)
+
     if (
         custom_dr_first_names
         or custom_dr_last_names
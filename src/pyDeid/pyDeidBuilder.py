@@ -2,15 +2,22 @@ from typing import *
 from pathlib import Path
 import sys
 from .Deidentifier import Deidentifier
+from .BuildCache import BuildCache, finder_key
 import csv
+import hashlib
 import json
 import os
+from .process_note.DetectionCache import DetectionCache
+from .process_note.Instrumentation import Instrumentation
 from .process_note.PHIFinder import *
 from .process_note.PHIHandler import *
 from .process_note.PHIPruner import *
 from .process_note.PHIReplacer import *
 import io
-from spacy.language import Language
+
+if TYPE_CHECKING:
+    # spaCy takes most of the import time, and is only needed with an NER pipeline
+    from spacy.language import Language
 
 
 class pyDeidBuilder:
@@ -29,6 +36,9 @@ class pyDeidBuilder:
         self.original_file = None
         self.phi_types = []
         self.ner_model = None
+        self.build_cache = None
+        self.detection_cache = None
+        self.instrumentation = None
 
         self.finder_custom_regexes = []
         self.finder_custom_dr_first_names = None
@@ -38,6 +48,7 @@ class pyDeidBuilder:
         self.finder_two_digit_threshold = None
         self.finder_valid_year_low = None
         self.finder_valid_year_high = None
+        self.finder_segment_cache_bytes = 4 * 2**20
 
     def replace_phi(self, enable_replace=True, return_surrogates: bool = True):
         """Replaces found instances of PHI in the note to de-identify.
@@ -126,12 +137,15 @@ class pyDeidBuilder:
         self,
         phi_output_file: Union[str, Path] = None,
         phi_output_file_type: Literal["csv"] = "csv",
+        flush_interval: int = 1000,
     ):
         """Allows for a custom filename for the PHI output file.
 
         Args:
             phi_output_file (_type_, optional): Custom name for the output file. Defaults to None.
             phi_output_file_type (Literal['csv'], optional): What format to output the PHI to. Currently only supports "csv".
+            flush_interval (int, optional): Number of PHI rows buffered in memory before they are written to the PHI output
+                file in a single batch. The file stays open for the whole run. Defaults to 1000.
 
         Returns:
             pyDeidBuilder: Instance of the pyDeidBuilder class, allowing method chaining.
@@ -152,8 +166,12 @@ class pyDeidBuilder:
         else:
             return
 
+        if flush_interval < 1:
+            raise ValueError(f"flush_interval must be at least 1 (got {flush_interval})")
+
         self.deid.phi_output_file = phi_output_file
         self.deid.phi_output_file_type = phi_output_file_type
+        self.deid.phi_flush_interval = flush_interval
         self._write_headers_phi_output_file(
             self.deid.encounter_id_varname, phi_output_file, phi_output_file_type
         )
@@ -287,14 +305,93 @@ class pyDeidBuilder:
 
             return self
 
-    def set_multithreading(self, threads: int):
+    def set_multithreading(
+        self,
+        threads: int,
+        resident_handler: bool = True,
+        max_in_flight: int = None,
+        preserve_order: bool = False,
+        chunk_size: int = None,
+        chunk_chars: int = None,
+        lookahead: int = None,
+        window_chars: int = None,
+        window_overlap: int = 1000,
+        measure_ipc: bool = False,
+    ):
+        """Specify the number of worker processes used to de-identify the input file.
+
+        Args:
+            threads (int): Number of parallel processing workers to use.
+            resident_handler (bool, optional): Send the PHI handler (wordlists, surrogate pools, MLL rows) to each worker once
+                when the pool starts, so tasks only carry the rows to de-identify. When False, the handler is pickled and
+                sent along with every task. Defaults to True.
+            max_in_flight (int, optional): Maximum number of notes submitted to the workers but not yet written out.
+                Rows are only read from the input file as results drain, so memory use is bounded by this window
+                rather than by the size of the input file. Defaults to 4 chunks per worker.
+            preserve_order (bool, optional): Write the de-identified and PHI output files in the same row order as the
+                input file. Results that finish early are held in a reorder buffer, which counts towards `max_in_flight`,
+                until all earlier rows are written. Defaults to False, which writes results as soon as they complete.
+            chunk_size (int, optional): Maximum number of notes sent to a worker in a single task. Batching many short notes
+                per task amortizes the scheduling and pickling overhead of each task. Defaults to one note per task, or 64
+                when `chunk_chars` is given.
+            chunk_chars (int, optional): Target number of characters per task. A chunk closes as soon as its notes reach
+                this many characters, or when it holds `chunk_size` notes. Defaults to None.
+            lookahead (int, optional): Number of rows read ahead of the workers and dispatched longest note first, so that
+                very long notes start early instead of straggling at the end of the run. Workers take the next task as soon
+                as they are free, which keeps their character loads balanced. Staged rows are held in memory in addition
+                to `max_in_flight`. Defaults to None, which dispatches rows in input order.
+            window_chars (int, optional): Notes longer than this many characters are split at line or whitespace
+                boundaries into windows that are searched for PHI in parallel. The PHI found in each window is merged
+                before the whole note is pruned and replaced, so offsets in the output refer to the original note.
+                Defaults to None, which processes every note as a single task.
+            window_overlap (int, optional): Number of characters of context each window shares with its neighbours.
+                A PHI straddling a seam is reported by the window holding its start, so this should be larger than
+                the longest PHI plus the context the finders look at around it. Defaults to 1000.
+            measure_ipc (bool, optional): Report the mean size of the pickled task payloads in the run diagnostics. Each
+                payload is pickled a second time to measure it, which costs as much as sending it. Defaults to False.
+
+        Raises:
+            ValueError: More threads were requested than there are CPUs available.
+
+        Returns:
+            pyDeidBuilder: Instance of the pyDeidBuilder class, allowing method chaining.
+        """
         cpu_count = os.cpu_count() or 1
         if threads > cpu_count:
             raise ValueError(
                 f"Cannot use more than {cpu_count} threads (got {threads})"
             )
 
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1 (got {max_in_flight})")
+
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1 (got {chunk_size})")
+
+        if chunk_chars is not None and chunk_chars < 1:
+            raise ValueError(f"chunk_chars must be at least 1 (got {chunk_chars})")
+
+        if lookahead is not None and lookahead < 1:
+            raise ValueError(f"lookahead must be at least 1 (got {lookahead})")
+
+        if window_chars is not None and window_chars < 1:
+            raise ValueError(f"window_chars must be at least 1 (got {window_chars})")
+
+        if window_overlap < 0:
+            raise ValueError(
+                f"window_overlap must be at least 0 (got {window_overlap})"
+            )
+
         self.deid.max_workers = threads
+        self.deid.resident_handler = resident_handler
+        self.deid.max_in_flight = max_in_flight
+        self.deid.preserve_order = preserve_order
+        self.deid.chunk_size = chunk_size
+        self.deid.chunk_chars = chunk_chars
+        self.deid.lookahead = lookahead
+        self.deid.window_chars = window_chars
+        self.deid.window_overlap = window_overlap
+        self.deid.measure_ipc = measure_ipc
         return self
 
     def _load_reader_dict(self, file_encoding="utf-8", read_error_handling=None):
@@ -331,39 +428,137 @@ class pyDeidBuilder:
                 )
 
         elif phi_output_file_type == "csv":
-            # write header
+            if (
+                not self.deid.regex_replace and not self.deid.return_surrogates
+            ) or (self.deid.regex_replace and not self.deid.return_surrogates):
+                fieldnames = [
+                    "encounter_id",
+                    "note_id",
+                    "phi_start",
+                    "phi_end",
+                    "phi",
+                    "types",
+                ]
+
+            else:  # enable is True, return surrogats is True
+                fieldnames = [
+                    "encounter_id",
+                    "note_id",
+                    "phi_start",
+                    "phi_end",
+                    "phi",
+                    "surrogate_start",
+                    "surrogate_end",
+                    "surrogate",
+                    "types",
+                ]
+
+            # write header, and keep the fieldnames so the Deidentifier doesn't need to read them back
             with open(phi_output_file, "w", newline="") as o:
                 writer = csv.writer(o)
-                if (
-                    not self.deid.regex_replace and not self.deid.return_surrogates
-                ) or (self.deid.regex_replace and not self.deid.return_surrogates):
-                    writer.writerow(
-                        [
-                            "encounter_id",
-                            "note_id",
-                            "phi_start",
-                            "phi_end",
-                            "phi",
-                            "types",
-                        ]
-                    )
-
-                else:  # enable is True, return surrogats is True
-                    writer.writerow(
-                        [
-                            "encounter_id",
-                            "note_id",
-                            "phi_start",
-                            "phi_end",
-                            "phi",
-                            "surrogate_start",
-                            "surrogate_end",
-                            "surrogate",
-                            "types",
-                        ]
-                    )
-
-    def set_ner_pipeline(self, model: Language = None):
+                writer.writerow(fieldnames)
+
+            self.deid.phi_fieldnames = fieldnames
+
+    def set_build_cache(self, cache_dir: str = None):
+        """Keep the constructed PHI finder in an on-disk cache, so that later builds with the same wordlists and
+        configuration load it instead of constructing it again.
+
+        The cache is keyed by a hash of the wordlist files, pyDeid's modules, the PHI types, custom namelists and valid
+        years, so entries are never used after any of these changes. Builds with an NER pipeline are not cached.
+
+        Entries are pickles, which can run arbitrary code when loaded, so the directory must not be writable by other
+        users. It is created with mode 0700, and a directory or entry owned by another user or writable by its group or
+        others raises a ValueError instead of being loaded.
+
+        Args:
+            cache_dir (str, optional): Directory of the cache. Defaults to `pyDeid` in `$XDG_CACHE_HOME`, or in `~/.cache`.
+
+        Returns:
+            pyDeidBuilder: Instance of the pyDeidBuilder class, allowing method chaining.
+        """
+        self.build_cache = BuildCache(cache_dir)
+
+        return self
+
+    def set_detection_cache(
+        self,
+        max_entries: int = 100000,
+        path: str = None,
+        max_disk_entries: int = 1000000,
+    ):
+        """Remember the pruned PHI of each note by a hash of its content, so that notes repeated in the input skip the
+        finders and the pruner. Surrogates are still drawn for every note.
+
+        The hash covers the note, its master linking log row and everything the finder depends on, including custom
+        regexes and the NER pipeline's name and version, so a cache persisted with `path` is never used after any of
+        these changes. `run()` reports the hit rate and the time saved.
+
+        The database at `path` stores the offsets and types of the PHI of each note and the fields of its dates, but
+        not the PHI text. These are still PHI of the notes, so the database must be protected like the input file, and
+        deleted with it.
+
+        Args:
+            max_entries (int, optional): Number of notes kept in memory by each process. Defaults to 100000.
+            path (str, optional): Path of an SQLite database persisting the cache across worker processes and runs.
+                Defaults to None, keeping the cache in memory only. Raises a ValueError if the file exists and is not
+                a detection cache database of this version.
+            max_disk_entries (int, optional): Number of notes kept in the database at `path`, the oldest being deleted
+                first. Defaults to 1000000.
+
+        Returns:
+            pyDeidBuilder: Instance of the pyDeidBuilder class, allowing method chaining.
+        """
+        self.detection_cache = DetectionCache(max_entries, path, max_disk_entries)
+
+        return self
+
+    def set_instrumentation(
+        self,
+        report_file: Union[str, Path] = None,
+        hooks: List[Callable[[str, float, int], None]] = None,
+    ):
+        """Record the wall time, number of calls and PHI spans emitted by each finder, the pruner, the replacer, and the
+        reading, writing and waiting on the workers of `run()`, aggregated across worker processes.
+
+        Args:
+            report_file (Union[str, Path], optional): Path of the JSON report written at the end of `run()`. Defaults to
+                the input file name with the suffix `__INSTRUMENTATION.json`.
+            hooks (List[Callable[[str, float, int], None]], optional): Functions called with the stage name, seconds
+                and spans of every record, in the process the stage ran in. They must be picklable. Defaults to None.
+
+        Returns:
+            pyDeidBuilder: Instance of the pyDeidBuilder class, allowing method chaining.
+        """
+        self.instrumentation = Instrumentation(hooks or [])
+        self.deid.instrumentation_file = report_file
+
+        return self
+
+    def set_segment_cache(self, max_bytes: int = 4 * 2**20):
+        """Sets how much memory the SIN, OHIP, MRN, email and postal code finders use to remember the PHI they found in
+        each line or paragraph.
+
+        These finders never match across a line (or, for MRNs, a blank line), so the PHI they find in a segment seen
+        before, such as a repeated header or table row, are reused instead of searched for again. The other finders
+        depend on the wider note and always search all of it. Segments are remembered by a digest, so the memory used
+        depends on the PHI found rather than the length of the segments.
+
+        Args:
+            max_bytes (int, optional): Approximate number of bytes remembered by each process, or 0 to search every
+                note whole. Defaults to 4 MiB.
+
+        Returns:
+            pyDeidBuilder: Instance of the pyDeidBuilder class, allowing method chaining.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+
+        self.finder_segment_cache_bytes = max_bytes
+
+        return self
+
+    def set_ner_pipeline(self, model: "Language" = None):
         """Adds a named entity recognition step using a spaCy NER pipeline.
 
         Args:
@@ -415,7 +610,7 @@ class pyDeidBuilder:
             raise ValueError("surrogate_builder_fn specified but replace_phi not set")
 
         if self.replacer is not None:
-            self.replacer.custom_regexes = self.replacer.custom_regexes + [custom_regex]
+            self.replacer.add_custom_regex(custom_regex)
 
         return self
 
@@ -437,6 +632,25 @@ class pyDeidBuilder:
         self.finder_valid_year_high = valid_year_high
         return self
 
+    def _detection_namespace(self, finder_config):
+        ner = None
+
+        if finder_config.ner_model is not None:
+            meta = finder_config.ner_model.meta
+            ner = [meta.get("lang"), meta.get("name"), meta.get("version")]
+            ner.append(finder_config.ner_model.pipe_names)
+
+        inputs = [
+            finder_key(finder_config),
+            [
+                [custom_regex.phi_type, str(custom_regex.pattern)]
+                for custom_regex in finder_config.custom_regexes
+            ],
+            ner,
+        ]
+
+        return hashlib.sha256(json.dumps(inputs).encode("utf-8")).hexdigest()
+
     def _remove_NaN(self, namelist):
         return {x for x in namelist if x == x} if namelist else None
 
@@ -516,21 +730,25 @@ class pyDeidBuilder:
         if self.deid.regex_replace and not self.replacer:
             self.replace_phi()
 
-        self.finder = PHIFinder(
-            config=PHIFinder.Config(
-                phi_types=self.phi_types,
-                custom_regexes=self.finder_custom_regexes,
-                two_digit_threshold=self.finder_two_digit_threshold,
-                valid_year_low=self.finder_valid_year_low,
-                valid_year_high=self.finder_valid_year_high,
-                custom_dr_first_names=self.finder_custom_dr_first_names,
-                custom_dr_last_names=self.finder_custom_dr_last_names,
-                custom_patient_first_names=self.finder_custom_patient_first_names,
-                custom_patient_last_names=self.finder_custom_patient_last_names,
-                ner_model=self.ner_model,
-            )
+        finder_config = PHIFinder.Config(
+            phi_types=self.phi_types,
+            custom_regexes=self.finder_custom_regexes,
+            two_digit_threshold=self.finder_two_digit_threshold,
+            valid_year_low=self.finder_valid_year_low,
+            valid_year_high=self.finder_valid_year_high,
+            custom_dr_first_names=self.finder_custom_dr_first_names,
+            custom_dr_last_names=self.finder_custom_dr_last_names,
+            custom_patient_first_names=self.finder_custom_patient_first_names,
+            custom_patient_last_names=self.finder_custom_patient_last_names,
+            ner_model=self.ner_model,
+            segment_cache_bytes=self.finder_segment_cache_bytes,
         )
 
+        if self.build_cache is None:
+            self.finder = PHIFinder(config=finder_config)
+        else:
+            self.finder = self.build_cache.get_finder(finder_config)
+
         if self.replacer is not None:
             self.replacer.load_phi_types(self.finder)
 
@@ -541,6 +759,22 @@ class pyDeidBuilder:
         if self.replacer is not None:
             handler.set_replacer(self.replacer)
 
+        if self.instrumentation is not None:
+            handler.set_instrumentation(self.instrumentation)
+
+        if (
+            self.instrumentation is not None
+            and self.deid.instrumentation_file is None
+            and self.original_file
+        ):
+            self.deid.instrumentation_file = (
+                os.path.splitext(self.original_file)[0] + "__INSTRUMENTATION.json"
+            )
+
+        if self.detection_cache is not None:
+            self.detection_cache.namespace = self._detection_namespace(finder_config)
+            handler.set_detection_cache(self.detection_cache)
+
         self.deid.handler = handler
 
         return self.deid
@@ -0,0 +1,493 @@
+"""
+Serves de-identification over HTTP from a warm pool of worker processes, e.g.
+
+    python -m pyDeid.serve --port 8000 --workers 4
+
+or `python -m pyDeid.cli serve` with the same arguments. There is no `pydeid` executable, as `setup.py` installs no
+console scripts.
+
+`POST /deid` takes `{"note": "..."}` and returns the `[surrogates, new_note]` pair of `deid_string`, or a 500 if the
+note fails, or takes `{"notes": ["...", ...]}` and returns a list with the pair of each note, or `{"error": "..."}` for
+a note that failed. A body larger than `--max_body_bytes` gets a 413 without being read. `GET /metrics` returns request
+and note latency histograms and queue counters in the Prometheus text format.
+"""
+
+import argparse
+import json
+import multiprocessing
+import queue
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import *
+from .DeidEngine import DEFAULT_PHI_TYPES, DeidEngine, NoteError, _deid_chunk
+from .pyDeidBuilder import pyDeidBuilder
+
+# upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class LatencyHistogram:
+    """Counts latencies in cumulative buckets, as a Prometheus histogram."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self.lock:
+            self.counts[bisect_left(self.buckets, seconds)] += 1
+            self.total += seconds
+
+    def render(self, name: str, description: str) -> List[str]:
+        with self.lock:
+            counts = list(self.counts)
+            total = self.total
+
+        lines = [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+        cumulative = 0
+
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(f'{name}_bucket{{le="{le}"}} {cumulative}')
+
+        lines += [f"{name}_sum {total:.6f}", f"{name}_count {cumulative}"]
+
+        return lines
+
+
+class NoteBatcher:
+    """
+    Collects the notes of concurrent requests into micro-batches for the engine's worker processes.
+
+    A batch is dispatched when `batch_size` notes are waiting, or `max_batch_delay` seconds after its first note
+    arrived. At most `max_queue` notes are queued or being de-identified; a request that does not fit is rejected as a
+    whole, so the server can answer 429 instead of letting the backlog grow.
+
+    The worker processes are forked before the dispatcher thread starts, so they never inherit a thread's locks. If
+    they die, the batch that found out fails and the pool is started again, from a fork server or fresh interpreters
+    since other threads are running by then. A note that fails only fails its own future, with a `NoteError`.
+    """
+
+    def __init__(
+        self,
+        engine: DeidEngine,
+        workers: int,
+        batch_size: int,
+        max_batch_delay: float,
+        max_queue: int,
+    ):
+        self.engine = engine
+        self.workers = workers
+        self.pool = engine._get_pool(workers)
+        # forks every worker now, while this is the only thread
+        self.pool.submit(int).result()
+
+        self.batch_size = batch_size
+        self.max_batch_delay = max_batch_delay
+        self.max_queue = max_queue
+
+        self.queue = queue.Queue()
+        self.pending = 0
+        self.lock = threading.Lock()
+
+        self.batches = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.note_latency = LatencyHistogram()
+
+        self.dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self.dispatcher.start()
+
+    def submit(self, notes: List[str]) -> List[Future]:
+        """Queues notes, and returns a future of the `(surrogates, new_note)` of each.
+
+        Raises:
+            QueueFullError: If the notes do not fit in the queue.
+        """
+        with self.lock:
+            if self.pending + len(notes) > self.max_queue:
+                self.rejected += 1
+                raise QueueFullError()
+
+            self.pending += len(notes)
+
+        results = [Future() for _ in notes]
+
+        for note, result in zip(notes, results):
+            self.queue.put((note, result))
+
+        return results
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self.dispatcher.join()
+
+    def _dispatch(self) -> None:
+        while True:
+            item = self.queue.get()
+
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_batch_delay
+
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+
+                if item is None:
+                    # stop once this batch is dispatched
+                    self.queue.put(None)
+                    break
+
+                batch.append(item)
+
+            self.batches += 1
+
+            pool = self.pool
+
+            try:
+                task = pool.submit(_deid_chunk, [note for note, _ in batch])
+            except Exception as e:
+                self._fail(batch, pool, e)
+            else:
+                task.add_done_callback(partial(self._complete, batch, pool))
+
+    def _complete(self, batch, pool, task: Future) -> None:
+        try:
+            results, latencies = task.result()
+        except Exception as e:
+            self._fail(batch, pool, e)
+            return
+
+        for latency in latencies:
+            self.note_latency.observe(latency)
+
+        for (_, result), deidentified in zip(batch, results):
+            if isinstance(deidentified, NoteError):
+                result.set_exception(deidentified)
+            else:
+                result.set_result(deidentified)
+
+        with self.lock:
+            self.pending -= len(batch)
+
+    def _fail(self, batch, pool, error: Exception) -> None:
+        if isinstance(error, BrokenProcessPool):
+            self._restart(pool)
+
+        for _, result in batch:
+            result.set_exception(error)
+
+        with self.lock:
+            self.pending -= len(batch)
+
+    def _restart(self, broken_pool) -> None:
+        with self.lock:
+            # the other batches of the broken pool find out too, after it was replaced
+            if broken_pool is not self.pool:
+                return
+
+            # may run in the pool's own management thread, which cannot wait for itself
+            self.engine.close(wait=False)
+            self.engine.mp_context = multiprocessing.get_context(
+                "forkserver"
+                if "forkserver" in multiprocessing.get_all_start_methods()
+                else "spawn"
+            )
+            self.pool = self.engine._get_pool(self.workers)
+            self.restarts += 1
+
+
+class DeidRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path != "/deid":
+            self._respond(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        start_time = time.perf_counter()
+
+        try:
+            self._deid()
+        finally:
+            # errors and timeouts are answers too, as is a request whose client left before its answer was written
+            self.server.request_latency.observe(time.perf_counter() - start_time)
+
+    def _deid(self) -> None:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+
+        if length < 0:
+            self._respond(400, {"error": "The Content-Length header is not valid"})
+            return
+
+        if length > self.server.max_body_bytes:
+            # the body is left unread, and the connection closed after the answer
+            self.close_connection = True
+            self._respond(
+                413,
+                {
+                    "error": f"The request body is larger than {self.server.max_body_bytes} bytes"
+                },
+            )
+            return
+
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            self._respond(400, {"error": "The request body is not valid JSON"})
+            return
+
+        if isinstance(body, dict) and isinstance(body.get("note"), str):
+            notes = [body["note"]]
+            single = True
+        elif (
+            isinstance(body, dict)
+            and isinstance(body.get("notes"), list)
+            and all(isinstance(note, str) for note in body["notes"])
+        ):
+            notes = body["notes"]
+            single = False
+        else:
+            self._respond(
+                400, {"error": 'Expected {"note": "..."} or {"notes": ["...", ...]}'}
+            )
+            return
+
+        try:
+            results = self.server.batcher.submit(notes)
+        except QueueFullError:
+            self._respond(429, {"error": "Too many notes queued"}, {"Retry-After": "1"})
+            return
+
+        deadline = time.monotonic() + self.server.request_timeout
+        deidentified = []
+
+        for result in results:
+            try:
+                deidentified.append(
+                    result.result(timeout=max(deadline - time.monotonic(), 0))
+                )
+            except FutureTimeoutError:
+                # the notes are still de-identified by the workers, and their results discarded
+                self._respond(504, {"error": "De-identification timed out"})
+                return
+            except NoteError:
+                if single:
+                    self._respond(500, {"error": "De-identification failed"})
+                    return
+
+                deidentified.append({"error": "De-identification failed"})
+            except Exception:
+                # the error may quote the note, so it is not sent back
+                self._respond(500, {"error": "De-identification failed"})
+                return
+
+        self._respond(200, deidentified[0] if single else deidentified)
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self._respond(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        batcher = self.server.batcher
+        lines = self.server.request_latency.render(
+            "pydeid_request_duration_seconds",
+            "Time to answer de-identification requests.",
+        )
+        lines += batcher.note_latency.render(
+            "pydeid_note_duration_seconds", "Time workers spent de-identifying a note."
+        )
+        lines += [
+            "# HELP pydeid_queued_notes Notes queued or being de-identified.",
+            "# TYPE pydeid_queued_notes gauge",
+            f"pydeid_queued_notes {batcher.pending}",
+            "# HELP pydeid_batches_total Batches of notes sent to the workers.",
+            "# TYPE pydeid_batches_total counter",
+            f"pydeid_batches_total {batcher.batches}",
+            "# HELP pydeid_rejected_requests_total Requests rejected because the queue was full.",
+            "# TYPE pydeid_rejected_requests_total counter",
+            f"pydeid_rejected_requests_total {batcher.rejected}",
+            "# HELP pydeid_pool_restarts_total Times the worker processes died and were started again.",
+            "# TYPE pydeid_pool_restarts_total counter",
+            f"pydeid_pool_restarts_total {batcher.restarts}",
+        ]
+
+        self._send(
+            200, ("\n".join(lines) + "\n").encode("utf-8"), "text/plain; version=0.0.4"
+        )
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _respond(self, status: int, body, headers: Dict[str, str] = None) -> None:
+        # dates are namedtuples, which are written as lists as in the JSON PHI output file
+        self._send(
+            status, json.dumps(body).encode("utf-8"), "application/json", headers
+        )
+
+    def _send(
+        self,
+        status: int,
+        payload: bytes,
+        content_type: str,
+        headers: Dict[str, str] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def make_server(
+    builder: pyDeidBuilder = None,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    workers: int = 1,
+    batch_size: int = 16,
+    max_batch_delay: float = 0.005,
+    max_queue: int = 1024,
+    request_timeout: float = 30.0,
+    max_body_bytes: int = 16 * 1024 * 1024,
+    verbose: bool = False,
+) -> ThreadingHTTPServer:
+    """Builds a `DeidEngine` from `builder`, starts its worker processes and returns the HTTP server, not yet serving.
+
+    Args:
+        builder: A configured builder, see `DeidEngine`. Defaults to the configuration of `deid_string`.
+        host: Address to listen on.
+        port: Port to listen on, or 0 for any free port.
+        workers: Number of worker processes.
+        batch_size: Largest number of notes sent to a worker at once.
+        max_batch_delay: Longest time in seconds a note waits for others to be batched with.
+        max_queue: Largest number of notes queued or being de-identified, beyond which requests get a 429.
+        request_timeout: Time in seconds after which a request gets a 504.
+        max_body_bytes: Largest request body in bytes, beyond which requests get a 413.
+        verbose: Whether to log every request.
+    """
+    if workers < 1 or batch_size < 1 or max_queue < 1 or max_body_bytes < 1:
+        raise ValueError(
+            "workers, batch_size, max_queue and max_body_bytes must be positive"
+        )
+
+    server = ThreadingHTTPServer((host, port), DeidRequestHandler)
+    server.daemon_threads = True
+    server.engine = DeidEngine(builder)
+    server.batcher = NoteBatcher(
+        server.engine, workers, batch_size, max_batch_delay, max_queue
+    )
+    server.request_latency = LatencyHistogram()
+    server.request_timeout = request_timeout
+    server.max_body_bytes = max_body_bytes
+    server.verbose = verbose
+
+    return server
+
+
+def main(argv: List[str] = None) -> None:
+    """Serves de-identification until interrupted, with the command line arguments `argv`, by default those of the
+    process."""
+    parser = argparse.ArgumentParser(
+        description="Serve pyDeid de-identification over HTTP"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="The number of worker processes."
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=16,
+        help="The largest number of notes sent to a worker at once.",
+    )
+    parser.add_argument(
+        "--max_batch_delay",
+        type=float,
+        default=0.005,
+        help="The longest time in seconds a note waits to be batched.",
+    )
+    parser.add_argument(
+        "--max_queue",
+        type=int,
+        default=1024,
+        help="The largest number of queued notes before requests are rejected with 429.",
+    )
+    parser.add_argument(
+        "--request_timeout",
+        type=float,
+        default=30.0,
+        help="The time in seconds after which a request is answered with 504.",
+    )
+    parser.add_argument(
+        "--max_body_bytes",
+        type=int,
+        default=16 * 1024 * 1024,
+        help="The largest request body in bytes before requests are rejected with 413.",
+    )
+    parser.add_argument("--types", type=str, nargs="*", default=DEFAULT_PHI_TYPES)
+    parser.add_argument(
+        "--build_cache_dir",
+        type=str,
+        default=None,
+        help="The directory of an on-disk cache of the PHI finder.",
+    )
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    builder = pyDeidBuilder().replace_phi().set_phi_types(args.types)
+
+    if args.build_cache_dir is not None:
+        builder.set_build_cache(args.build_cache_dir)
+
+    server = make_server(
+        builder,
+        args.host,
+        args.port,
+        args.workers,
+        args.batch_size,
+        args.max_batch_delay,
+        args.max_queue,
+        args.request_timeout,
+        args.max_body_bytes,
+        args.verbose,
+    )
+
+    print(f"Serving de-identification on http://{args.host}:{server.server_port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
+        server.engine.close()
+
+
+if __name__ == "__main__":
+    main()
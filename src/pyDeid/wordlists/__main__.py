@@ -0,0 +1,22 @@
+import argparse
+from ..phi_types.WordlistIndex import compile_wordlist_index
+from ..phi_types.utils import DATA_PATH, user_index_path, wordlist_index_sources
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compile the pyDeid wordlists into a memory-mapped index"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=user_index_path(),
+        help="Path of the index file. Defaults to the user cache directory, where pyDeid looks for it first. Packagers "
+        "can write it to src/pyDeid/wordlists/wordlists.idx to ship it with the package.",
+    )
+    args = parser.parse_args()
+
+    wordlists, sources = wordlist_index_sources()
+    compile_wordlist_index(args.output, wordlists, sources)
+
+    print(f"Compiled {len(wordlists)} wordlists from {DATA_PATH} into {args.output}")
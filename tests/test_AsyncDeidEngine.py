@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from pyDeid import AsyncDeidEngine, NoteError
+
+NOTES = [
+    "Justin Wood was seen on December 10, 2001",
+    # raises IndexError in the date range pattern
+    "Seen 3/4/19-3/5/19.",
+    "Test mrn: 011-0111",
+]
+
+
+def test_failed_note_only_fails_its_call():
+    async def main():
+        async with AsyncDeidEngine(batch_size=8, max_batch_delay=0.05) as engine:
+            results = await asyncio.gather(
+                *(engine.adeid(note) for note in NOTES), return_exceptions=True
+            )
+
+            return results, engine.batches
+
+    results, batches = asyncio.run(main())
+
+    assert batches == 1
+    assert isinstance(results[1], NoteError)
+    assert "Justin" in [s["phi"] for s in results[0][0]]
+    assert "011-0111" in [s["phi"] for s in results[2][0]]
+
+
+def test_stream_yields_in_order():
+    async def main():
+        async with AsyncDeidEngine() as engine:
+            return [
+                new_note
+                async for _, new_note in engine.adeid_stream([NOTES[0], NOTES[2]] * 3)
+            ]
+
+    new_notes = asyncio.run(main())
+
+    assert len(new_notes) == 6
+    assert all("011-0111" not in note for note in new_notes[1::2])
+
+
+def test_timed_out_call_keeps_its_slot_until_the_worker_is_done():
+    async def main():
+        async with AsyncDeidEngine(
+            batch_size=1, max_batch_delay=0, max_concurrency=1
+        ) as engine:
+            # starts the worker, so the next note is dispatched at once
+            await engine.adeid(NOTES[0])
+
+            with pytest.raises(asyncio.TimeoutError):
+                await engine.adeid(NOTES[0] * 2000, timeout=0.01)
+
+            held = engine.slots.locked()
+            await asyncio.gather(*engine.running_batches)
+
+            return held, engine.slots.locked()
+
+    assert asyncio.run(main()) == (True, False)
+
+
+def test_stopped_batcher_fails_waiting_calls():
+    async def main():
+        engine = AsyncDeidEngine()
+        # makes the batcher raise on its first note
+        engine.max_batch_delay = None
+
+        with pytest.raises(RuntimeError) as first:
+            await engine.adeid(NOTES[0])
+
+        with pytest.raises(RuntimeError) as second:
+            await engine.adeid(NOTES[0])
+
+        await engine.aclose()
+
+        return first.value, second.value
+
+    first, second = asyncio.run(main())
+
+    assert isinstance(first.__cause__, TypeError)
+    assert isinstance(second.__cause__, TypeError)
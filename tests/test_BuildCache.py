@@ -0,0 +1,107 @@
+import os
+import pytest
+from pyDeid import BuildCache as build_cache
+from pyDeid.process_note.Instrumentation import Instrumentation
+from pyDeid.pyDeidBuilder import pyDeidBuilder
+
+NOTE = "Justin Wood was seen at St. Michael's hospital, Test mrn: 011-0111"
+
+
+@pytest.fixture
+def loaded_finders(monkeypatch):
+    monkeypatch.setattr(build_cache, "LOADED_FINDERS", build_cache.OrderedDict())
+
+    return build_cache.LOADED_FINDERS
+
+
+def build(cache_dir, custom_pattern=None, instrumentation=False):
+    builder = pyDeidBuilder().replace_phi().set_build_cache(str(cache_dir))
+
+    if custom_pattern is not None:
+        builder.set_custom_regex(custom_pattern)
+
+    if instrumentation:
+        builder.set_instrumentation()
+
+    return builder.build()
+
+
+def spans(deid):
+    surrogates, _ = deid.handler.handle_string(NOTE)
+
+    return sorted((s["phi_start"], s["phi"]) for s in surrogates)
+
+
+def test_builds_get_their_own_finder(tmp_path, loaded_finders):
+    first = build(tmp_path, custom_pattern=r"\bwas seen\b")
+    second = build(tmp_path, instrumentation=True)
+
+    assert len(loaded_finders) == 1
+    assert first.handler.finder is not second.handler.finder
+
+    # the copies share the compiled data of the loaded finder
+    template = next(iter(loaded_finders.values()))
+    assert first.handler.finder.registry is template.registry
+    assert first.handler.finder.gazetteer.goto is template.gazetteer.goto
+
+    # a later build neither drops the custom regex of an earlier one nor makes it record its stages
+    assert (12, "was seen") not in spans(second)
+    assert (12, "was seen") in spans(first)
+    assert first.handler.finder.instrumentation is None
+    assert isinstance(second.handler.finder.instrumentation, Instrumentation)
+
+
+def test_copies_find_the_phi_of_an_uncached_finder(tmp_path, loaded_finders):
+    uncached = spans(pyDeidBuilder().replace_phi().build())
+
+    assert spans(build(tmp_path)) == uncached
+    # loaded from disk
+    loaded_finders.clear()
+    assert spans(build(tmp_path)) == uncached
+
+
+def test_loaded_finders_are_bounded(tmp_path, loaded_finders, monkeypatch):
+    monkeypatch.setattr(build_cache, "MAX_LOADED_FINDERS", 2)
+    cache = build_cache.BuildCache(str(tmp_path))
+
+    for threshold in [10, 20, 30, 20]:
+        cache.get_finder(
+            build_cache.PHIFinder.Config(
+                phi_types=["mrn"], two_digit_threshold=threshold
+            )
+        )
+
+    assert len(loaded_finders) == 2
+    assert cache.misses == 3 and cache.hits == 1
+
+
+def test_caches_writable_by_others_are_refused(tmp_path, loaded_finders):
+    cache_dir = tmp_path / "cache"
+    build(cache_dir)
+    (entry,) = cache_dir.iterdir()
+
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+    assert entry.stat().st_mode & 0o777 == 0o600
+
+    entry.chmod(0o666)
+    loaded_finders.clear()
+
+    with pytest.raises(ValueError, match="writable by other users"):
+        build(cache_dir)
+
+    entry.chmod(0o600)
+    cache_dir.chmod(0o777)
+
+    with pytest.raises(ValueError, match="writable by other users"):
+        build(cache_dir)
+
+
+def test_caches_of_other_users_are_refused(tmp_path, loaded_finders, monkeypatch):
+    build(tmp_path)
+    loaded_finders.clear()
+    monkeypatch.setattr(
+        os, "getuid", lambda: os.stat(tmp_path).st_uid + 1, raising=False
+    )
+
+    with pytest.raises(ValueError, match="owned by another user"):
+        build(tmp_path)
@@ -0,0 +1,65 @@
+import pytest
+from pyDeid import DeidEngine, NoteError
+
+NOTES = [
+    "Justin Wood was seen on December 10, 2001",
+    "St. Michael's hospital is located at 30 Bond St, Toronto, ON, M5B 1W8",
+    # raises IndexError in the date range pattern
+    "Seen 3/4/19-3/5/19.",
+    "Test mrn: 011-0111",
+    "Call 416-555-0123 or email jwood@example.com",
+]
+
+
+def spans(result):
+    surrogates, _ = result
+
+    return [(s["phi_start"], s["phi_end"], s["phi"], s["types"]) for s in surrogates]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    with DeidEngine() as engine:
+        yield engine
+
+
+def test_deid_finds_phi(engine):
+    surrogates, new_note = engine.deid(NOTES[0])
+
+    assert "Justin" in [s["phi"] for s in surrogates]
+    assert "Justin Wood" not in new_note
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failed_note_does_not_end_the_stream(engine, workers):
+    failed = engine.failed
+    results = list(engine.deid_many(NOTES * 5, workers=workers, chunk_size=4))
+
+    assert len(results) == len(NOTES) * 5
+
+    for i, result in enumerate(results):
+        if i % len(NOTES) == 2:
+            assert isinstance(result, NoteError)
+            assert result.error_type == "IndexError"
+        else:
+            assert spans(result) == spans(engine.deid(NOTES[i % len(NOTES)]))
+
+    assert engine.failed - failed == 5
+
+
+def test_deid_raises_on_failed_note(engine):
+    with pytest.raises(IndexError):
+        engine.deid(NOTES[2])
+
+
+def test_latency_percentiles(engine):
+    engine.deid(NOTES[0])
+    percentiles = engine.latency_percentiles((50, 100))
+
+    assert 0 < percentiles[50] <= percentiles[100]
+    assert "failed" in engine.report()
+
+
+def test_invalid_arguments(engine):
+    with pytest.raises(ValueError):
+        next(engine.deid_many(NOTES, workers=0))
@@ -0,0 +1,75 @@
+import csv
+import os
+import pytest
+from pyDeid.DeidEngine import DEFAULT_PHI_TYPES
+from pyDeid.process_note.PHIHandler import PHIHandler
+from pyDeid.pyDeidBuilder import pyDeidBuilder
+
+
+def run(tmp_path, rows, measure_ipc, **multithreading):
+    input_file = tmp_path / "notes.csv"
+
+    with open(input_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["genc_id", "note_id", "note_text"])
+        writer.writerows(rows)
+
+    (
+        pyDeidBuilder()
+        .set_input_file(str(input_file), note_id_varname="note_id")
+        .set_phi_types(DEFAULT_PHI_TYPES)
+        .replace_phi()
+        .set_multithreading(1, measure_ipc=measure_ipc, **multithreading)
+        .build()
+        .run(verbose=True)
+    )
+
+
+@pytest.mark.parametrize("measure_ipc", [False, True])
+def test_diagnostics_of_an_empty_input(tmp_path, capsys, measure_ipc):
+    run(tmp_path, [], measure_ipc)
+
+    assert "s/note = 0" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("measure_ipc", [False, True])
+def test_ipc_bytes_are_only_measured_on_request(tmp_path, capsys, measure_ipc):
+    run(tmp_path, [[1, 1, "Justin Wood was seen on December 10, 2001"]], measure_ipc)
+
+    assert ("IPC bytes/task" in capsys.readouterr().out) == measure_ipc
+
+
+@pytest.mark.parametrize("preserve_order", [False, True])
+def test_rows_of_a_worker_that_died_are_reported(
+    tmp_path, capsys, monkeypatch, preserve_order
+):
+    handle_string = PHIHandler.handle_string
+
+    def crash_on(self, note, *args):
+        if note == "CRASH":
+            os._exit(1)
+
+        return handle_string(self, note, *args)
+
+    # the workers are forked after the patch
+    monkeypatch.setattr(PHIHandler, "handle_string", crash_on)
+    notes = ["Justin Wood", "CRASH", "Seen on December 10, 2001"]
+    run(
+        tmp_path,
+        [[1, i, note] for i, note in enumerate(notes)],
+        False,
+        max_in_flight=1,
+        preserve_order=preserve_order,
+    )
+    out = capsys.readouterr().out
+
+    assert "Encounter ID: 1, Note ID: 1" in out
+    assert "Note ID: 0" not in out and "Note ID: 2" not in out
+    assert "worker pools restarted after a worker died = 1" in out
+
+    with open(tmp_path / "notes__DE-IDENTIFIED.csv") as f:
+        deidentified = [row["note_text"] for row in csv.DictReader(f)]
+
+    # the rows after the crash are de-identified on a new pool
+    assert len(deidentified) == 3 and deidentified[1] == "CRASH"
+    assert "December 10, 2001" not in deidentified[2]
@@ -0,0 +1,154 @@
+import multiprocessing
+import sqlite3
+import pytest
+from pyDeid.DeidEngine import DEFAULT_PHI_TYPES
+from pyDeid.process_note.DetectionCache import DetectionCache
+from pyDeid.pyDeidBuilder import pyDeidBuilder
+
+NOTES = [
+    "Justin Wood was seen on December 10, 2001 and again on 3/4/2019",
+    "St. Michael's hospital is located at 30 Bond St, Toronto, ON, M5B 1W8",
+    "Test mrn: 011-0111, call (416) 555-0123 or email jwood@example.com",
+]
+
+
+def build(path=None, **kwargs):
+    return (
+        pyDeidBuilder()
+        .replace_phi()
+        .set_phi_types(DEFAULT_PHI_TYPES)
+        .set_detection_cache(path=path, **kwargs)
+        .build()
+        .handler
+    )
+
+
+def spans(handler, note):
+    surrogates, _ = handler.handle_string(note)
+
+    return [(s["phi_start"], s["phi_end"], s["phi"], s["types"]) for s in surrogates]
+
+
+def test_hits_find_the_phi_of_misses(tmp_path):
+    path = str(tmp_path / "detections.sqlite")
+    handler = build(path)
+    misses = [spans(handler, note) for note in NOTES]
+
+    # a new process starts with an empty memory and reads the database
+    handler.detection_cache.flush()
+    reloaded = build(path)
+
+    assert [spans(handler, note) for note in NOTES] == misses
+    assert [spans(reloaded, note) for note in NOTES] == misses
+    assert handler.detection_cache.stats()[:2] == (3, 3)
+    assert reloaded.detection_cache.stats()[:2] == (3, 0)
+
+
+def test_database_holds_json_spans_without_phi_text(tmp_path):
+    path = str(tmp_path / "detections.sqlite")
+    handler = build(path)
+
+    for note in NOTES:
+        handler.handle_string(note)
+
+    handler.detection_cache.flush()
+
+    with sqlite3.connect(path) as connection:
+        stored = " ".join(
+            row[0] for row in connection.execute("SELECT spans FROM phi_spans")
+        )
+        tables = {
+            row[0]
+            for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+
+    for phi in [
+        "Justin",
+        "Wood",
+        "Bond",
+        "M5B 1W8",
+        "011-0111",
+        "jwood@example.com",
+        "December 10, 2001",
+    ]:
+        assert phi not in stored
+
+    assert tables == {"cache_format", "phi_spans"}
+
+
+def test_other_databases_are_refused_and_left_alone(tmp_path):
+    path = str(tmp_path / "other.sqlite")
+
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE detections (key TEXT, value BLOB)")
+        connection.execute("INSERT INTO detections VALUES ('a', 'b')")
+
+    with pytest.raises(ValueError, match="not a version 1 pyDeid detection cache"):
+        DetectionCache(path=path)
+
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT * FROM detections").fetchall() == [("a", "b")]
+
+    (tmp_path / "notes.csv").write_text("genc_id,note_text\n")
+
+    with pytest.raises(ValueError, match="not a pyDeid detection cache"):
+        DetectionCache(path=str(tmp_path / "notes.csv"))
+
+    # a database written by a later version
+    path = str(tmp_path / "detections.sqlite")
+    DetectionCache(path=path)
+
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE cache_format SET version = 2")
+
+    with pytest.raises(ValueError):
+        DetectionCache(path=path)
+
+
+def test_commits_are_batched_and_the_database_is_bounded(tmp_path):
+    path = str(tmp_path / "detections.sqlite")
+    cache = DetectionCache(path=path, max_disk_entries=5, commit_every=4)
+
+    def count():
+        with sqlite3.connect(path) as connection:
+            return connection.execute("SELECT COUNT(*) FROM phi_spans").fetchone()[0]
+
+    for i in range(3):
+        cache.put(cache.key(f"note {i}"), f"note {i}", {}, 0.0)
+
+    assert count() == 0
+
+    for i in range(3, 12):
+        cache.put(cache.key(f"note {i}"), f"note {i}", {}, 0.0)
+
+    cache.flush()
+
+    assert count() == 5
+    assert DetectionCache(path=path).get(cache.key("note 11"), "note 11") == {}
+    assert DetectionCache(path=path).get(cache.key("note 0"), "note 0") is None
+
+
+def _put_and_exit(path):
+    cache = DetectionCache(path=path)
+    cache.put(cache.key("note"), "note", {}, 0.0)
+
+
+def test_pending_writes_are_committed_when_a_worker_exits(tmp_path):
+    path = str(tmp_path / "detections.sqlite")
+    process = multiprocessing.get_context("spawn").Process(
+        target=_put_and_exit, args=(path,)
+    )
+    process.start()
+    process.join()
+
+    cache = DetectionCache(path=path)
+
+    assert process.exitcode == 0
+    assert cache.get(cache.key("note"), "note") == {}
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        DetectionCache(max_disk_entries=0)
@@ -0,0 +1,72 @@
+import random
+import re
+import pytest
+from pyDeid.phi_types.Gazetteer import Gazetteer
+
+# few letters, so that entries overlap, repeat and share prefixes and suffixes, and the non-ASCII letters that
+# case-insensitive `re` matching folds onto ASCII ones
+NOTE_CHARACTERS = ["abkisAB  \t\n-.'İıſK", "aab  "]
+PHRASES = [
+    "a",
+    "ab",
+    "as",
+    "aba",
+    "bab",
+    "b a",
+    "ab ba",
+    "k",
+    "ik",
+    "a.b",
+    "A-B",
+    "o'b",
+]
+
+
+def finditer(phrase, note, ignore_case, whole_words):
+    """The `re.finditer` loop of the finders the gazetteer replaces."""
+    pattern = (
+        r"\b(" + r")\s(".join(phrase.split(" ")) + r")\b" if whole_words else phrase
+    )
+    flags = re.IGNORECASE if ignore_case else 0
+
+    return [(m.start(), m.end()) for m in re.finditer(pattern, note, flags)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_of_finditer(seed):
+    rng = random.Random(seed)
+    gazetteer = Gazetteer()
+    entries = []
+
+    for i, phrase in enumerate(PHRASES):
+        for ignore_case in [True, False]:
+            for whole_words in [True, False]:
+                tag = f"{i}-{ignore_case}-{whole_words}"
+                gazetteer.add(phrase, tag, ignore_case, whole_words)
+                entries.append((tag, phrase, ignore_case, whole_words))
+
+    for _ in range(20):
+        characters = rng.choice(NOTE_CHARACTERS)
+        note = "".join(rng.choice(characters) for _ in range(rng.randint(0, 80)))
+
+        for tag, phrase, ignore_case, whole_words in entries:
+            assert [
+                (phi.start, phi.end) for phi in gazetteer.find(note, tag)
+            ] == finditer(phrase, note, ignore_case, whole_words), (note, tag)
+
+
+def test_tags_group_entries_in_entry_order():
+    gazetteer = Gazetteer()
+    gazetteer.add("Toronto", "Location")
+    gazetteer.add("Bond", "Location", whole_words=True)
+    gazetteer.add("St. Michael's", "Hospital")
+
+    note = "St. Michael's hospital is at 30 Bond St, Toronto, bondage"
+
+    assert [phi.phi for phi in gazetteer.find(note, "Location")] == ["Toronto", "Bond"]
+    assert [phi.phi for phi in gazetteer.find(note, "Hospital")] == ["St. Michael's"]
+    assert gazetteer.find(note, "Unknown") == []
+
+    # entries added after a search are found in the next one
+    gazetteer.add("hospital", "Location")
+    assert len(gazetteer.find(note, "Location")) == 3
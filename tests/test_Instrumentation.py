@@ -0,0 +1,80 @@
+import csv
+import json
+import pickle
+import pytest
+from pyDeid.DeidEngine import DEFAULT_PHI_TYPES
+from pyDeid.process_note.Instrumentation import Instrumentation
+from pyDeid.pyDeidBuilder import pyDeidBuilder
+
+NOTES = [
+    "Justin Wood was seen on December 10, 2001 at 10:30.",
+    "Call 416-555-1234 or write to jwood@example.com.",
+    "Patient lives at 123 Main Street, Toronto M5V 2T6.",
+]
+
+RECORDS = []
+
+
+def remember(stage, seconds, spans):
+    RECORDS.append((stage, spans))
+
+
+def test_records_drain_and_merge():
+    seen = []
+    instrumentation = Instrumentation([lambda *record: seen.append(record)])
+    instrumentation.record("prune", 0.5, 2)
+    instrumentation.record("prune", 0.25)
+    assert instrumentation.time("find.X", lambda note: [note] * 3, "a") == ["a"] * 3
+
+    assert instrumentation.stages["prune"] == [2, 0.75, 2]
+    assert instrumentation.stages["find.X"][::2] == [1, 3]
+    assert seen[:2] == [("prune", 0.5, 2), ("prune", 0.25, 0)]
+
+    worker = pickle.loads(pickle.dumps(Instrumentation()))
+    assert worker.stages == {}
+    worker.record("prune", 1.0, 1)
+    instrumentation.merge(worker.drain())
+
+    assert worker.stages == {}
+    assert instrumentation.stages["prune"] == [3, 1.75, 3]
+    # hooks of merged records were called by the process that recorded them
+    assert len(seen) == 3
+    assert list(instrumentation.to_dict()) == ["prune", "find.X"]
+    assert instrumentation.to_dict()["prune"]["ms_per_call"] == pytest.approx(1750 / 3)
+
+
+def run(tmp_path):
+    input_file = tmp_path / "notes.csv"
+
+    with open(input_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["genc_id", "note_id", "note_text"])
+        writer.writerows([[1, i, note] for i, note in enumerate(NOTES)])
+
+    (
+        pyDeidBuilder()
+        .set_input_file(str(input_file), note_id_varname="note_id")
+        .set_phi_types(DEFAULT_PHI_TYPES)
+        .replace_phi()
+        .set_multithreading(1, chunk_size=1)
+        .set_instrumentation(hooks=[remember])
+        .build()
+        .run()
+    )
+
+    with open(tmp_path / "notes__INSTRUMENTATION.json") as f:
+        return json.load(f)
+
+
+def test_report_merges_the_stages_of_the_workers(tmp_path):
+    RECORDS.clear()
+    stages = run(tmp_path)["stages"]
+
+    # the finders, pruner and replacer only run in the worker process
+    assert stages["prune"]["calls"] == stages["replace"]["calls"] == len(NOTES)
+    assert stages["find.DatesPHIFinder"]["calls"] == len(NOTES)
+    assert stages["find.DatesPHIFinder"]["spans"] > 0
+    assert {"read", "write"} <= set(stages)
+    # the hooks of the main process see its own stages, those of the workers ran in the workers
+    assert {stage for stage, _ in RECORDS} <= {"read", "write", "wait"}
+    assert stages["read"]["calls"] == sum(stage == "read" for stage, _ in RECORDS)
@@ -0,0 +1,44 @@
+import pytest
+from pyDeid.process_note.PHIFinder import PHIFinder
+from .test_baseline_phi import find
+
+INITIALS_NOTE = (
+    "Seen by J.R. Cumberledge today with Dr. A. Smithers and Mrs. K Hershnowitz."
+)
+
+
+@pytest.fixture(scope="module")
+def finder():
+    return PHIFinder(PHIFinder.Config(phi_types=["names"]))
+
+
+def test_initials_before_a_name(finder):
+    found = {
+        (phi.start, phi.end, phi.phi): sorted(types)
+        for phi, types in find(finder, INITIALS_NOTE).items()
+    }
+
+    assert found[(8, 12, "J.R.")] == [
+        "Initials (NamePattern4)",
+        "Initials (NamePattern5)",
+    ]
+    assert found[(40, 42, "A.")] == ["Initials (NamePattern4)"]
+    assert found[(61, 62, "K")] == ["Initials (NamePattern4)", "Last Name (STitle)"]
+
+    # every initial is found where it is in the note, so windows of the note find it at the same offsets
+    for start, end, initials in found:
+        assert INITIALS_NOTE[start:end] == initials
+
+
+def test_initials_in_a_window_of_the_note(finder):
+    prefix = "No acute distress.\n"
+
+    found = {
+        (phi.start - len(prefix), phi.end - len(prefix), phi.phi): sorted(types)
+        for phi, types in find(finder, prefix + INITIALS_NOTE).items()
+    }
+
+    assert found == {
+        (phi.start, phi.end, phi.phi): sorted(types)
+        for phi, types in find(finder, INITIALS_NOTE).items()
+    }
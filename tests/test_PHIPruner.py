@@ -0,0 +1,105 @@
+import random
+import re
+import pytest
+from pyDeid.phi_types.utils import PHI
+from pyDeid.process_note.PHIFinder import PHIFinder
+from pyDeid.process_note.PHIPruner import PHIPruner
+from .test_baseline_phi import BASELINE, TYPES, find, spans
+
+LABELS = [
+    "Month Day Year [Month dd, yyyy]",
+    "Year (4 digits)",
+    "Day Month [dd Month]",
+    "Time",
+    "Last Name (ambig)",
+    "Postalcode",
+    "Telephone/Fax (1)",
+]
+
+
+def combine_pairwise(note, phis):
+    """The merge of overlapping dates the sweep replaced, restarting after every merged pair."""
+    merged = True
+
+    while merged:
+        merged = False
+        phi_keys = sorted(phis.keys(), key=lambda x: x.start)
+        to_remove = set()
+        to_add = []
+
+        for i in range(len(phi_keys)):
+            for j in range(i + 1, len(phi_keys)):
+                key1 = phi_keys[i]
+                key2 = phi_keys[j]
+                vals1 = phis.get(key1, [])
+                vals2 = phis.get(key2, [])
+
+                if any(
+                    re.search(r"(Date|Year|Month|Day|Time)", v, re.IGNORECASE)
+                    for v in vals1
+                ) and any(
+                    re.search(r"(Date|Year|Month|Day|Time)", v, re.IGNORECASE)
+                    for v in vals2
+                ):
+                    if not (key1.end <= key2.start or key2.end <= key1.start):
+                        new_start = min(key1.start, key2.start)
+                        new_end = max(key1.end, key2.end)
+                        new_key = PHI(new_start, new_end, note[new_start:new_end])
+                        to_remove.update([key1, key2])
+                        to_add.append((new_key, list(set(vals1 + vals2))))
+                        merged = True
+                        break
+
+            if merged:
+                break
+
+        for key in to_remove:
+            phis.pop(key, None)
+
+        for key, val in to_add:
+            phis[key] = val
+
+    return phis
+
+
+def random_phis(rng, note):
+    phis = {}
+
+    for _ in range(rng.randint(0, 12)):
+        start = rng.randrange(len(note))
+        end = min(len(note), start + rng.randint(1, 12))
+        phis[PHI(start, end, note[start:end])] = rng.sample(LABELS, rng.randint(1, 2))
+
+    return phis
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_sweep_merges_like_the_pairwise_merge(seed):
+    rng = random.Random(seed)
+    note = "".join(rng.choice("0123456789/- ") for _ in range(60))
+    phis = random_phis(rng, note)
+    expected = combine_pairwise(note, {phi: list(types) for phi, types in phis.items()})
+
+    pruner = PHIPruner()
+    pruner.set_note(note)
+    pruner.set_phis(phis)
+    pruner._combine_overlapping_dates(sorted(phis, key=lambda x: x.start))
+
+    assert {phi: sorted(types) for phi, types in pruner.phis.items()} == {
+        phi: sorted(types) for phi, types in expected.items()
+    }
+
+
+@pytest.fixture(scope="module")
+def finder():
+    return PHIFinder(PHIFinder.Config(phi_types=TYPES))
+
+
+@pytest.mark.parametrize("i", range(len(BASELINE)))
+def test_pruner_matches_the_baseline(finder, i):
+    note = BASELINE[i]["note"]
+    pruner = PHIPruner()
+    pruner.set_note(note)
+    pruner.set_phis(find(finder, note))
+
+    assert spans(pruner.prune_phi()) == BASELINE[i]["pruned"]
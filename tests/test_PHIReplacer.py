@@ -0,0 +1,124 @@
+import re
+import pytest
+from pyDeid.DeidEngine import DEFAULT_PHI_TYPES
+from pyDeid.phi_types.utils import PHI
+from pyDeid.pyDeidBuilder import pyDeidBuilder
+from .test_PHITag import LABELS
+
+# the branches of the surrogate `if`/`elif` chain the dispatch table replaced, in order
+BASELINE_BRANCHES = [
+    (
+        lambda label: re.search(r"Initials \(double\)", label, re.IGNORECASE),
+        "_build_double_initials",
+    ),
+    (
+        lambda label: re.search(r"Initials \(single\)", label, re.IGNORECASE),
+        "_build_single_initial",
+    ),
+    (lambda label: re.search("MRN", label, re.IGNORECASE), "_build_mrn"),
+    (lambda label: re.search("SIN", label, re.IGNORECASE), "_build_sin_for"),
+    (lambda label: re.search("OHIP", label, re.IGNORECASE), "_build_ohip_for"),
+    (lambda label: re.search("Telephone/Fax", label), "_build_telephone_for"),
+    (lambda label: re.search("Email Address", label), "_build_email"),
+    (lambda label: re.search("Address", label), "_build_street_address"),
+    (lambda label: re.search("Location", label), "_build_location"),
+    (
+        lambda label: re.search(r"(First Name)|(first_name \(MLL\))", label),
+        "_build_first_name",
+    ),
+    (
+        lambda label: re.search(r"(Last Name)|(last_name \(MLL\))", label),
+        "_build_last_name",
+    ),
+    (lambda label: re.search("Name Prefix", label), "_build_empty"),
+    (lambda label: re.search("Name", label), "_build_first_name"),
+    (
+        lambda label: re.search(r"(Postalcode)|(postal_code \(MLL\))", label),
+        "_build_postal_code_for",
+    ),
+    (
+        lambda label: re.search(
+            r"date|day|month|year|(_date \(MLL\))", label, re.IGNORECASE
+        ),
+        lambda label: (
+            "_build_date_range"
+            if re.search(r"Date range", label, re.IGNORECASE)
+            else "_build_any_date"
+        ),
+    ),
+    (lambda label: re.search("Time", label, re.IGNORECASE), "_build_shifted_time"),
+    (lambda label: re.search("Holiday", label), "_build_empty"),
+    (lambda label: re.search("_id (MLL)", label), "_build_id_for"),
+    (lambda label: re.search("Hospital", label), "_build_hospital"),
+    (
+        lambda label: re.search("Site Acronym", label, re.IGNORECASE),
+        "_build_site_acronym",
+    ),
+]
+
+
+def baseline_branch(label):
+    for search, name in BASELINE_BRANCHES:
+        if search(label):
+            return name if isinstance(name, str) else name(label)
+
+    return "_build_placeholder"
+
+
+def build_replacer(*custom_regex):
+    builder = pyDeidBuilder().replace_phi().set_phi_types(DEFAULT_PHI_TYPES)
+
+    if custom_regex:
+        builder.set_custom_regex(*custom_regex)
+
+    return builder.build().handler.replacer
+
+
+@pytest.fixture(scope="module")
+def replacer():
+    replacer = build_replacer()
+    # set for every note by `replace_phi`
+    replacer.name_lookup = {}
+
+    return replacer
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_labels_dispatch_to_the_branch_of_the_baseline(replacer, label):
+    assert replacer._surrogate_builder(label).__name__ == baseline_branch(label)
+
+
+def test_custom_types_dispatch_to_their_builder():
+    replacer = build_replacer(r"\bRoom \d+\b", "room", lambda: "Room 0")
+
+    assert replacer._get_surrogate(["room"], PHI(0, 8, "Room 123")) == "Room 0"
+    # a built-in type is still preferred, and other labels keep the surrogate of the previous type
+    assert (
+        replacer._surrogate_builder("Postalcode").__name__ == "_build_postal_code_for"
+    )
+    assert replacer._surrogate_builder("unknown").__name__ == "_keep_surrogate"
+
+
+def test_first_type_with_a_surrogate_is_used(replacer):
+    key = PHI(0, 4, "Wood")
+    surrogate = replacer._get_surrogate(["unknown", "Last Name (un)", "Hospital"], key)
+
+    assert surrogate not in ("<PHI>", "Wood")
+    # names are replaced consistently within a note
+    assert replacer._get_surrogate(["Last Name (un)"], key) == surrogate
+
+
+def test_wordlists_are_loaded_when_a_surrogate_needs_them():
+    deid = pyDeidBuilder().replace_phi().set_phi_types(["dates"]).build()
+    replacer = deid.handler.replacer
+    loaded = replacer.finder.wordlist_sizes
+
+    assert not {"ontario_hospitals.txt", "canadian_area_code.txt"} & set(loaded)
+
+    surrogate = replacer._get_surrogate(["Hospital"], PHI(0, 3, "SMH"))
+
+    assert surrogate.upper() in replacer._wordlist(
+        "ontario_hospitals.txt", optimization="iteration"
+    )
+    assert "ontario_hospitals.txt" in loaded
+    assert "canadian_area_code.txt" not in loaded
@@ -0,0 +1,106 @@
+import re
+import pytest
+from pyDeid.phi_types.PHITag import PHITag
+from pyDeid.phi_types.utils import has_tag, is_ambig
+from .test_baseline_phi import BASELINE
+
+# the label searches of the pruner and replacer before labels were classified into flags
+BASELINE_SEARCHES = [
+    (PHITag.NAME, lambda label: re.search("Name", label)),
+    (
+        PHITag.FIRST_NAME | PHITag.MLL_FIRST_NAME,
+        lambda label: re.search(r"(First Name)|(first_name \(MLL\))", label),
+    ),
+    (
+        PHITag.LAST_NAME | PHITag.MLL_LAST_NAME,
+        lambda label: re.search(r"(Last Name)|(last_name \(MLL\))", label),
+    ),
+    (PHITag.NAME_PREFIX, lambda label: re.search("Name Prefix", label)),
+    (
+        PHITag.INITIALS_SINGLE,
+        lambda label: re.search(r"Initials \(single\)", label, re.IGNORECASE),
+    ),
+    (
+        PHITag.INITIALS_DOUBLE,
+        lambda label: re.search(r"Initials \(double\)", label, re.IGNORECASE),
+    ),
+    (PHITag.AMBIG, lambda label: re.search("ambig", label)),
+    (PHITag.MEDICAL_PHRASE, lambda label: re.search("MedicalPhrase", label)),
+    (
+        PHITag.DATE,
+        lambda label: re.search(
+            r"date|day|month|year|(_date \(MLL\))", label, re.IGNORECASE
+        ),
+    ),
+    (
+        PHITag.DATE | PHITag.TIME,
+        lambda label: re.search(r"(Date|Year|Month|Day|Time)", label, re.IGNORECASE),
+    ),
+    (PHITag.DATE_RANGE, lambda label: re.search(r"Date range", label, re.IGNORECASE)),
+    (PHITag.TIME, lambda label: re.search("Time", label, re.IGNORECASE)),
+    (PHITag.HOLIDAY, lambda label: re.search("Holiday", label)),
+    (PHITag.DAY_MONTH, lambda label: re.match(r"^Day Month \[", label)),
+    (PHITag.DAY_MONTH_YEAR, lambda label: re.match(r"^Day Month Year \[", label)),
+    (PHITag.MONTH_DAY, lambda label: re.match(r"^Month Day \[", label)),
+    (PHITag.MONTH_DAY_YEAR, lambda label: re.match(r"^Month Day Year \[", label)),
+    (PHITag.MRN, lambda label: re.search("MRN", label, re.IGNORECASE)),
+    (PHITag.SIN, lambda label: re.search("SIN", label, re.IGNORECASE)),
+    (PHITag.OHIP, lambda label: re.search("OHIP", label, re.IGNORECASE)),
+    (PHITag.TELEPHONE_FAX, lambda label: re.search("Telephone/Fax", label)),
+    (PHITag.EMAIL, lambda label: re.search("Email Address", label)),
+    (PHITag.ADDRESS, lambda label: re.search("Address", label)),
+    (PHITag.LOCATION, lambda label: re.search("Location", label)),
+    (
+        PHITag.POSTAL_CODE | PHITag.MLL_POSTAL_CODE,
+        lambda label: re.search(r"(Postalcode)|(postal_code \(MLL\))", label),
+    ),
+    (PHITag.HOSPITAL, lambda label: re.search("Hospital", label)),
+    (
+        PHITag.SITE_ACRONYM,
+        lambda label: re.search("Site Acronym", label, re.IGNORECASE),
+    ),
+    (PHITag.MLL_ID, lambda label: re.search("_id (MLL)", label)),
+]
+
+LABELS = sorted(
+    {label for entry in BASELINE for phi in entry["found"] for label in phi[3]}
+    | {
+        "first_name (MLL)",
+        "last_name (MLL)",
+        "postal_code (MLL)",
+        "birth_date (MLL)",
+        "patient_id (MLL)",
+        "patient_id MLL",
+        "Initials (single)",
+        "Initials (double)",
+        "Date range (1)",
+        "Holiday",
+        "Site Acronym",
+        "Custom Doctor First Name",
+        "custom_regexes",
+        "",
+    }
+)
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_flags_match_the_label_searches(label):
+    tag = PHITag.of(label)
+
+    for flags, search in BASELINE_SEARCHES:
+        assert bool(tag & flags) == bool(search(label)), flags
+
+
+def test_tags_of_the_types_of_a_phi():
+    phis = {
+        "a": ["Last Name (ambig)", "Month Day [Month dd]"],
+        "b": ["Female First Name (ambig)"],
+    }
+
+    assert PHITag.of_all(phis["a"]) == PHITag.of(phis["a"][0]) | PHITag.of(phis["a"][1])
+    assert PHITag.of_all([]) == PHITag.NONE
+    assert has_tag("a", PHITag.MONTH_DAY, phis) and not has_tag(
+        "a", PHITag.FIRST_NAME, phis
+    )
+    assert not has_tag("c", PHITag.NAME, phis)
+    assert is_ambig("b", phis) and not is_ambig("a", phis)
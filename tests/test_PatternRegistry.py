@@ -0,0 +1,26 @@
+import re
+from pyDeid.phi_types.PatternRegistry import PatternRegistry
+from pyDeid.process_note.PHIFinder import PHIFinder
+from .test_baseline_phi import BASELINE, TYPES, find
+
+
+def test_identical_patterns_are_compiled_once():
+    registry = PatternRegistry()
+    pattern = registry.compile(r"\bmrn\b")
+
+    assert registry.compile(r"\bmrn\b") is pattern
+    assert registry.compile(r"\bmrn\b", re.IGNORECASE) is not pattern
+    assert registry.compile(r"\bmrn\b", re.IGNORECASE).flags & re.IGNORECASE
+    assert len(registry) == 2
+    assert registry.report().startswith("Compiled 2 patterns")
+
+
+def test_finders_compile_their_patterns_when_constructed():
+    finder = PHIFinder(PHIFinder.Config(phi_types=TYPES))
+    compiled = len(finder.registry)
+
+    for entry in BASELINE:
+        find(finder, entry["note"])
+
+    assert compiled > 100
+    assert len(finder.registry) == compiled
@@ -0,0 +1,63 @@
+import multiprocessing
+import pickle
+import pytest
+from pyDeid.process_note.SurrogatePool import SurrogatePool
+
+
+def _draw(pool, results):
+    results.put([pool.draw("first_name") for _ in range(20)])
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+def test_forked_workers_draw_different_surrogates():
+    pool = SurrogatePool()
+    pool.draw("first_name")
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [context.Process(target=_draw, args=(pool, results)) for _ in range(2)]
+
+    for worker in workers:
+        worker.start()
+
+    draws = [results.get(timeout=30) for _ in workers]
+
+    for worker in workers:
+        worker.join()
+
+    assert draws[0] != draws[1]
+
+
+def test_seeded_pool_is_reproducible():
+    first = SurrogatePool(seed=1)
+    second = SurrogatePool(seed=1)
+
+    for kind in ["first_name", "last_name", "date", "street_address"]:
+        assert [first.draw(kind) for _ in range(10)] == [
+            second.draw(kind) for _ in range(10)
+        ]
+
+
+def test_pickled_copy_starts_with_empty_pools():
+    pool = SurrogatePool(first_batch_size=4, batch_size=8)
+    pool.draw("last_name")
+
+    copy = pickle.loads(pickle.dumps(pool))
+
+    assert copy.pools == {} and copy.next_batch_sizes == {}
+    assert copy.draw("last_name")
+
+
+def test_pools_grow_up_to_batch_size():
+    pool = SurrogatePool(first_batch_size=2, batch_size=5)
+
+    for _ in range(2 + 4 + 5):
+        pool.draw("date")
+
+    assert pool.generated == 11
+    assert pool.next_batch_sizes["date"] == 5
+
+    with pytest.raises(ValueError):
+        pool.draw("phone")
@@ -0,0 +1,90 @@
+import os
+import pickle
+import subprocess
+import sys
+from pyDeid.phi_types import utils
+from pyDeid.phi_types.utils import DATA_PATH, load_file
+from pyDeid.phi_types.WordlistIndex import (
+    WordlistIndex,
+    compile_wordlist_index,
+    open_wordlist_index,
+)
+
+NAMES = ["WOOD", "JUSTIN", "O'NEIL", "MARY-ANNE", "ÉLODIE", "", "WOOD"]
+
+
+def test_lookups_match_the_wordlist_sets(tmp_path):
+    source = os.path.join(DATA_PATH, "all_last_names.txt")
+    words = load_file(source)
+    path = str(tmp_path / "index.bin")
+    compile_wordlist_index(path, {"last": words, "names": NAMES}, [source])
+
+    index = open_wordlist_index(path, DATA_PATH)
+    last = index["last"]
+
+    assert len(last) == len(words)
+    assert set(last) == words
+    assert all(word in last for word in words)
+    # a NUL never appears in a wordlist, so none of these are entries
+    assert not any(word + "\x00" in last or "\x00" + word in last for word in words)
+    # prefixes of entries sort right next to them
+    assert not any(prefix in last for prefix in {word[:-1] for word in words} - words)
+
+    names = index["names"]
+
+    assert list(names) == sorted(set(NAMES), key=lambda name: name.encode("utf-8"))
+    assert "ÉLODIE" in names and "" in names and "élodie" not in names
+    # words no wordlist holds, and a lone surrogate that cannot be encoded
+    assert "\ud800" not in names and None not in names and 3 not in names
+
+
+def test_workers_map_the_file_again(tmp_path):
+    path = str(tmp_path / "index.bin")
+    compile_wordlist_index(path, {"names": NAMES})
+    names = WordlistIndex(path, "names")
+    assert "WOOD" in names
+
+    copy = pickle.loads(pickle.dumps(names))
+
+    assert len(pickle.dumps(names)) < 200
+    assert "WOOD" in copy and "WOODS" not in copy
+
+
+def test_stale_or_foreign_files_are_not_opened(tmp_path):
+    source = tmp_path / "names.txt"
+    source.write_text("WOOD\n")
+    path = str(tmp_path / "index.bin")
+
+    compile_wordlist_index(path, {"names": ["WOOD"]}, [str(source)])
+    assert open_wordlist_index(path, str(tmp_path)) is not None
+
+    source.write_text("WOOD\nJUSTIN\n")
+    assert open_wordlist_index(path, str(tmp_path)) is None
+
+    (tmp_path / "other.bin").write_bytes(b"not an index")
+    assert open_wordlist_index(str(tmp_path / "other.bin"), str(tmp_path)) is None
+    assert open_wordlist_index(str(tmp_path / "missing.bin"), str(tmp_path)) is None
+
+
+def test_index_is_compiled_to_and_found_in_the_user_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    subprocess.run(
+        [sys.executable, "-m", "pyDeid.wordlists"],
+        # the directory holding the pyDeid package
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(utils.__file__))),
+        check=True,
+        capture_output=True,
+    )
+    path = utils.user_index_path()
+
+    assert path.startswith(str(tmp_path / "pyDeid"))
+
+    utils.wordlist_index.cache_clear()
+
+    try:
+        index = utils.wordlist_index()
+
+        assert index["all_last_names.txt"].path == path
+        assert "SMITH" in index["all_last_names.txt"]
+    finally:
+        utils.wordlist_index.cache_clear()
@@ -0,0 +1,56 @@
+import json
+import os
+import pytest
+from pyDeid.phi_types.DatesPHIFinder import Date
+from pyDeid.process_note.PHIFinder import PHIFinder
+
+TYPES = ["names", "dates", "sin", "ohip", "mrn", "locations", "hospitals", "contact"]
+
+# the PHI found in, and kept by the pruner of, the notes of tests/*.csv, notes exercising each finder and synthetic
+# notes from `benchmarks`, as written by the finders and pruner of pyDeid 1.0.1 before they were optimized
+with open(
+    os.path.join(os.path.dirname(__file__), "baseline_phi.jsonl"), encoding="utf-8"
+) as f:
+    BASELINE = [json.loads(line) for line in f]
+
+
+def text(phi):
+    if isinstance(phi, Date):
+        return phi.date_string
+
+    # times are kept with their parsed fields
+    return list(phi) if isinstance(phi, tuple) else phi
+
+
+def spans(phis):
+    return sorted(
+        [
+            phi.start,
+            phi.end,
+            text(phi.phi),
+            sorted(types),
+        ]
+        + (
+            [[phi.phi.day, phi.phi.month, phi.phi.year]]
+            if isinstance(phi.phi, Date)
+            else []
+        )
+        for phi, types in phis.items()
+    )
+
+
+def find(finder, note):
+    finder.set_note(note)
+    finder.set_phis({})
+
+    return finder.find_phi()
+
+
+@pytest.fixture(scope="module")
+def finder():
+    return PHIFinder(PHIFinder.Config(phi_types=TYPES))
+
+
+@pytest.mark.parametrize("i", range(len(BASELINE)))
+def test_finders_match_the_baseline(finder, i):
+    assert spans(find(finder, BASELINE[i]["note"])) == BASELINE[i]["found"]
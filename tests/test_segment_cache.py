@@ -0,0 +1,99 @@
+import csv
+import os
+import pickle
+import pytest
+from pyDeid.process_note.PHIFinder import PHIFinder
+from . import test_baseline_phi as baseline
+
+TYPES = ["sin", "ohip", "mrn", "contact", "locations"]
+
+LINES = [
+    "SIN 046 454 286, OHIP 1234-567-890 AB.",
+    "Test mrn: 011-0111",
+    "Email john.doe@example.com or call 416-555-0123.",
+    "St. Michael's hospital is located at 30 Bond St, Toronto, ON, M5B 1W8",
+    "",
+    "No PHI on this line.",
+]
+
+
+def notes():
+    with open(os.path.join(os.path.dirname(__file__), "test.csv"), newline="") as f:
+        notes = [row["note_text"] for row in csv.DictReader(f)]
+
+    # repeated headers and table rows, and a paragraph of many lines
+    notes.append("\n".join(LINES * 3))
+    notes.append("\n".join(LINES[i % 4] + f" row {i}" for i in range(40)))
+    notes.append("\n\n".join(LINES))
+
+    return notes
+
+
+def find(finder, note):
+    finder.set_note(note)
+    finder.set_phis({})
+
+    return {phi: sorted(types) for phi, types in finder.find_phi().items()}
+
+
+@pytest.fixture(scope="module")
+def uncached():
+    return PHIFinder(PHIFinder.Config(phi_types=TYPES, segment_cache_bytes=0))
+
+
+@pytest.mark.parametrize("max_bytes", [4 * 2**20, 2000])
+def test_cached_finders_match_whole_note_finders(uncached, max_bytes):
+    finder = PHIFinder(PHIFinder.Config(phi_types=TYPES, segment_cache_bytes=max_bytes))
+
+    # the second pass is served from the cache
+    for _ in range(2):
+        for note in notes():
+            assert find(finder, note) == find(uncached, note)
+
+    assert finder.segment_hits > 0
+    assert finder.segment_cache_used <= max_bytes
+
+
+@pytest.mark.parametrize("max_bytes", [0, 4 * 2**20, 2000])
+def test_finders_match_the_baseline_with_and_without_the_cache(max_bytes):
+    finder = PHIFinder(
+        PHIFinder.Config(phi_types=baseline.TYPES, segment_cache_bytes=max_bytes)
+    )
+
+    # the second pass is served from the cache
+    for _ in range(2):
+        for entry in baseline.BASELINE:
+            found = baseline.find(finder, entry["note"])
+
+            assert baseline.spans(found) == entry["found"]
+
+    assert (finder.segment_hits > 0) == bool(max_bytes)
+
+
+def test_cache_is_keyed_by_digest_and_bounded_by_bytes():
+    finder = PHIFinder(PHIFinder.Config(phi_types=TYPES, segment_cache_bytes=4000))
+
+    # one paragraph of about 400 KB for the MRN finder, then many distinct lines
+    find(finder, "Test mrn: 011-0111\n" + "no blank lines here\n" * 20000)
+
+    for i in range(200):
+        find(finder, f"Call 416-555-{i:04d} today")
+
+    for (name, digest), (spans, size) in finder.segment_cache.items():
+        assert isinstance(digest, bytes) and len(digest) == 16
+
+    assert finder.segment_cache_used == sum(
+        size for _, size in finder.segment_cache.values()
+    )
+    assert finder.segment_cache_used <= 4000
+
+
+def test_pickled_finder_starts_with_an_empty_cache():
+    finder = PHIFinder(PHIFinder.Config(phi_types=["sin"]))
+    find(finder, LINES[0])
+
+    copy = pickle.loads(pickle.dumps(finder))
+
+    assert finder.segment_cache and not copy.segment_cache
+    assert copy.segment_cache_used == 0
+    assert find(copy, LINES[0]) == find(finder, LINES[0])
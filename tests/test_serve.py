@@ -0,0 +1,110 @@
+import json
+import os
+import signal
+import threading
+import time
+import urllib.error
+import urllib.request
+import pytest
+from pyDeid.serve import make_server
+
+GOOD_NOTE = "Justin Wood was seen on December 10, 2001"
+# raises IndexError in the date range pattern
+BAD_NOTE = "Justin Wood was seen 3/4/19-3/5/19."
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = make_server(port=0, max_batch_delay=0.05, max_queue=8, max_body_bytes=4096)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    server.batcher.close()
+    server.engine.close()
+
+
+def post(server, body):
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.server_port}/deid",
+        data=json.dumps(body).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_single_and_batch(server):
+    status, (surrogates, new_note) = post(server, {"note": GOOD_NOTE})
+
+    assert status == 200
+    assert "Justin" in [s["phi"] for s in surrogates]
+
+    status, results = post(server, {"notes": [GOOD_NOTE, GOOD_NOTE]})
+
+    assert status == 200 and len(results) == 2
+
+
+def test_failed_note_only_fails_its_request(server):
+    responses = [None, None]
+
+    def send(i, body):
+        responses[i] = post(server, body)
+
+    threads = [
+        threading.Thread(target=send, args=(0, {"note": BAD_NOTE})),
+        threading.Thread(target=send, args=(1, {"note": GOOD_NOTE})),
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert responses[0][0] == 500
+    # the note is not quoted back in the error
+    assert "Justin" not in json.dumps(responses[0][1])
+    assert responses[1][0] == 200
+
+    status, results = post(server, {"notes": [GOOD_NOTE, BAD_NOTE]})
+
+    assert status == 200
+    assert results[1] == {"error": "De-identification failed"}
+    assert len(results[0]) == 2
+
+
+def test_bad_requests(server):
+    answered = server.request_latency.counts[:]
+
+    assert post(server, {"text": GOOD_NOTE})[0] == 400
+    assert post(server, {"notes": [GOOD_NOTE] * 9})[0] == 429
+    assert post(server, {"note": "x" * 4096}) == (
+        413,
+        {"error": "The request body is larger than 4096 bytes"},
+    )
+    # the latency of the rejected requests is recorded too, once their answer is sent
+    deadline = time.monotonic() + 5
+
+    while sum(server.request_latency.counts) - sum(answered) < 3:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_pool_is_restarted_after_workers_die(server):
+    for pid in list(server.batcher.pool._processes):
+        os.kill(pid, signal.SIGKILL)
+
+    statuses = [post(server, {"note": GOOD_NOTE})[0] for _ in range(3)]
+
+    assert statuses[-1] == 200
+    assert server.batcher.restarts == 1
+    assert server.batcher.pending == 0
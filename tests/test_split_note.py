@@ -0,0 +1,146 @@
+import csv
+import pytest
+from pyDeid.DeidEngine import DEFAULT_PHI_TYPES
+from pyDeid.phi_types.PHITypeFinder import WindowDependsOnNote
+from pyDeid.phi_types.utils import PHI, merge_phi_dicts
+from pyDeid.process_note.PHIHandler import split_note
+from pyDeid.pyDeidBuilder import pyDeidBuilder
+
+LINES = [
+    "Seen by J.R. Cumberledge today, email john.doe@example.com for results.",
+    "A.B. Smithers and K. Hershnowitz reviewed the chart on December 10, 2001.",
+    "St. Michael's hospital is located at 30 Bond St, Toronto, ON, M5B 1W8",
+    "Test mrn: 011-0111, call (416) 555-0123 or j @ x.ca",
+    "Justin Wood was seen in clinic, no acute distress, plan to follow up.",
+]
+NOTE = "\n".join(
+    LINES[i % len(LINES)] + (" and more words" * (i % 4)) for i in range(60)
+)
+# "mds" anywhere in a note turns off the names followed by "MD" in all of it
+MD_NOTE = (
+    "Patient seen by Quentin Larkspur, MD today.\n"
+    + "Vitals stable, plan unchanged.\n" * 45
+    + "All mds agreed."
+)
+
+
+@pytest.fixture(scope="module")
+def handler():
+    return (
+        pyDeidBuilder().replace_phi().set_phi_types(DEFAULT_PHI_TYPES).build().handler
+    )
+
+
+def test_split_note_covers_note_at_whitespace():
+    windows = split_note(NOTE, 500, 100)
+
+    assert windows[0][2] == 0 and windows[-1][3] == len(NOTE)
+
+    for (_, _, _, core_end), (_, _, core_start, _) in zip(windows, windows[1:]):
+        assert core_end == core_start
+
+    for start, end, core_start, core_end in windows:
+        assert start <= core_start < core_end <= end
+        assert start == 0 or NOTE[start - 1].isspace()
+        assert end == len(NOTE) or NOTE[end - 1].isspace()
+
+
+def find_in_windows(handler, note, window_chars, overlap):
+    note_facts = handler.finder.note_facts(note)
+    windowed = {}
+
+    for window in split_note(note, window_chars, overlap):
+        start, end, _, _ = window
+        merge_phi_dicts(
+            windowed, handler.find_in_window(note[start:end], window, note_facts)
+        )
+
+    return {phi: sorted(types) for phi, types in windowed.items()}
+
+
+@pytest.mark.parametrize("note", [NOTE, MD_NOTE])
+@pytest.mark.parametrize("window_chars,overlap", [(500, 100), (700, 60), (2000, 200)])
+def test_windows_find_the_phi_of_the_whole_note(handler, note, window_chars, overlap):
+    handler.set_note(note)
+    handler.set_phis({})
+    whole = handler.finder.find_phi()
+
+    assert find_in_windows(handler, note, window_chars, overlap) == {
+        phi: sorted(types) for phi, types in whole.items()
+    }
+
+    # every span covers its PHI, dates being kept with their parsed fields
+    for phi in whole:
+        text = phi.phi if isinstance(phi.phi, str) else phi.phi.date_string
+        assert note[phi.start : phi.end] == text
+
+
+def test_windows_see_the_mds_of_the_whole_note(handler):
+    types = find_in_windows(handler, MD_NOTE, 500, 100)
+    md_types = find_in_windows(handler, MD_NOTE.replace("mds", "all"), 500, 100)
+
+    assert "Name7 (MD)" not in types[(16, 23, "Quentin")]
+    assert "Name7 (MD)" in md_types[(16, 23, "Quentin")]
+
+
+def test_windows_that_depend_on_the_rest_of_the_note_are_not_used(handler, monkeypatch):
+    names = handler.finder.names_finder
+    list_of_names = names._NamesPHIFinder__list_of_names
+    text = "Van Buren was seen with the team and the nurse"
+    phi = {PHI(0, 9, "Van Buren"): ["Last Name"]}
+
+    # the "and <name>" after a last name is looked for anywhere after it in the note
+    assert list_of_names(text, phi) == {
+        PHI(37, 40, "the"): ["Last Name (NamePattern6)"]
+    }
+
+    names.set_window_facts(handler.finder.note_facts(text))
+
+    with pytest.raises(WindowDependsOnNote):
+        list_of_names(text, phi)
+
+    names.set_window_facts(None)
+
+    def find():
+        raise WindowDependsOnNote()
+
+    monkeypatch.setattr(names, "find", find)
+    window = split_note(MD_NOTE, 500, 100)[0]
+
+    assert handler.find_in_window(MD_NOTE[: window[1]], window, {}) is None
+    assert names.window_facts is None
+
+
+def test_windowed_run_writes_the_phi_of_the_whole_note_run(tmp_path):
+    spans = []
+
+    for window_chars in [None, 500]:
+        input_file = tmp_path / f"notes_{window_chars}.csv"
+
+        with open(input_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["genc_id", "note_id", "note_text"])
+            writer.writerow([1, 1, NOTE])
+            writer.writerow([1, 2, NOTE[1000:]])
+            writer.writerow([1, 3, MD_NOTE])
+
+        (
+            pyDeidBuilder()
+            .set_input_file(str(input_file), note_id_varname="note_id")
+            .replace_phi()
+            .set_phi_types(DEFAULT_PHI_TYPES)
+            .set_multithreading(1, window_chars=window_chars, window_overlap=100)
+            .build()
+            .run(verbose=False)
+        )
+
+        with open(tmp_path / f"notes_{window_chars}__PHI.csv", newline="") as f:
+            spans.append(
+                sorted(
+                    (row["note_id"], int(row["phi_start"]), row["phi"], row["types"])
+                    for row in csv.DictReader(f)
+                )
+            )
+
+    assert spans[0] == spans[1]
+    assert len(spans[0]) > 100